@@ -0,0 +1,348 @@
+"""
+Asynchronous HTTP server exposing the movie collection as a JSON API.
+
+Endpoints:
+    GET    /movies                  a page of movies (limit=100 by default, at most 1000,
+                                    and offset); filtered with min_rating, start_year and
+                                    end_year, sorted with sort=rating|year|title
+    GET    /movies/<title>          a single movie
+    POST   /movies                  add a movie: {"title": ...} fetches it from OMDb,
+                                    {"title", "year", "rating", "poster"} stores it as given
+    PUT    /movies/<title>          update year and rating: {"year": ..., "rating": ...}
+    DELETE /movies/<title>          delete a movie
+    GET    /search?q=...&limit=5    fuzzy title search
+    GET    /stats                   average, median, best and worst rating
+    GET    /stats/detailed?k=5      percentiles, histogram, decades, top and bottom movies
+    GET    /random                  a random movie
+
+Usage:
+    python api_server.py [--host HOST] [--port PORT] [--storage data.csv] [--journal]
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import functools
+import itertools
+import json
+import time
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from movie_service import InvalidInputError, MovieService, UnknownMovieError
+from omdb_api import MovieNotFoundError, OmdbError
+from storage.factory import open_storage
+from storage.storage_cached import CachedStorage
+
+MAX_BODY_SIZE = 1024 * 1024
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+KEEP_ALIVE_TIMEOUT = 15
+
+
+class HttpError(Exception):
+    """
+    Raised by request handlers to answer with an error status.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiServer:
+    """
+    Serves MovieService operations over HTTP/1.1 with keep-alive connections, using
+    asyncio streams from the standard library.
+    Every service call runs in a single service thread, so the service and its
+    storage are never used concurrently and slow work (a storage write, building
+    the search index or the detailed statistics) does not block the event loop.
+    OMDb lookups run in other worker threads, so a slow lookup does not hold up the
+    service thread either. Movie lists are paged so responses stay small.
+    """
+
+    def __init__(self, service, host="127.0.0.1", port=8000):
+        """
+        Args:
+            service (MovieService): The service to expose. Its storage should be
+                                    a CachedStorage so reads are served from memory.
+            host (str): Interface to listen on.
+            port (int): Port to listen on, 0 for any free port.
+        """
+        self.service = service
+        self.host = host
+        self.port = port
+        self._server = None
+        self._service_thread = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="api-service")
+        self._routes = [
+            ("GET", ("movies",), self._list_movies),
+            ("POST", ("movies",), self._add_movie),
+            ("GET", ("movies", None), self._get_movie),
+            ("PUT", ("movies", None), self._update_movie),
+            ("DELETE", ("movies", None), self._delete_movie),
+            ("GET", ("search",), self._search),
+            ("GET", ("stats",), self._stats),
+            ("GET", ("stats", "detailed"), self._detailed_stats),
+            ("GET", ("random",), self._random_movie),
+        ]
+
+    async def start(self):
+        """
+        Starts listening. With port 0, self.port is set to the port that was picked.
+        """
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """
+        Starts the server (if needed) and serves until cancelled.
+        """
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stops listening and waits for the server to close.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._service_thread.shutdown(wait=True)
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Answers the requests of one connection until the client closes it.
+        """
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except HttpError as e:
+                    await self._send(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload = await self._dispatch(method, target, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """
+        Reads one request from the connection.
+
+        Returns:
+            tuple or None: (method, target, headers, body), or None if the client
+                           closed the connection.
+        """
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line") from None
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from None
+        if length > MAX_BODY_SIZE:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    async def _dispatch(self, method, target, body):
+        """
+        Routes a request to its handler and converts errors into status codes.
+
+        Returns:
+            tuple: (HTTP status, JSON serializable payload)
+        """
+        url = urlsplit(target)
+        parts = tuple(unquote(part) for part in url.path.strip("/").split("/") if part)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        allowed = False
+        for route_method, pattern, handler in self._routes:
+            if len(pattern) != len(parts) or any(
+                    expected is not None and expected != part for expected, part in zip(pattern, parts)):
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            args = [part for expected, part in zip(pattern, parts) if expected is None]
+            try:
+                return await handler(*args, params=params, body=body)
+            except HttpError as e:
+                return e.status, {"error": str(e)}
+            except InvalidInputError as e:
+                return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+            except (UnknownMovieError, MovieNotFoundError) as e:
+                return HTTPStatus.NOT_FOUND, {"error": str(e)}
+            except OmdbError as e:
+                return HTTPStatus.BAD_GATEWAY, {"error": str(e)}
+            except Exception as e:
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Internal error: {e}"}
+
+        if allowed:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"Method {method} not allowed"}
+        return HTTPStatus.NOT_FOUND, {"error": f"Unknown path {url.path}"}
+
+    async def _send(self, writer, status, payload, keep_alive):
+        """
+        Writes a JSON response.
+        """
+        body = json.dumps(payload).encode("utf-8")
+        status = HTTPStatus(status)
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def _call(self, function, *args, **kwargs):
+        """
+        Runs a service call in the service thread without blocking the event loop.
+
+        Returns:
+            The result of the call.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._service_thread, functools.partial(function, *args, **kwargs))
+
+    @staticmethod
+    def _parse_json(body):
+        """
+        Decodes a JSON object request body.
+        """
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON") from None
+        if not isinstance(data, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        return data
+
+    @staticmethod
+    def _number(params, name, default):
+        value = params.get(name)
+        if value is None:
+            return default
+        if not value.isdigit():
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"'{name}' must be a positive whole number")
+        return int(value)
+
+    async def _list_movies(self, params, body):
+        limit = min(self._number(params, "limit", DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        offset = self._number(params, "offset", 0)
+        if any(params.get(name) for name in ("min_rating", "start_year", "end_year")):
+            if params.get("sort") and params["sort"] != "year":
+                raise HttpError(HTTPStatus.BAD_REQUEST, "Filtered movies are sorted by year")
+            movies = await self._call(self.service.filter, params.get("min_rating"),
+                                      params.get("start_year"), params.get("end_year"),
+                                      limit=offset + limit)
+        elif params.get("sort"):
+            movies = await self._call(self.service.sort, params["sort"], limit=offset + limit)
+        else:
+            movies = await self._call(
+                lambda: list(itertools.islice(self.service.list_movies(), offset + limit)))
+        movies = movies[offset:]
+        return HTTPStatus.OK, {"count": len(movies), "offset": offset, "movies": movies}
+
+    async def _get_movie(self, title, params, body):
+        return HTTPStatus.OK, await self._call(self.service.get_movie, title)
+
+    async def _add_movie(self, params, body):
+        data = self._parse_json(body)
+        title = data.get("title")
+        if data.get("year") is None or data.get("rating") is None:
+            if not (title or "").strip():
+                raise InvalidInputError("A title is required")
+            movie = await asyncio.get_running_loop().run_in_executor(
+                None, self.service.fetch_movie, title.strip())
+            return HTTPStatus.CREATED, await self._call(
+                self.service.add_movie, movie["title"], movie["year"], movie["rating"],
+                movie["poster"], fetched_at=time.time(), imdb_id=movie.get("imdb_id"))
+        return HTTPStatus.CREATED, await self._call(
+            self.service.add_movie, title, data["year"], data["rating"], data.get("poster", ""))
+
+    async def _update_movie(self, title, params, body):
+        data = self._parse_json(body)
+        return HTTPStatus.OK, await self._call(
+            self.service.update_movie, title, data.get("year"), data.get("rating"))
+
+    async def _delete_movie(self, title, params, body):
+        await self._call(self.service.delete_movie, title)
+        return HTTPStatus.OK, {"deleted": title}
+
+    async def _search(self, params, body):
+        query = params.get("q", "")
+        if not query.strip():
+            raise InvalidInputError("Query parameter 'q' is required")
+        return HTTPStatus.OK, {"movies": await self._call(
+            self.service.search, query, limit=self._number(params, "limit", 0) or 5)}
+
+    async def _stats(self, params, body):
+        return HTTPStatus.OK, await self._call(self.service.stats) or {"count": 0}
+
+    async def _detailed_stats(self, params, body):
+        k = params.get("k", "5")
+        if not k.isdigit():
+            raise InvalidInputError("'k' must be a whole number")
+        stats = await self._call(self.service.detailed_stats, k=int(k))
+        stats["percentiles"] = {str(q): value for q, value in stats["percentiles"].items()}
+        stats["by_decade"] = {str(decade): group for decade, group in stats["by_decade"].items()}
+        return HTTPStatus.OK, stats
+
+    async def _random_movie(self, params, body):
+        movie = await self._call(self.service.random_movie)
+        if movie is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "No movies found in the database")
+        return HTTPStatus.OK, movie
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the movie collection as a JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--storage", default="data.csv",
+                        help="storage file (.csv, .json, .db or .col)")
+    parser.add_argument("--journal", action="store_true",
+                        help="with a CSV storage, append changes to a journal file")
+    args = parser.parse_args()
+
+    service = MovieService(CachedStorage(open_storage(args.storage, journal=args.journal)))
+    service.count()  # loads the cache before the first request
+    server = ApiServer(service, args.host, args.port)
+
+    async def run():
+        await server.start()
+        print(f"Serving {args.storage} on http://{server.host}:{server.port}/")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Load test for the JSON API server. Keep-alive clients send a mix of read
+requests (list with limit, single movie, search, filter, sort, stats, random)
+and report throughput and latency percentiles.
+
+Without --url, a server over a synthetic collection is started in this process.
+
+Usage:
+    python -m benchmarks.bench_api [--url http://127.0.0.1:8000] [--movies 10000]
+                                   [--requests 5000] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from urllib.parse import quote, urlsplit
+
+from api_server import ApiServer
+from benchmarks.bench_search import make_titles
+from movie_service import MovieService
+from storage.storage_cached import CachedStorage
+from storage.storage_json import StorageJson
+
+
+def make_paths(titles, count, seed=7):
+    """
+    Builds the request paths of the test run.
+    """
+    rng = random.Random(seed)
+    templates = [
+        lambda: "/movies?limit=20",
+        lambda: "/movies/" + quote(rng.choice(titles), safe=""),
+        lambda: "/search?q=" + quote(rng.choice(titles)[:-1].lower()),
+        lambda: f"/movies?min_rating={rng.randint(5, 9)}&start_year=1990&limit=20",
+        lambda: "/movies?sort=rating&limit=10",
+        lambda: "/stats",
+        lambda: "/random",
+    ]
+    return [rng.choice(templates)() for _ in range(count)]
+
+
+async def client(host, port, paths, latencies, errors):
+    """
+    Sends requests over one keep-alive connection until no paths are left.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while paths:
+            path = paths.pop()
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status >= 500:
+                errors.append(path)
+    finally:
+        writer.close()
+
+
+def percentile(values, q):
+    """
+    Returns the q-th percentile of a sorted list (nearest rank).
+    """
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+async def run(args):
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+        titles = make_titles(1000)
+    else:
+        directory = tempfile.mkdtemp()
+        storage = StorageJson(f"{directory}/movies.json")
+        titles = make_titles(args.movies)
+        rng = random.Random(1)
+        storage.add_many([{"title": title, "year": rng.randint(1950, 2024),
+                           "rating": round(rng.uniform(1, 10), 1), "poster": ""}
+                          for title in titles])
+        service = MovieService(CachedStorage(storage))
+        service.search("warm up")
+        server = ApiServer(service, port=0)
+        await server.start()
+        host, port = server.host, server.port
+
+    paths = make_paths(titles, args.requests)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, paths, latencies, errors)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        await server.close()
+
+    latencies.sort()
+    print(f"requests: {len(latencies)}, concurrency: {args.concurrency}, errors: {len(errors)}")
+    print(f"throughput: {len(latencies) / elapsed:10.1f} requests/s")
+    for q in (50, 90, 99):
+        print(f"p{q} latency: {percentile(latencies, q) * 1000:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the JSON API server.")
+    parser.add_argument("--url", help="server to test; default: start one in this process")
+    parser.add_argument("--movies", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
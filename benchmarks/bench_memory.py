@@ -0,0 +1,76 @@
+"""
+Compares the memory used by the old nested {title: {'year', 'rating', 'poster'}}
+dictionaries with the column-backed MovieCollection, and the time of a full
+iteration over both.
+
+Usage:
+    python -m benchmarks.bench_memory [number of movies]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from benchmarks.bench_search import make_titles
+from storage.movie import MovieCollection
+
+
+def make_movies(titles, seed=42):
+    """
+    Generates (title, year, rating, poster) rows for the given titles.
+    """
+    rng = random.Random(seed)
+    return [(title, rng.randint(1920, 2024), round(rng.uniform(1, 10), 1),
+             f"https://example.com/posters/{i}.jpg")
+            for i, title in enumerate(titles)]
+
+
+def build_dicts(rows):
+    return {title: {'year': year, 'rating': rating, 'poster': poster}
+            for title, year, rating, poster in rows}
+
+
+def build_collection(rows):
+    movies = MovieCollection()
+    for row in rows:
+        movies.add(*row)
+    return movies
+
+
+def measure(build, rows):
+    """
+    Builds a collection and returns it with the bytes it allocated.
+    Titles and posters are shared with the input rows, so only the
+    structure around them is counted.
+    """
+    tracemalloc.start()
+    movies = build(rows)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return movies, size
+
+
+def iterate(movies):
+    """
+    Returns the time in milliseconds of summing all ratings through items().
+    """
+    start = time.perf_counter()
+    sum(data['rating'] for _, data in movies.items())
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = make_movies(make_titles(count))
+
+    dicts, dict_bytes = measure(build_dicts, rows)
+    collection, collection_bytes = measure(build_collection, rows)
+
+    print(f"movies: {count}")
+    print(f"nested dicts:     {dict_bytes / 2**20:8.1f} MiB, iteration {iterate(dicts):7.1f} ms")
+    print(f"MovieCollection:  {collection_bytes / 2**20:8.1f} MiB, iteration {iterate(collection):7.1f} ms")
+    print(f"saved: {1 - collection_bytes / dict_bytes:.0%}")
+
+
+if __name__ == "__main__":
+    main()
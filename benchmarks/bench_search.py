@@ -0,0 +1,85 @@
+"""
+Compares fuzzy search latency of the trigram SearchIndex against the full
+rapidfuzz scan over all titles that _command_search_movie used before.
+
+Usage:
+    python -m benchmarks.bench_search [number of titles] [number of queries]
+"""
+import random
+import sys
+import time
+
+from rapidfuzz import process
+
+from search_index import SearchIndex
+
+WORDS = [
+    "the", "of", "and", "dark", "night", "return", "star", "war", "love", "story",
+    "king", "queen", "last", "first", "man", "woman", "city", "lost", "house", "dead",
+    "blood", "river", "moon", "sun", "empire", "ghost", "shadow", "fire", "ice", "dream",
+    "secret", "game", "road", "time", "world", "hero", "legend", "kingdom", "island", "storm",
+]
+
+
+def make_titles(count, seed=42):
+    """
+    Generates distinct synthetic movie titles.
+
+    Args:
+        count (int): Number of titles.
+        seed (int): Random seed.
+
+    Returns:
+        list: The titles.
+    """
+    rng = random.Random(seed)
+    titles = set()
+    while len(titles) < count:
+        words = rng.sample(WORDS, rng.randint(2, 5))
+        title = " ".join(words).title()
+        if rng.random() < 0.3:
+            title += f" {rng.randint(2, 9)}"
+        titles.add(title)
+    return sorted(titles)
+
+
+def typo(title, rng):
+    """
+    Returns the title in lower case with one character dropped, like a user query.
+    """
+    position = rng.randrange(len(title))
+    return (title[:position] + title[position + 1:]).lower()
+
+
+def measure(search, queries):
+    """
+    Runs all queries and returns the mean latency in milliseconds.
+    """
+    start = time.perf_counter()
+    for query in queries:
+        search(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rng = random.Random(1)
+    titles = make_titles(count)
+    queries = [typo(rng.choice(titles), rng) for _ in range(query_count)]
+
+    start = time.perf_counter()
+    index = SearchIndex(titles)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    full_scan_ms = measure(lambda query: process.extract(query, titles, limit=5), queries)
+    index_ms = measure(lambda query: index.search(query, limit=5, score_cutoff=75), queries)
+
+    print(f"titles: {count}, queries: {query_count}")
+    print(f"index build:        {build_ms:10.1f} ms")
+    print(f"full scan per query: {full_scan_ms:9.2f} ms")
+    print(f"index per query:     {index_ms:9.2f} ms ({full_scan_ms / index_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Measures the cold start of main.py with python -X importtime and guards it
+against regressions.
+
+Each run starts a fresh interpreter that imports main and runs a batch command
+(by default 'list' on an empty collection) and records the import time of every
+module. Modules the bare interpreter loads anyway (site, encodings, ...) are
+left out. The report lists the median total import time, the median wall time
+of the whole process and the slowest modules. The run fails (exit code 1) if
+  - a module of --forbid (default: HEAVY_MODULES) is imported,
+  - the median import time exceeds --max-import-ms, or
+  - it became slower than --threshold times the import time of a --compare report.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 10] [--max-import-ms 150] [--forbid MODULE ...]
+                                       [--output startup.json] [--compare baseline.json]
+                                       [COMMAND ...]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# dependencies that only some commands need and that must not be imported on startup
+HEAVY_MODULES = ("colorama", "rapidfuzz", "requests", "dotenv", "numpy",
+                 "movie_app", "search_index", "movie_stats")
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+SCRIPT = """
+import sys
+sys.argv = ["main.py"] + {argv!r}
+import main
+code = main.main(sys.argv[1:])
+sys.stderr.write("loaded: " + " ".join(sorted(sys.modules)) + "\\n")
+sys.exit(code)
+"""
+
+
+def parse_importtime(stderr, max_depth=1):
+    """
+    Parses the output of python -X importtime.
+
+    Args:
+        stderr (str): Standard error of the interpreter.
+        max_depth (int): 1 for the modules imported by the script itself (including
+                         imports inside functions), 2 to add their direct imports, ...
+
+    Returns:
+        dict: Module names mapped to their cumulative import time in microseconds.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and (len(match.group(3)) + 1) // 2 <= max_depth:  # indented by 2 per level
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+
+def interpreter_modules():
+    """
+    Returns the modules a bare interpreter imports before running any code.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"],
+                            capture_output=True, text=True, check=True)
+    return set(parse_importtime(result.stderr, max_depth=sys.maxsize))
+
+
+def run_once(argv, ignored):
+    """
+    Runs main.py once in a fresh interpreter.
+
+    Args:
+        argv (list): Command line arguments for main.py.
+        ignored (set): Modules left out of the import times (see interpreter_modules).
+
+    Returns:
+        tuple: (top-level modules and their direct imports mapped to their cumulative
+                import time in microseconds, the total import time in microseconds,
+                set of all loaded module names, wall time in seconds).
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", SCRIPT.format(argv=argv)],
+                            cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"main.py {' '.join(argv)} failed:\n{result.stderr[-2000:]}")
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("loaded: "):
+            loaded = set(line[len("loaded: "):].split())
+    total = sum(microseconds for name, microseconds in parse_importtime(result.stderr).items()
+                if name not in ignored)
+    modules = {name: microseconds
+               for name, microseconds in parse_importtime(result.stderr, max_depth=2).items()
+               if name not in ignored}
+    return modules, total, loaded, elapsed
+
+
+def measure(argv, runs, forbidden=HEAVY_MODULES):
+    """
+    Runs main.py several times and summarizes the startup cost.
+
+    Args:
+        argv (list): Command line arguments for main.py.
+        runs (int): Number of runs.
+        forbidden (iterable): Modules the command must not import.
+
+    Returns:
+        dict: 'command', 'runs', 'import_ms' and 'wall_ms' (medians), 'modules' (the
+              15 slowest imports in ms) and 'forbidden_modules' (those that were loaded).
+    """
+    ignored = interpreter_modules()
+    import_times, wall_times, per_module = [], [], {}
+    loaded = set()
+    for _ in range(runs):
+        modules, total, loaded, elapsed = run_once(argv, ignored)
+        import_times.append(total / 1000)
+        wall_times.append(elapsed * 1000)
+        for name, microseconds in modules.items():
+            per_module.setdefault(name, []).append(microseconds / 1000)
+    slowest = sorted(((statistics.median(times), name) for name, times in per_module.items()),
+                     reverse=True)[:15]
+    return {
+        "command": argv,
+        "runs": runs,
+        "import_ms": statistics.median(import_times),
+        "wall_ms": statistics.median(wall_times),
+        "modules": {name: ms for ms, name in slowest},
+        "forbidden_modules": sorted(name for name in forbidden if name in loaded),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the startup time of main.py.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("command", nargs=argparse.REMAINDER,
+                        help="batch command run after startup (default: list)")
+    parser.add_argument("--max-import-ms", type=float,
+                        help="fail if the median import time is above this many milliseconds")
+    parser.add_argument("--forbid", nargs="*", default=HEAVY_MODULES, metavar="MODULE",
+                        help="modules the command must not import (default: the heavy "
+                             "dependencies; pass --forbid without names for none)")
+    parser.add_argument("--output", default="startup_report.json")
+    parser.add_argument("--compare", help="earlier report to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="import time slowdown factor reported as a regression (default: 1.25)")
+    args = parser.parse_args()
+
+    command = args.command or ["list"]
+    with tempfile.TemporaryDirectory() as directory:
+        argv = ["--storage", os.path.join(directory, "movies.json"), *command]
+        report = measure(argv, args.runs, args.forbid)
+    report["command"] = command
+
+    print(f"main.py {' '.join(command)}: import {report['import_ms']:.1f} ms, "
+          f"total {report['wall_ms']:.1f} ms (median of {args.runs} runs)")
+    for name, ms in report["modules"].items():
+        print(f"    {name:<30} {ms:8.2f} ms")
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nReport written to {args.output}")
+
+    failed = False
+    if report["forbidden_modules"]:
+        print(f"REGRESSION: imported on startup: {', '.join(report['forbidden_modules'])}")
+        failed = True
+    if args.max_import_ms is not None and report["import_ms"] > args.max_import_ms:
+        print(f"REGRESSION: import time above {args.max_import_ms} ms")
+        failed = True
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        ratio = report["import_ms"] / baseline["import_ms"]
+        print(f"Compared with baseline: {baseline['import_ms']:.1f} -> {report['import_ms']:.1f} ms "
+              f"({ratio:.2f}x)")
+        if ratio > args.threshold:
+            print("REGRESSION: import time grew beyond the threshold")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Benchmark suite for the storage backends and the MovieApp commands.
+
+For every backend and collection size, a synthetic collection is written to a
+temporary file and the following operations are timed:
+    - the IStorage methods list_movies, add_movie, update_movie and delete_movie
+    - generate_website (WebsiteRenderer.render)
+    - every MovieApp._command_* method, with scripted input, printed output
+      discarded and a stub OMDb client (no network access)
+
+Each case runs in a fresh process, so its peak RSS is not inflated by earlier
+cases. The report is written as JSON with throughput and latency percentiles
+per operation; --compare prints the change against an earlier report, so
+regressions can be spotted between commits.
+
+Usage:
+    python -m benchmarks.bench_suite [--sizes 1000 100000 1000000] [--backends csv json]
+                                     [--repeat 5] [--budget 10] [--cached]
+                                     [--output report.json] [--compare baseline.json]
+"""
+import argparse
+import builtins
+import concurrent.futures
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # resource is POSIX only; peak RSS is then not reported
+    resource = None
+
+from benchmarks.bench_memory import make_movies
+from benchmarks.bench_search import make_titles
+from movie_app import MovieApp
+from storage.factory import BACKENDS, open_storage
+from storage.storage_cached import CachedStorage
+from website_renderer import WebsiteRenderer
+
+EXTENSIONS = {'csv': '.csv', 'json': '.json', 'sqlite': '.db', 'columnar': '.col'}
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "website", "index_template.html")
+
+
+class StubOmdbClient:
+    """
+    Answers every lookup with a made-up movie, so add and import commands can be
+    timed without the network.
+    """
+
+    def fetch(self, title):
+        return {"title": title, "year": 2000, "rating": 7.5, "poster": ""}
+
+
+def percentile(values, q):
+    """
+    Returns the q-th percentile of a sorted list (nearest rank).
+    """
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+def summarize(latencies):
+    """
+    Summarizes the latencies of one operation.
+
+    Args:
+        latencies (list): Durations in seconds.
+
+    Returns:
+        dict: 'runs', 'throughput' (operations per second) and latencies in milliseconds.
+    """
+    latencies = sorted(latencies)
+    total = sum(latencies)
+    return {
+        "runs": len(latencies),
+        "throughput": len(latencies) / total if total else None,
+        "mean_ms": total / len(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def time_operation(operation, repeat, budget):
+    """
+    Runs an operation repeat times, but stops early once budget seconds were spent.
+
+    Args:
+        operation (callable): Called with the run number (0, 1, ...).
+        repeat (int): Number of runs.
+        budget (float): Time limit in seconds; at least one run is always made.
+
+    Returns:
+        dict: See summarize().
+    """
+    latencies = []
+    for run in range(repeat):
+        start = time.perf_counter()
+        operation(run)
+        latencies.append(time.perf_counter() - start)
+        if sum(latencies) > budget:
+            break
+    return summarize(latencies)
+
+
+@contextlib.contextmanager
+def scripted_input(answers):
+    """
+    Replaces input() with the given answers and discards everything printed.
+    """
+    answers = iter(answers)
+    original = builtins.input
+    builtins.input = lambda prompt="": next(answers)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        builtins.input = original
+
+
+def run_case(backend, size, repeat, budget, cached):
+    """
+    Benchmarks one backend with one collection size. Runs in its own process.
+
+    Returns:
+        dict: 'backend', 'size', 'setup_s', 'operations' and 'peak_rss_mib'.
+    """
+    directory = tempfile.mkdtemp(prefix="bench_suite_")
+    try:
+        start = time.perf_counter()
+        rows = make_movies(make_titles(size))
+        storage = open_storage(os.path.join(directory, "movies" + EXTENSIONS[backend]), backend)
+        storage.add_many([{"title": title, "year": year, "rating": rating, "poster": poster}
+                          for title, year, rating, poster in rows])
+        if cached:
+            storage = CachedStorage(storage)
+        setup = time.perf_counter() - start
+
+        website = os.path.join(directory, "website")
+        os.mkdir(website)
+        shutil.copy(TEMPLATE, website)
+        renderer = WebsiteRenderer(output_dir=website)
+        app = MovieApp(storage, omdb_client=StubOmdbClient(), renderer=renderer)
+        titles_file = os.path.join(directory, "titles.txt")
+        existing = [row[0] for row in rows[::max(1, size // repeat)]]
+
+        def app_command(name, answers=lambda run: ()):
+            def operation(run):
+                with scripted_input(answers(run)):
+                    getattr(app, name)()
+            return operation
+
+        def bulk_import(run):
+            with open(titles_file, "w", encoding="utf-8") as file:
+                file.write(f"Imported Movie {run}\n")
+            app_command("_command_bulk_import", lambda run: [titles_file])(run)
+
+        operations = {
+            "list_movies": lambda run: storage.list_movies(),
+            "add_movie": lambda run: storage.add_movie(f"Bench Movie {run}", 2000, 5.0, ""),
+            "update_movie": lambda run: storage.update_movie(existing[run % len(existing)], 2001, 6.0),
+            "delete_movie": lambda run: storage.delete_movie(f"Bench Movie {run}"),
+            "generate_website": lambda run: renderer.render(storage),
+            "_command_list_movies": app_command("_command_list_movies"),
+            "_command_add_movie": app_command("_command_add_movie",
+                                              lambda run: [f"Added Movie {run}"]),
+            "_command_bulk_import": bulk_import,
+            "_command_update_movie": app_command("_command_update_movie",
+                                                 lambda run: [existing[run % len(existing)], "1999", "7.0"]),
+            "_command_delete_movie": app_command("_command_delete_movie",
+                                                 lambda run: [f"Added Movie {run}"]),
+            "_command_movie_stats": app_command("_command_movie_stats"),
+            "_command_detailed_stats": app_command("_command_detailed_stats"),
+            "_command_random_movie": app_command("_command_random_movie"),
+            "_command_search_movie": app_command("_command_search_movie",
+                                                 lambda run: [existing[run % len(existing)][:-1].lower()]),
+            "_command_sort_movies": app_command("_command_sort_movies",
+                                                lambda run: ["1" if run % 2 else "2"]),
+            "_command_filter_movies": app_command("_command_filter_movies",
+                                                  lambda run: ["8", "1990", ""]),
+        }
+        results = {name: time_operation(operation, repeat, budget)
+                   for name, operation in operations.items()}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        "backend": backend,
+        "size": size,
+        "cached": cached,
+        "setup_s": setup,
+        "operations": results,
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def peak_rss_mib():
+    """
+    Returns the peak resident set size of this process in MiB, or None if unknown.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # bytes on macOS, KiB elsewhere
+
+
+def git_commit():
+    """
+    Returns the current git commit, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, threshold):
+    """
+    Prints the p50 latency change of every operation against a baseline report.
+
+    Returns:
+        int: Number of operations that became slower than the threshold allows.
+    """
+    previous = {(case["backend"], case["size"], case.get("cached", False), name): stats
+                for case in baseline["results"] for name, stats in case["operations"].items()}
+    regressions = 0
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} (p50 latency):")
+    for case in report["results"]:
+        for name, stats in case["operations"].items():
+            old = previous.get((case["backend"], case["size"], case["cached"], name))
+            if not old or not old["p50_ms"]:
+                continue
+            ratio = stats["p50_ms"] / old["p50_ms"]
+            flag = ""
+            if ratio > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"  {case['backend']:>8} {case['size']:>8} {name:<24} "
+                  f"{old['p50_ms']:10.2f} -> {stats['p50_ms']:10.2f} ms ({ratio:5.2f}x){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark storage backends and MovieApp commands.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000],
+                        help="collection sizes (default: 1000 100000; add 1000000 for the large run)")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=5, help="runs per operation")
+    parser.add_argument("--budget", type=float, default=10.0,
+                        help="seconds per operation after which no further runs start")
+    parser.add_argument("--cached", action="store_true", help="wrap the backends in CachedStorage")
+    parser.add_argument("--output", default="bench_report.json")
+    parser.add_argument("--compare", help="earlier report to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="p50 slowdown factor reported as a regression (default: 1.25)")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": args.repeat,
+        "results": [],
+    }
+    context = multiprocessing.get_context("spawn")
+    for size in args.sizes:
+        for backend in args.backends:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                case = executor.submit(run_case, backend, size, args.repeat, args.budget,
+                                       args.cached).result()
+            report["results"].append(case)
+            print(f"{backend:>8} {size:>8} movies: setup {case['setup_s']:.1f} s, "
+                  f"peak RSS {case['peak_rss_mib'] or 0:.0f} MiB")
+            for name, stats in case["operations"].items():
+                print(f"    {name:<24} p50 {stats['p50_ms']:10.2f} ms  p99 {stats['p99_ms']:10.2f} ms  "
+                      f"{stats['throughput']:10.1f} ops/s")
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nReport written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
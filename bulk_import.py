@@ -0,0 +1,168 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from omdb_api import OmdbError, get_default_client
+
+
+class RateLimiter:
+    """
+    Spaces out calls so that at most a given number happen per second.
+    Safe to share between threads.
+    """
+
+    def __init__(self, requests_per_second):
+        """
+        Args:
+            requests_per_second (float): Allowed calls per second, or None for no limit.
+        """
+        self._interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """
+        Blocks until the caller is allowed to make the next call.
+        """
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def read_titles(path):
+    """
+    Reads movie titles from a text file, one title per line.
+    Blank lines, lines starting with '#' and duplicate titles are skipped.
+
+    Args:
+        path (str): Path to the file with titles.
+
+    Returns:
+        list: The titles in file order.
+    """
+    titles = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            title = line.strip()
+            if title and not title.startswith("#"):
+                titles.setdefault(title, None)
+    return list(titles)
+
+
+def fetch_many(titles, fetch=None, max_workers=8, requests_per_second=5.0,
+               retries=3, backoff=0.5, progress=None):
+    """
+    Fetches movie data for many titles concurrently.
+    Transient errors are retried with exponential backoff, all requests
+    (including retries) share one rate limit. Any error of a title, including
+    unexpected ones like an undecodable answer, is reported in the failures.
+
+    Args:
+        titles (list): Titles (or, with fetch=OmdbClient.fetch_by_id, IMDb IDs) to fetch.
+        fetch (callable): Function that takes a title and returns movie data or raises
+                          OmdbError, defaults to the shared OmdbClient's fetch.
+        max_workers (int): Number of worker threads.
+        requests_per_second (float): Maximum request rate, or None for no limit.
+        retries (int): How often a transient error is retried.
+        backoff (float): Delay in seconds before the first retry, doubled for every retry.
+        progress (callable): Called as progress(done, total, title, error) after each
+                             title, where error is None on success.
+
+    Returns:
+        tuple: (list of movie data dictionaries in title order,
+                dict mapping failed titles to their error message)
+    """
+    fetch = fetch or get_default_client().fetch
+    limiter = RateLimiter(requests_per_second)
+
+    def fetch_with_retry(title):
+        for attempt in range(retries + 1):
+            limiter.wait()
+            try:
+                return fetch(title)
+            except OmdbError as e:
+                if not e.transient or attempt == retries:
+                    raise
+            time.sleep(backoff * 2 ** attempt)
+
+    results = {}
+    failures = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_with_retry, title): title for title in titles}
+        for done, future in enumerate(as_completed(futures), start=1):
+            title = futures[future]
+            error = None
+            try:
+                results[title] = future.result()
+            except Exception as e:  # one broken answer must not discard the other results
+                error = failures[title] = str(e) if isinstance(e, OmdbError) else repr(e)
+            if progress:
+                progress(done, len(futures), title, error)
+
+    return [results[title] for title in titles if title in results], failures
+
+
+def import_titles(storage, titles, **kwargs):
+    """
+    Fetches movie data for many titles and adds the movies to the storage
+    in one batched write, stamped with the time they were fetched.
+
+    Args:
+        storage (IStorage): Storage to add the movies to.
+        titles (list): Titles to fetch.
+        **kwargs: Passed on to fetch_many.
+
+    Returns:
+        tuple: (list of added movie data dictionaries,
+                dict mapping failed titles to their error message)
+    """
+    movies, failures = fetch_many(titles, **kwargs)
+    if movies:
+        fetched_at = time.time()
+        storage.add_many([{**movie, "fetched_at": fetched_at} for movie in movies])
+    return movies, failures
+
+
+def import_search(storage, query, client=None, limit=10, **kwargs):
+    """
+    Searches OMDb for a query and adds the found movies to the storage.
+    Search results are deduplicated by IMDb ID, movies whose ID is already stored
+    are skipped, and the details of the others are fetched concurrently by ID and
+    added in one batched write. A movie whose title is already taken by a different
+    movie (e.g. a remake) is stored as 'Title (Year)'; a stored movie with the same
+    title but without IMDb ID is taken to be the same movie and replaced.
+
+    Args:
+        storage (IStorage): Storage to add the movies to.
+        query (str): Search words.
+        client (OmdbClient): Client for the OMDb API, defaults to the shared client.
+        limit (int): Maximum number of search results to consider.
+        **kwargs: Passed on to fetch_many.
+
+    Returns:
+        tuple: (list of added movie data dictionaries,
+                dict mapping failed IMDb IDs to their error message)
+    """
+    client = client or get_default_client()
+    imdb_ids = [result["imdb_id"] for result in client.search(query, max_results=limit)
+                if storage.get_by_imdb_id(result["imdb_id"]) is None]
+    movies, failures = fetch_many(imdb_ids, fetch=client.fetch_by_id, **kwargs)
+
+    added = []
+    titles = set()
+    for movie in movies:
+        stored = storage.get_movie(movie["title"])
+        if movie["title"] in titles or (stored is not None
+                                        and stored.imdb_id not in (None, movie["imdb_id"])):
+            movie = {**movie, "title": f"{movie['title']} ({movie['year']})"}
+        titles.add(movie["title"])
+        added.append(movie)
+    if added:
+        fetched_at = time.time()
+        storage.add_many([{**movie, "fetched_at": fetched_at} for movie in added])
+    return added, failures
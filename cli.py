@@ -0,0 +1,286 @@
+"""
+Non-interactive command line interface for scripts and batch jobs.
+
+Every subcommand writes its results to stdout as newline-delimited JSON (one
+object per line) or as CSV, and reports problems on stderr with a non-zero exit
+code. Results are written while they are produced, so large listings can be
+piped into other tools without being held in memory.
+
+Usage:
+    python main.py [--storage FILE] [--backend TYPE] [--journal] [--format ndjson|csv]
+                   [--report FILE] [--trace FILE] COMMAND ...
+
+Commands:
+    list    [--sort rating|year|title] [--limit N]
+    add     TITLE [--year YEAR --rating RATING] [--poster URL]
+    import  FILE
+    ingest  QUERY [--limit N]
+    search  QUERY [--limit N]
+    filter  [--min-rating R] [--start-year Y] [--end-year Y] [--limit N]
+    stats   [--detailed]
+    render  [--output-dir DIR] [--page-size N]
+    refresh [--limit N] [--max-age DAYS] [--rate R]
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+
+import instrumentation
+from bulk_import import read_titles
+from movie_service import SORT_ORDERS, MovieService, ServiceError
+from omdb_api import OmdbError
+from refresh import DAY, RefreshScheduler
+from storage.factory import BACKENDS, open_storage
+from website_renderer import WebsiteRenderer
+
+FORMATS = ("ndjson", "csv")
+
+
+class RecordWriter:
+    """
+    Writes flat dictionaries to a text stream as NDJSON or CSV.
+    For CSV, the header is taken from the keys of the first record and list
+    values (e.g. genres) are joined with commas.
+    """
+
+    def __init__(self, stream, output_format="ndjson"):
+        """
+        Args:
+            stream (file): Text stream to write to.
+            output_format (str): 'ndjson' or 'csv'.
+        """
+        self.stream = stream
+        self.output_format = output_format
+        self._csv_writer = None
+
+    def write(self, record):
+        """
+        Writes one record.
+
+        Args:
+            record (dict): Field names mapped to JSON serializable values.
+        """
+        if self.output_format == "ndjson":
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return
+        if any(isinstance(value, list) for value in record.values()):
+            record = {key: ", ".join(value) if isinstance(value, list) else value
+                      for key, value in record.items()}
+        if self._csv_writer is None:
+            self._csv_writer = csv.DictWriter(self.stream, fieldnames=list(record),
+                                              extrasaction="ignore", lineterminator="\n")
+            self._csv_writer.writeheader()
+        self._csv_writer.writerow(record)
+
+    def write_all(self, records):
+        """
+        Writes all records of an iterable.
+
+        Returns:
+            int: Number of records written.
+        """
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+
+def build_parser():
+    """
+    Builds the argument parser. Without a command, main.py starts the interactive menu.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(
+        description="Manage the movie database. Without a command, the interactive menu starts.")
+    parser.add_argument("--storage", default="data.csv",
+                        help="storage file (default: data.csv)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS),
+                        help="storage type; by default told from the file extension")
+    parser.add_argument("--journal", action="store_true",
+                        help="with a CSV storage, append changes to a journal file instead of "
+                             "rewriting the file; the journal is merged back once it is large")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson", dest="output_format",
+                        help="output format (default: ndjson)")
+    parser.add_argument("--report", metavar="FILE",
+                        help="record timings and write a JSON report of the session on exit")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record timings and write them as Chrome trace event JSON on exit")
+    parser.add_argument("--refresh-interval", type=float, metavar="SECONDS",
+                        help="in the interactive menu, refresh stale OMDb data in the background "
+                             "every SECONDS")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    command = commands.add_parser("list", help="list all movies")
+    command.add_argument("--sort", choices=sorted(SORT_ORDERS),
+                         help="sort by rating (best first), year or title; default: storage order")
+    command.add_argument("--limit", type=int)
+
+    command = commands.add_parser("add", help="add a movie, fetched from OMDb unless year and rating are given")
+    command.add_argument("title")
+    command.add_argument("--year", type=int)
+    command.add_argument("--rating", type=float)
+    command.add_argument("--poster", default="")
+
+    command = commands.add_parser("import", help="import the titles of a text file from OMDb")
+    command.add_argument("file", help="text file with one title per line")
+
+    command = commands.add_parser("ingest", help="search OMDb and add the movies that are not stored yet")
+    command.add_argument("query")
+    command.add_argument("--limit", type=int, default=10,
+                         help="search results to consider (default: 10)")
+
+    command = commands.add_parser("search", help="fuzzy search the titles")
+    command.add_argument("query")
+    command.add_argument("--limit", type=int, default=5)
+
+    command = commands.add_parser("filter", help="movies matching a minimum rating and year range")
+    command.add_argument("--min-rating", type=float)
+    command.add_argument("--start-year", type=int)
+    command.add_argument("--end-year", type=int)
+    command.add_argument("--limit", type=int)
+
+    command = commands.add_parser("stats", help="rating statistics")
+    command.add_argument("--detailed", action="store_true",
+                         help="one record per decade instead of the summary")
+
+    command = commands.add_parser("render", help="generate the website")
+    command.add_argument("--output-dir", default="website")
+    command.add_argument("--page-size", type=int)
+
+    command = commands.add_parser("refresh", help="fetch the movies with the oldest OMDb data again")
+    command.add_argument("--limit", type=int, default=10, help="movies to fetch (default: 10)")
+    command.add_argument("--max-age", type=float, default=7.0,
+                         help="days after which data counts as stale (default: 7)")
+    command.add_argument("--rate", type=float, default=1.0,
+                         help="maximum OMDb requests per second (default: 1)")
+    return parser
+
+
+def run(args, stdout=None, stderr=None, omdb_client=None):
+    """
+    Runs a parsed command.
+
+    Args:
+        args (argparse.Namespace): Arguments from build_parser().
+        stdout (file): Stream for the results, defaults to sys.stdout.
+        stderr (file): Stream for error messages, defaults to sys.stderr.
+        omdb_client (OmdbClient): Client for 'add', 'import' and 'refresh', defaults to
+                                  the shared client.
+
+    Returns:
+        int: Exit code, 0 on success.
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    try:
+        service = MovieService(open_storage(args.storage, args.backend, args.journal),
+                               omdb_client=omdb_client)
+        writer = RecordWriter(stdout, args.output_format)
+        with instrumentation.span("cli." + args.command):
+            code = COMMANDS[args.command](service, args, writer, stderr)
+        wait_for_compaction = getattr(service.storage, "wait_for_compaction", None)
+        if wait_for_compaction is not None:
+            wait_for_compaction()  # a journal merge started by the command
+        return code
+    except BrokenPipeError:
+        raise  # the reader of the output exited early, see main.py
+    except (ServiceError, OmdbError, ValueError, OSError) as e:
+        print(f"Error: {e}", file=stderr)
+        return 1
+
+
+def _list(service, args, writer, stderr):
+    if args.sort:
+        movies = service.sort(args.sort, limit=args.limit)
+    else:
+        movies = itertools.islice(service.list_movies(), args.limit)
+    writer.write_all(movies)
+    return 0
+
+
+def _add(service, args, writer, stderr):
+    if (args.year is None) != (args.rating is None):
+        print("Error: --year and --rating must be given together", file=stderr)
+        return 2
+    writer.write(service.add_movie(args.title, args.year, args.rating, args.poster))
+    return 0
+
+
+def _import(service, args, writer, stderr):
+    movies, failures = service.import_titles(read_titles(args.file))
+    writer.write_all(movies)
+    for title, error in failures.items():
+        print(f"Error: {title}: {error}", file=stderr)
+    return 1 if failures else 0
+
+
+def _ingest(service, args, writer, stderr):
+    movies, failures = service.import_search(args.query, limit=args.limit)
+    writer.write_all(movies)
+    for imdb_id, error in failures.items():
+        print(f"Error: {imdb_id}: {error}", file=stderr)
+    return 1 if failures else 0
+
+
+def _search(service, args, writer, stderr):
+    writer.write_all(service.search(args.query, limit=args.limit))
+    return 0
+
+
+def _filter(service, args, writer, stderr):
+    writer.write_all(service.filter(args.min_rating, args.start_year, args.end_year,
+                                    limit=args.limit))
+    return 0
+
+
+def _stats(service, args, writer, stderr):
+    if args.detailed:
+        stats = service.detailed_stats(k=0)
+        for decade, group in stats["by_decade"].items():
+            writer.write({"decade": decade, "count": group["count"], "average": group["average"],
+                          "best_title": group["best"][0], "best_rating": group["best"][1]})
+        return 0
+
+    stats = service.stats()
+    if stats is None:
+        writer.write({"count": 0})
+        return 0
+    writer.write({"count": stats["count"], "average": stats["average"], "median": stats["median"],
+                  "best_title": stats["best"][0], "best_rating": stats["best"][1],
+                  "worst_title": stats["worst"][0], "worst_rating": stats["worst"][1]})
+    return 0
+
+
+def _render(service, args, writer, stderr):
+    renderer = WebsiteRenderer(output_dir=args.output_dir, page_size=args.page_size)
+    writer.write({"output_dir": args.output_dir, "pages_written": renderer.render(service.storage)})
+    return 0
+
+
+def _refresh(service, args, writer, stderr):
+    scheduler = RefreshScheduler(service.storage, client=service.omdb_client,
+                                 batch_size=args.limit, max_age=args.max_age * DAY,
+                                 requests_per_second=args.rate)
+    movies, failures = scheduler.refresh_once()
+    writer.write_all(movies)
+    for title, error in failures.items():
+        print(f"Error: {title}: {error}", file=stderr)
+    return 1 if failures else 0
+
+
+COMMANDS = {
+    "list": _list,
+    "add": _add,
+    "import": _import,
+    "ingest": _ingest,
+    "search": _search,
+    "filter": _filter,
+    "stats": _stats,
+    "render": _render,
+    "refresh": _refresh,
+}
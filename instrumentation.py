@@ -0,0 +1,328 @@
+"""
+Lightweight timing instrumentation for the hot paths (storage, OMDb, website).
+
+Spans measure how long a block or function takes, counters count events. Both
+are off by default: a disabled span() returns a shared no-op context manager and
+a @traced function only checks one flag, so the overhead is negligible.
+
+    import instrumentation
+
+    instrumentation.enable()
+    with instrumentation.span("website.render"):
+        ...
+    instrumentation.count("omdb.cache_hit")
+    instrumentation.write_report("session.json")  # counters and histograms per span
+    instrumentation.write_trace("trace.json")     # open in chrome://tracing or Perfetto
+
+main.py enables it with --report FILE and --trace FILE.
+"""
+import bisect
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+# upper bounds in milliseconds of the histogram buckets; the last bucket is open
+BUCKETS_MS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+MAX_EVENTS = 100_000
+
+_NULL_SPAN = contextlib.nullcontext()
+_enabled = False
+_session = None
+
+
+class Histogram:
+    """
+    Durations of one span name, counted in fixed buckets (see BUCKETS_MS),
+    so memory use does not grow with the number of calls.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, duration_ms):
+        """
+        Records one duration.
+
+        Args:
+            duration_ms (float): Duration in milliseconds.
+        """
+        self.counts[bisect.bisect_left(BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+
+    def percentile(self, q):
+        """
+        Estimates a percentile as the upper bound of the bucket it falls into
+        (capped at the largest recorded duration).
+
+        Args:
+            q (float): Percentile between 0 and 100.
+
+        Returns:
+            float: Duration in milliseconds, 0.0 without recorded durations.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, round(self.count * q / 100))
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        """
+        Returns:
+            dict: 'count', 'total_ms', 'mean_ms', 'p50_ms', 'p90_ms', 'p99_ms',
+                  'max_ms' and 'buckets' (upper bound in ms, or 'inf', mapped to a count).
+        """
+        bounds = [str(bound) for bound in BUCKETS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+            "buckets": {bound: count for bound, count in zip(bounds, self.counts) if count},
+        }
+
+
+class Session:
+    """
+    Collects the spans and counters recorded while instrumentation is enabled.
+    Besides the histograms, up to max_events spans are kept as trace events;
+    later ones are only counted in 'dropped_events'.
+    """
+
+    def __init__(self, max_events=MAX_EVENTS):
+        """
+        Args:
+            max_events (int): Maximum number of spans kept for the trace.
+        """
+        self.max_events = max_events
+        self.started = time.time()
+        self.origin_ns = time.perf_counter_ns()
+        self.histograms = {}
+        self.counters = {}
+        self.events = []
+        self.dropped_events = 0
+        self._lock = threading.Lock()
+
+    def record(self, name, start_ns, end_ns, args=None):
+        """
+        Records a finished span.
+
+        Args:
+            name (str): Span name, e.g. 'storage.csv.write_batch'.
+            start_ns (int): time.perf_counter_ns() at the start.
+            end_ns (int): time.perf_counter_ns() at the end.
+            args (dict): Optional details shown in the trace viewer.
+        """
+        duration_ms = (end_ns - start_ns) / 1e6
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(duration_ms)
+            if len(self.events) < self.max_events:
+                self.events.append((name, start_ns, end_ns, threading.get_ident(), args))
+            else:
+                self.dropped_events += 1
+
+    def count(self, name, value=1):
+        """
+        Adds a value to a counter.
+
+        Args:
+            name (str): Counter name, e.g. 'omdb.cache_hit'.
+            value (int): Amount to add.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self):
+        """
+        Returns:
+            dict: 'started', 'duration_s', 'counters', 'spans' (name mapped to
+                  Histogram.summary(), slowest total first) and 'dropped_events'.
+        """
+        with self._lock:
+            spans = sorted(self.histograms.items(), key=lambda item: -item[1].total_ms)
+            return {
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "duration_s": (time.perf_counter_ns() - self.origin_ns) / 1e9,
+                "counters": dict(sorted(self.counters.items())),
+                "spans": {name: histogram.summary() for name, histogram in spans},
+                "dropped_events": self.dropped_events,
+            }
+
+    def trace_events(self):
+        """
+        Returns the spans and final counter values in the Chrome trace event format.
+
+        Returns:
+            dict: {'traceEvents': [...], 'displayTimeUnit': 'ms'}.
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = [{"name": name, "cat": name.split(".", 1)[0], "ph": "X",
+                       "ts": (start_ns - self.origin_ns) / 1000, "dur": (end_ns - start_ns) / 1000,
+                       "pid": pid, "tid": tid, "args": args or {}}
+                      for name, start_ns, end_ns, tid, args in self.events]
+            end = (time.perf_counter_ns() - self.origin_ns) / 1000
+            events.extend({"name": name, "ph": "C", "ts": end, "pid": pid, "tid": 0,
+                           "args": {"value": value}}
+                          for name, value in self.counters.items())
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+class _Span:
+    """
+    Context manager that records its duration in the session it was created for.
+    """
+    __slots__ = ("_session", "_name", "_args", "_start")
+
+    def __init__(self, session, name, args):
+        self._session = session
+        self._name = name
+        self._args = args
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        args = self._args
+        if exc_type is not None:
+            args = dict(args or {}, error=exc_type.__name__)
+        self._session.record(self._name, self._start, time.perf_counter_ns(), args)
+
+
+def enable(max_events=MAX_EVENTS):
+    """
+    Starts a new session and turns instrumentation on.
+
+    Args:
+        max_events (int): Maximum number of spans kept for the trace.
+
+    Returns:
+        Session: The new session.
+    """
+    global _enabled, _session
+    _session = Session(max_events)
+    _enabled = True
+    return _session
+
+
+def disable():
+    """
+    Turns instrumentation off. The last session stays available for reports.
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    """
+    Returns:
+        bool: True while spans and counters are recorded.
+    """
+    return _enabled
+
+
+def current_session():
+    """
+    Returns:
+        Session or None: The last session started with enable().
+    """
+    return _session
+
+
+def span(name, **args):
+    """
+    Measures the duration of a with block.
+
+    Args:
+        name (str): Span name; the part before the first '.' is its category.
+        **args: Details shown in the trace viewer.
+
+    Returns:
+        context manager: A recording span, or a shared no-op one if disabled.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(_session, name, args or None)
+
+
+def traced(name):
+    """
+    Decorator that wraps every call of a function in a span.
+
+    Args:
+        name (str): Span name.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Span(_session, name, None):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1):
+    """
+    Adds a value to a counter; does nothing if instrumentation is disabled.
+
+    Args:
+        name (str): Counter name.
+        value (int): Amount to add.
+    """
+    if _enabled:
+        _session.count(name, value)
+
+
+def report():
+    """
+    Returns:
+        dict or None: Session.report() of the current session, None if none was started.
+    """
+    return _session.report() if _session is not None else None
+
+
+def write_report(path):
+    """
+    Writes the report of the current session as JSON.
+
+    Args:
+        path (str): Output file.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report(), file, indent=2)
+
+
+def write_trace(path):
+    """
+    Writes the current session as Chrome trace event JSON, which can be opened
+    in chrome://tracing or https://ui.perfetto.dev.
+
+    Args:
+        path (str): Output file.
+    """
+    events = _session.trace_events() if _session is not None else {"traceEvents": []}
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(events, file)
@@ -1,18 +1,67 @@
-from colorama import Fore, Style
-from storage.storage_csv import StorageCsv
-from movie_app import MovieApp
+import os
+import sys
 
-def main():
+from storage.factory import open_storage
+from storage.storage_cached import CachedStorage
+from omdb_api import OmdbClient
+from omdb_cache import OmdbCache
+from refresh import RefreshScheduler
+import cli
+import instrumentation
+
+# batch commands that may look movies up on OMDb and therefore open the response cache
+OMDB_COMMANDS = {"add", "import", "ingest", "refresh"}
+
+def main(argv=None):
     """
     Entry point for the movie database application.
-    Initializes the storage backend and starts the MovieApp.
+    Runs a batch command if one is given (see cli.py), otherwise initializes the
+    storage backend and starts the interactive MovieApp menu.
+    Modules that only some commands need (the menu, colorama, rapidfuzz, requests)
+    are imported by those commands, so short batch commands start quickly.
+    With --refresh-interval, stale OMDb data is fetched again in the background
+    while the menu runs (see refresh.py). With --report or --trace, timings are
+    recorded (see instrumentation.py) and written when the program ends.
+
+    Args:
+        argv (list): Command line arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: Exit code.
     """
-    storage = StorageCsv("data.csv")  # or "john.json", etc.
-    app = MovieApp(storage)
-    app.run()
+    args = cli.build_parser().parse_args(argv)
+    if args.report or args.trace:
+        instrumentation.enable()
+    try:
+        if args.command and args.command not in OMDB_COMMANDS:
+            return cli.run(args)
+        with OmdbClient(cache=OmdbCache("omdb_cache.db")) as omdb_client:
+            if args.command:
+                return cli.run(args, omdb_client=omdb_client)
+            from movie_app import MovieApp
+            storage = CachedStorage(open_storage(args.storage, args.backend, args.journal))
+            app = MovieApp(storage, omdb_client=omdb_client)
+            if args.refresh_interval:
+                with RefreshScheduler(storage, client=omdb_client, interval=args.refresh_interval):
+                    app.run()
+            else:
+                app.run()
+        return 0
+    finally:
+        if args.report:
+            instrumentation.write_report(args.report)
+        if args.trace:
+            instrumentation.write_trace(args.trace)
 
 if __name__ == "__main__":
     try:
-        main()
+        sys.exit(main())
     except KeyboardInterrupt:
+        from colorama import Fore, Style
         print(Fore.RED + "\nProgram terminated by user." + Style.RESET_ALL)
+    except BrokenPipeError:
+        # the reader of the output (e.g. 'head') exited early; point stdout at
+        # devnull so flushing it at exit does not fail again
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
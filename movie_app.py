@@ -1,7 +1,10 @@
-import random
+import time
+
 from colorama import Fore, Style
-from rapidfuzz import process
 from omdb_api import fetch_movie_data
+from bulk_import import read_titles
+from movie_service import MovieService, UnknownMovieError
+from website_renderer import WebsiteRenderer
 
 
 
@@ -11,29 +14,37 @@ class MovieApp:
     It interacts with a storage backend (implementing IStorage) to manage movie records,
     and provides various features such as listing, adding, updating, deleting,
     searching, sorting, filtering, and viewing statistics about movies.
+    The operations themselves are carried out by a MovieService; the commands
+    read the user input and print the results.
     """
-    def __init__(self, storage):
+    def __init__(self, storage, omdb_client=None, renderer=None):
         """
         Initializes the MovieApp with the given storage backend.
         Args:
             storage (IStorage): An instance of a storage class implementing the IStorage interface.
+            omdb_client (OmdbClient): Client for the OMDb API, defaults to the shared client.
+            renderer (WebsiteRenderer): Renderer for the website, defaults to a single
+                                        page in the 'website' directory.
         """
         self._storage = storage
+        self._omdb_client = omdb_client
+        self._renderer = renderer or WebsiteRenderer()
+        self._service = MovieService(storage, omdb_client=omdb_client)
 
 
     def _command_list_movies(self):
         """
         Lists all movies stored in the database.
-        Displays the movie title, rating, and release year. If no movies exist,
-        an appropriate message is shown.
+        Displays the movie title, rating, and release year. Movies are printed while
+        they are read from storage. If no movies exist, an appropriate message is shown.
         """
-        movies = self._storage.list_movies()
-        if not movies:
-            print(Fore.RED + "No movies found in the database" + Style.RESET_ALL)
-            return
+        found = False
+        for movie in self._service.list_movies():
+            print(f"{movie['title']}: {movie['rating']} (Released: {movie['year']})")
+            found = True
 
-        for titel, data in movies.items():
-            print(f"{titel}: {data['rating']} (Released: {data['year']})")
+        if not found:
+            print(Fore.RED + "No movies found in the database" + Style.RESET_ALL)
 
     def _command_add_movie(self):
         """
@@ -42,23 +53,44 @@ class MovieApp:
         If not found or the API is unreachable, appropriate feedback is shown.
         """
         title = input("Enter the movie title: ").strip()
-        data = fetch_movie_data(title)
+        data = fetch_movie_data(title, client=self._omdb_client)
 
         if data:
-            self._storage.add_movie(
-                title=data["title"],
-                year=data["year"],
-                rating=data["rating"],
-                poster=data["poster"]
-            )
+            self._service.add_movie(data["title"], data["year"], data["rating"], data["poster"],
+                                    fetched_at=time.time(), imdb_id=data.get("imdb_id"))
             print(
                 Fore.GREEN + f"\nMovie '{data['title']}' added successfully." + Style.RESET_ALL)
-            self._storage.generate_website()
+            self._renderer.generate(self._storage)
 
         else:
             print(
                 Fore.RED + "\nFailed to fetch movie data. Please try another title." + Style.RESET_ALL)
 
+    def _command_bulk_import(self):
+        """
+        Prompts the user for a text file with one movie title per line and adds
+        all of them. Movie data is fetched concurrently from the OMDb API and
+        the found movies are saved to storage in one batch.
+        """
+        path = input("Enter the path of the file with movie titles: ").strip()
+        try:
+            titles = read_titles(path)
+        except OSError as e:
+            print(Fore.RED + f"\nCould not read file: {e}" + Style.RESET_ALL)
+            return
+
+        def report(done, total, title, error):
+            if error:
+                print(Fore.RED + f"[{done}/{total}] {title}: {error}" + Style.RESET_ALL)
+            else:
+                print(f"[{done}/{total}] {title}")
+
+        movies, failures = self._service.import_titles(titles, progress=report)
+        print(Fore.GREEN + f"\n{len(movies)} movies imported, {len(failures)} failed."
+              + Style.RESET_ALL)
+        if movies:
+            self._renderer.generate(self._storage)
+
     def _command_update_movie(self):
         """
         Prompts the user to update an existing movie's information.
@@ -67,7 +99,11 @@ class MovieApp:
         title = input("Enter the movie title to update: ")
         year = int(input("Enter the new release year: "))
         rating = float(input("Enter the new rating (1.0 - 10.0): "))
-        self._storage.update_movie(title, year, rating)
+        try:
+            self._service.update_movie(title, year, rating)
+        except UnknownMovieError as e:
+            print(Fore.RED + str(e) + Style.RESET_ALL)
+            return
         print(f"Movie '{title}' updated successfully.")
 
 
@@ -77,9 +113,13 @@ class MovieApp:
         Displays a success message after deletion.
         """
         title = input("Enter the movie title to delete: ")
-        self._storage.delete_movie(title)
+        try:
+            self._service.delete_movie(title)
+        except UnknownMovieError as e:
+            print(Fore.RED + str(e) + Style.RESET_ALL)
+            return
         print(f"Movie '{title}' deleted successfully.")
-        self._storage.generate_website()
+        self._renderer.generate(self._storage)
 
 
     def _command_movie_stats(self):
@@ -94,29 +134,63 @@ class MovieApp:
 
         If the database is empty, a message is shown.
         """
-        movies = self._storage.list_movies()
-        if not movies:
+        stats = self._service.stats()
+        if not stats:
             print(Fore.RED + "No movies found in the database" + Style.RESET_ALL)
             return
 
-        ratings = [data['rating'] for data in movies.values()]
-        average_rating = sum(ratings) / len(ratings)
-
-        sorted_ratings = sorted(ratings)
-        mid = len(sorted_ratings) // 2
-        median_rating = (
-            sorted_ratings[mid]
-            if len(sorted_ratings) % 2
-            else (sorted_ratings[mid - 1] + sorted_ratings[mid]) / 2
-        )
-
-        best = max(movies.items(), key=lambda x: movies[x]['rating'])
-        worst = min(movies.items(), key=lambda x: movies[x]['rating'])
+        average_rating = stats['average']
+        median_rating = stats['median']
+        best = stats['best']
+        worst = stats['worst']
 
         print(f"Average rating: {average_rating:.2f}")
         print(f"Median rating: {median_rating:.2f}")
-        print(f"Best movie: {best[0]} ({best[1]['rating']})")
-        print(f"Worst movie: {worst[0]} ({worst[1]['rating']})")
+        print(f"Best movie: {best[0]} ({best[1]})")
+        print(f"Worst movie: {worst[0]} ({worst[1]})")
+
+
+    def _command_detailed_stats(self):
+        """
+        Displays a detailed breakdown of the ratings in the database.
+
+        The breakdown includes:
+            - Rating percentiles
+            - A histogram of the ratings
+            - Movie count, average and best movie per decade
+            - The 5 best and 5 worst movies
+
+        If the database is empty, a message is shown.
+        """
+        stats = self._service.detailed_stats(k=5)
+        if not stats['count']:
+            print(Fore.RED + "No movies found in the database" + Style.RESET_ALL)
+            return
+
+        print(f"Movies: {stats['count']}, average rating: {stats['mean']:.2f}, "
+              f"median rating: {stats['median']:.2f}")
+        print("\nPercentiles:")
+        for q, value in stats['percentiles'].items():
+            print(f"  {q:>3}%: {value:.2f}")
+
+        print("\nRatings:")
+        largest = max(count for _, _, count in stats['histogram'])
+        for low, high, count in stats['histogram']:
+            bar = "#" * round(count / largest * 40) if largest else ""
+            print(f"  {low:4.1f} - {high:4.1f}: {bar} {count}")
+
+        print("\nBy decade:")
+        for decade, group in stats['by_decade'].items():
+            best_title, best_rating = group['best']
+            print(f"  {decade}s: {group['count']} movies, average {group['average']:.2f}, "
+                  f"best: {best_title} ({best_rating})")
+
+        print("\nTop 5:")
+        for title, rating in stats['top']:
+            print(f"  {title}: {rating}")
+        print("\nBottom 5:")
+        for title, rating in stats['bottom']:
+            print(f"  {title}: {rating}")
 
 
     def _command_random_movie(self):
@@ -124,15 +198,13 @@ class MovieApp:
         Selects and displays a random movie from the database.
         Shows the title, rating, and release year. Displays a message if no movies exist.
         """
-        movies = self._storage.list_movies()
-        if not movies:
+        movie = self._service.random_movie()
+        if not movie:
             print(Fore.RED + "No movies found in the database" + Style.RESET_ALL)
             return
 
-        title = random.choice(list(movies.keys()))
-        rating = movies[title]['rating']
-        year = movies[title]['year']
-        print(f"Your movie for tonight: {title}, it's rated {rating}. It was released {year}")
+        print(f"Your movie for tonight: {movie['title']}, it's rated {movie['rating']}. "
+              f"It was released {movie['year']}")
 
 
     def _command_search_movie(self):
@@ -140,23 +212,23 @@ class MovieApp:
         Prompts the user to search for a movie using fuzzy matching.
         Displays up to 5 results that match the search term with a score of 75 or higher.
         If no matches are found, a message is displayed.
+
+        The search index is built on the first search and kept in sync by the
+        add, delete and bulk import commands.
         """
-        movies = self._storage.list_movies()
-        if not movies:
+        if not self._service.count():
             print(Fore.RED + "No movies found in the database" + Style.RESET_ALL)
             return
 
-        query = input("Enter the movie title to search: ").strip().lower()
-        matches = process.extract(query, movies.keys(), limit=5)
-        relevant = [(title, score) for title, score, _ in matches if score >= 75]
+        query = input("Enter the movie title to search: ").strip()
+        relevant = self._service.search(query, limit=5, score_cutoff=75)
 
         if relevant:
             print("Found the following matches:")
-            for title, _ in relevant:
-                data = movies[title]
-                print(f"{title}: {data['rating']} (Released: {data['year']})")
-            else:
-                print(Fore.RED + "No matches found." + Style.RESET_ALL)
+            for movie in relevant:
+                print(f"{movie['title']}: {movie['rating']} (Released: {movie['year']})")
+        else:
+            print(Fore.RED + "No matches found." + Style.RESET_ALL)
 
 
     def _command_sort_movies(self):
@@ -164,8 +236,7 @@ class MovieApp:
         Prompts the user to sort movies either by rating (descending) or by year (ascending).
         The sorted movies are displayed with their rating and release year.
         """
-        movies = self._storage.list_movies()
-        if not movies:
+        if not self._service.count():
             print(Fore.RED + "No movies found in the database" + Style.RESET_ALL)
             return
 
@@ -175,15 +246,15 @@ class MovieApp:
         choice = input("Enter your choice (1 or 2): ").strip()
 
         if choice == "1":
-            sorted_movies = sorted(movies.items(), key=lambda x: x[1]['rating'], reverse=True)
+            sorted_movies = self._service.sort("rating")
         elif choice == "2":
-            sorted_movies = sorted(movies.items(), key=lambda x: x[1]['year'])
+            sorted_movies = self._service.sort("year")
         else:
             print(Fore.RED + "Invalid choice." + Style.RESET_ALL)
             return
 
-        for title, data in sorted_movies:
-            print(f"{title}: {data['rating']} (Released: {data['year']})")
+        for movie in sorted_movies:
+            print(f"{movie['title']}: {movie['rating']} (Released: {movie['year']})")
 
 
     def _command_filter_movies(self):
@@ -197,8 +268,7 @@ class MovieApp:
 
         Only movies matching all criteria are displayed. If no movies match, a message is shown.
         """
-        movies = self._storage.list_movies()
-        if not movies:
+        if not self._service.count():
             print(Fore.RED + "No movies found in the database" + Style.RESET_ALL)
             return
 
@@ -210,20 +280,14 @@ class MovieApp:
         start_year = int(start_year) if start_year else None
         end_year = int(end_year) if end_year else None
 
-        filtered_movies = {
-            title: data
-            for title, data in movies.items()
-            if (min_rating is None or data['rating'] >= min_rating)
-            and (start_year is None or data['year'] >= start_year)
-            and (end_year is None or data['year'] <= end_year)
-        }
+        filtered_movies = self._service.filter(min_rating, start_year, end_year)
 
         if not filtered_movies:
             print(Fore.RED + "No movies match the filter criteria." + Style.RESET_ALL)
             return
         else:
-            for title, data in sorted(filtered_movies.items(), key=lambda x: x[1]['year']):
-                print(f"{title}: {data['rating']} (Released: {data['year']})")
+            for movie in filtered_movies:
+                print(f"{movie['title']}: {movie['rating']} (Released: {movie['year']})")
 
     def run(self):
         """
@@ -244,9 +308,11 @@ class MovieApp:
             print(Fore.GREEN + "8." + Style.RESET_ALL + " Sort movies")
             print(Fore.GREEN + "9." + Style.RESET_ALL + " Filter movies")
             print(Fore.GREEN + "10." + Style.RESET_ALL + " Generate website")
+            print(Fore.GREEN + "11." + Style.RESET_ALL + " Bulk import movies")
+            print(Fore.GREEN + "12." + Style.RESET_ALL + " Detailed statistics")
             print(Fore.YELLOW + "0." + Style.RESET_ALL + " Exit")
 
-            choice = input("\nEnter your choice (0–10): ").strip()
+            choice = input("\nEnter your choice (0–12): ").strip()
 
             if choice == "1":
                 self._command_list_movies()
@@ -267,7 +333,11 @@ class MovieApp:
             elif choice == "9":
                 self._command_filter_movies()
             elif choice == "10":
-                self._storage.generate_website()
+                self._renderer.generate(self._storage)
+            elif choice == "11":
+                self._command_bulk_import()
+            elif choice == "12":
+                self._command_detailed_stats()
             elif choice == "0":
                 print(Fore.YELLOW + "\nGoodbye!" + Style.RESET_ALL)
                 break
@@ -0,0 +1,354 @@
+import time
+
+import instrumentation
+from bulk_import import import_search, import_titles
+from omdb_api import get_default_client
+
+SORT_ORDERS = {"rating": "-rating", "year": "year", "title": "title"}
+
+
+class ServiceError(Exception):
+    """
+    Raised when a MovieService operation cannot be carried out.
+    """
+
+
+class UnknownMovieError(ServiceError):
+    """
+    Raised when an operation refers to a title that is not stored.
+    """
+
+
+class InvalidInputError(ServiceError):
+    """
+    Raised when an operation gets a value it cannot use, e.g. a year that is not a number.
+    """
+
+
+def movie_to_dict(title, data):
+    """
+    Converts a stored movie into a plain dictionary, e.g. for JSON output.
+
+    Args:
+        title (str): Movie title.
+        data (Movie): The movie record.
+
+    Returns:
+        dict: 'title', 'year', 'rating' and 'poster'.
+    """
+    return {"title": title, "year": data["year"], "rating": data["rating"],
+            "poster": data.get("poster") or ""}
+
+
+class MovieService:
+    """
+    Non-interactive operations on a movie collection.
+    MovieApp uses it for its menu commands and the HTTP API server exposes it as
+    JSON endpoints. Results are plain dictionaries and lists; problems are raised
+    as ServiceError instead of being printed. The search index is built on the
+    first search and kept in sync by the add, delete and import operations.
+    """
+
+    def __init__(self, storage, omdb_client=None):
+        """
+        Args:
+            storage (IStorage): The storage with the movies.
+            omdb_client (OmdbClient): Client for the OMDb API, defaults to the shared client.
+        """
+        self.storage = storage
+        self.omdb_client = omdb_client
+        self._search_index = None
+
+    def list_movies(self):
+        """
+        Iterates over all movies in storage order.
+
+        Yields:
+            dict: 'title', 'year', 'rating' and 'poster' of each movie.
+        """
+        for title, data in self.storage.iter_movies():
+            yield movie_to_dict(title, data)
+
+    def count(self):
+        """
+        Returns the number of stored movies.
+        """
+        return self.storage.count()
+
+    def get_movie(self, title):
+        """
+        Looks up a movie by its exact title.
+
+        Args:
+            title (str): Movie title.
+
+        Returns:
+            dict: 'title', 'year', 'rating' and 'poster'.
+
+        Raises:
+            UnknownMovieError: If the movie is not stored.
+        """
+        data = self.storage.get_movie(title)
+        if data is None:
+            raise UnknownMovieError(f"Movie '{title}' not found")
+        return movie_to_dict(title, data)
+
+    def fetch_movie(self, title):
+        """
+        Fetches movie data for a title from the OMDb API without storing it.
+
+        Args:
+            title (str): Title to look up.
+
+        Returns:
+            dict: 'title', 'year', 'rating' and 'poster'.
+
+        Raises:
+            OmdbError: If the movie cannot be fetched (MovieNotFoundError if it does not exist).
+        """
+        return (self.omdb_client or get_default_client()).fetch(title)
+
+    @instrumentation.traced("service.add_movie")
+    def add_movie(self, title, year=None, rating=None, poster="", fetched_at=None, imdb_id=None):
+        """
+        Adds a movie. Without year and rating, the movie data is fetched from OMDb.
+
+        Args:
+            title (str): Movie title.
+            year (int): Release year, or None to fetch the movie.
+            rating (float): IMDb rating, or None to fetch the movie.
+            poster (str): Poster URL.
+            fetched_at (float): Time the given data was fetched from OMDb, or None
+                                if it was entered by hand.
+            imdb_id (str): IMDb ID of the given data, or None.
+
+        Returns:
+            dict: The added movie.
+
+        Raises:
+            InvalidInputError: If the title is empty or year or rating are not numbers.
+            OmdbError: If the movie data has to be fetched and that fails.
+        """
+        title = (title or "").strip()
+        if not title:
+            raise InvalidInputError("A title is required")
+        if year is None or rating is None:
+            movie = self.fetch_movie(title)
+            fetched_at = time.time()
+        else:
+            movie = {"title": title, "year": _to_int(year, "year"),
+                     "rating": _to_float(rating, "rating"), "poster": poster or ""}
+            if imdb_id:
+                movie["imdb_id"] = imdb_id
+
+        self.storage.add_many([{**movie, "fetched_at": fetched_at}])
+        if self._search_index is not None:
+            self._search_index.add(movie["title"])
+        return movie
+
+    @instrumentation.traced("service.import_titles")
+    def import_titles(self, titles, progress=None):
+        """
+        Fetches many titles concurrently from OMDb and stores the found movies in one batch.
+
+        Args:
+            titles (list): Titles to import.
+            progress (callable): Called as progress(done, total, title, error) per title.
+
+        Returns:
+            tuple: (list of added movie dictionaries, dict mapping failed titles to errors)
+        """
+        fetch = self.omdb_client.fetch if self.omdb_client else None
+        movies, failures = import_titles(self.storage, titles, fetch=fetch, progress=progress)
+        if self._search_index is not None:
+            for movie in movies:
+                self._search_index.add(movie["title"])
+        return movies, failures
+
+    @instrumentation.traced("service.import_search")
+    def import_search(self, query, limit=10, progress=None):
+        """
+        Searches OMDb and stores the found movies that are not stored yet (by IMDb ID)
+        in one batch; their details are fetched concurrently.
+
+        Args:
+            query (str): Search words.
+            limit (int): Maximum number of search results to consider.
+            progress (callable): Called as progress(done, total, imdb_id, error) per movie.
+
+        Returns:
+            tuple: (list of added movie dictionaries, dict mapping failed IMDb IDs to errors)
+        """
+        movies, failures = import_search(self.storage, query, client=self.omdb_client,
+                                         limit=limit, progress=progress)
+        if self._search_index is not None:
+            for movie in movies:
+                self._search_index.add(movie["title"])
+        return movies, failures
+
+    @instrumentation.traced("service.update_movie")
+    def update_movie(self, title, year, rating):
+        """
+        Updates the year and rating of a stored movie.
+
+        Args:
+            title (str): Movie title.
+            year (int): New release year.
+            rating (float): New rating.
+
+        Returns:
+            dict: The updated movie.
+
+        Raises:
+            InvalidInputError: If year or rating are not numbers.
+            UnknownMovieError: If the movie is not stored.
+        """
+        year, rating = _to_int(year, "year"), _to_float(rating, "rating")
+        movie = self.get_movie(title)
+        self.storage.update_movie(title, year, rating)
+        movie.update(year=year, rating=rating)
+        return movie
+
+    @instrumentation.traced("service.delete_movie")
+    def delete_movie(self, title):
+        """
+        Deletes a stored movie.
+
+        Args:
+            title (str): Movie title.
+
+        Raises:
+            UnknownMovieError: If the movie is not stored.
+        """
+        self.get_movie(title)
+        self.storage.delete_movie(title)
+        if self._search_index is not None:
+            self._search_index.remove(title)
+
+    @instrumentation.traced("service.stats")
+    def stats(self):
+        """
+        Returns the basic rating statistics.
+
+        Returns:
+            dict or None: 'count', 'average', 'median', 'best' and 'worst', where best
+                          and worst are (title, rating) tuples. None if no movies exist.
+        """
+        return self.storage.aggregate_ratings()
+
+    @instrumentation.traced("service.detailed_stats")
+    def detailed_stats(self, k=5):
+        """
+        Returns the detailed rating breakdown (see MovieStats.summary).
+
+        Args:
+            k (int): Number of movies in the top and bottom lists.
+
+        Returns:
+            dict: 'count', 'mean', 'median', 'percentiles', 'histogram',
+                  'by_decade', 'top' and 'bottom'.
+        """
+        from movie_stats import MovieStats  # loads NumPy, so only when needed
+        return MovieStats.from_storage(self.storage).summary(k=k)
+
+    @instrumentation.traced("service.random_movie")
+    def random_movie(self):
+        """
+        Picks a random movie.
+
+        Returns:
+            dict or None: The movie, or None if no movies exist.
+        """
+        sample = self.storage.random_sample(1)
+        return movie_to_dict(*sample[0]) if sample else None
+
+    @instrumentation.traced("service.search")
+    def search(self, query, limit=5, score_cutoff=75):
+        """
+        Fuzzy searches the titles.
+
+        Args:
+            query (str): The search term.
+            limit (int): Maximum number of results.
+            score_cutoff (float): Minimum match score (0-100).
+
+        Returns:
+            list: Movie dictionaries with an additional 'score', best match first.
+        """
+        if self._search_index is None:
+            from search_index import SearchIndex  # loads rapidfuzz, so only when needed
+            self._search_index = SearchIndex.from_storage(self.storage)
+        results = []
+        for title, score in self._search_index.search(query, limit=limit, score_cutoff=score_cutoff):
+            data = self.storage.get_movie(title)
+            if data:
+                results.append({**movie_to_dict(title, data), "score": score})
+        return results
+
+    @instrumentation.traced("service.sort")
+    def sort(self, by, limit=None):
+        """
+        Returns the movies sorted by rating (best first), year or title.
+
+        Args:
+            by (str): 'rating', 'year' or 'title'.
+            limit (int): Maximum number of movies, or None for all.
+
+        Returns:
+            list: Movie dictionaries.
+
+        Raises:
+            InvalidInputError: For an unknown sort order.
+        """
+        if by not in SORT_ORDERS:
+            raise InvalidInputError(f"Cannot sort by '{by}'")
+        return [movie_to_dict(title, data)
+                for title, data in self.storage.query(order_by=SORT_ORDERS[by], limit=limit)]
+
+    @instrumentation.traced("service.filter")
+    def filter(self, min_rating=None, start_year=None, end_year=None, limit=None):
+        """
+        Returns the movies matching all given criteria, ordered by year.
+
+        Args:
+            min_rating (float): Minimum rating, or None.
+            start_year (int): First release year, or None.
+            end_year (int): Last release year, or None.
+            limit (int): Maximum number of movies, or None for all.
+
+        Returns:
+            list: Movie dictionaries.
+
+        Raises:
+            InvalidInputError: If a criterion is not a number.
+        """
+        min_rating = _to_float(min_rating, "min_rating", optional=True)
+        year_range = (_to_int(start_year, "start_year", optional=True),
+                      _to_int(end_year, "end_year", optional=True))
+        return [movie_to_dict(title, data)
+                for title, data in self.storage.query(min_rating=min_rating, year_range=year_range,
+                                                      order_by="year", limit=limit)]
+
+
+def _to_int(value, name, optional=False):
+    """
+    Converts a value to int, raising InvalidInputError with the field name if that fails.
+    """
+    if optional and value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise InvalidInputError(f"'{name}' must be a whole number") from None
+
+
+def _to_float(value, name, optional=False):
+    """
+    Converts a value to float, raising InvalidInputError with the field name if that fails.
+    """
+    if optional and value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise InvalidInputError(f"'{name}' must be a number") from None
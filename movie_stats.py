@@ -0,0 +1,258 @@
+import heapq
+import math
+from array import array
+
+try:
+    import numpy
+except ImportError:  # numpy is optional, the array based fallback gives the same results
+    numpy = None
+
+
+class MovieStats:
+    """
+    Columnar statistics engine for a movie collection.
+    Ratings and years are kept in flat typed columns (NumPy arrays when NumPy is
+    installed, array.array otherwise), so every statistic is computed in a single
+    pass over contiguous numbers instead of over per-movie dictionaries.
+    """
+
+    def __init__(self, titles, years, ratings):
+        """
+        Args:
+            titles (list): Movie titles.
+            years (array): Release years, in the same order as the titles.
+            ratings (array): Ratings, in the same order as the titles.
+        """
+        self.titles = titles
+        if numpy is not None:
+            self.years = numpy.asarray(years, dtype=numpy.int64)
+            self.ratings = numpy.asarray(ratings, dtype=numpy.float64)
+        else:
+            self.years = years
+            self.ratings = ratings
+        self._sorted_ratings = None
+
+    @classmethod
+    def from_movies(cls, movies):
+        """
+        Builds the columns from (title, data) tuples.
+
+        Args:
+            movies (iterable): (title, data) tuples, where data has 'year' and 'rating'.
+
+        Returns:
+            MovieStats: The statistics engine.
+        """
+        titles = []
+        years = array('q')
+        ratings = array('d')
+        for title, data in movies:
+            titles.append(title)
+            years.append(int(data['year']))
+            ratings.append(float(data['rating']))
+        return cls(titles, years, ratings)
+
+    @classmethod
+    def from_storage(cls, storage):
+        """
+        Builds the columns from all movies of a storage backend.
+
+        Args:
+            storage (IStorage): The storage to read.
+
+        Returns:
+            MovieStats: The statistics engine.
+        """
+        return cls.from_movies(storage.iter_movies())
+
+    def __len__(self):
+        return len(self.titles)
+
+    def mean(self):
+        """
+        Returns the average rating, or None for an empty collection.
+        """
+        if not self.titles:
+            return None
+        if numpy is not None:
+            return float(self.ratings.mean())
+        return math.fsum(self.ratings) / len(self.ratings)
+
+    def median(self):
+        """
+        Returns the median rating, or None for an empty collection.
+        """
+        return self.percentile(50)
+
+    def percentile(self, q):
+        """
+        Returns a rating percentile, interpolating linearly between ratings.
+
+        Args:
+            q (float): Percentile between 0 and 100.
+
+        Returns:
+            float or None: The percentile, or None for an empty collection.
+        """
+        return self.percentiles([q])[q]
+
+    def percentiles(self, qs):
+        """
+        Returns several rating percentiles (see percentile).
+
+        Args:
+            qs (list): Percentiles between 0 and 100.
+
+        Returns:
+            dict: Percentile mapped to its rating (None for an empty collection).
+        """
+        if not self.titles:
+            return {q: None for q in qs}
+        if numpy is not None:
+            return {q: float(value) for q, value in zip(qs, numpy.percentile(self.ratings, qs))}
+
+        ratings = self._sorted()
+        result = {}
+        for q in qs:
+            position = (len(ratings) - 1) * q / 100
+            lower = math.floor(position)
+            upper = min(lower + 1, len(ratings) - 1)
+            result[q] = ratings[lower] + (ratings[upper] - ratings[lower]) * (position - lower)
+        return result
+
+    def histogram(self, bins=10, low=0.0, high=10.0):
+        """
+        Counts the ratings in equally wide bins.
+
+        Args:
+            bins (int): Number of bins.
+            low (float): Lower edge of the first bin.
+            high (float): Upper edge of the last bin (included in the last bin).
+
+        Returns:
+            list: (lower edge, upper edge, count) tuples.
+        """
+        width = (high - low) / bins
+        edges = [low + i * width for i in range(bins)] + [high]
+        if numpy is not None:
+            counts = numpy.histogram(self.ratings, bins=bins, range=(low, high))[0].tolist()
+        else:
+            counts = [0] * bins
+            for rating in self.ratings:
+                if low <= rating <= high:
+                    counts[min(int((rating - low) / width), bins - 1)] += 1
+        return [(edges[i], edges[i + 1], counts[i]) for i in range(bins)]
+
+    def by_decade(self):
+        """
+        Groups the movies by release decade.
+
+        Returns:
+            dict: Decade (e.g. 1990) mapped to a dictionary with 'count',
+                  'average' and 'best' ((title, rating) of the best movie),
+                  ordered by decade.
+        """
+        groups = {}
+        if numpy is not None and self.titles:
+            decades = self.years // 10 * 10
+            keys, inverse = numpy.unique(decades, return_inverse=True)
+            counts = numpy.bincount(inverse)
+            sums = numpy.bincount(inverse, weights=self.ratings)
+            order = numpy.lexsort((-self.ratings, inverse))
+            firsts = numpy.searchsorted(inverse[order], numpy.arange(len(keys)))
+            for i, decade in enumerate(keys.tolist()):
+                best = int(order[firsts[i]])
+                groups[decade] = {
+                    'count': int(counts[i]),
+                    'average': float(sums[i] / counts[i]),
+                    'best': (self.titles[best], float(self.ratings[best]))
+                }
+            return groups
+
+        for title, year, rating in zip(self.titles, self.years, self.ratings):
+            group = groups.setdefault(year // 10 * 10, {'count': 0, 'sum': 0.0, 'best': None})
+            group['count'] += 1
+            group['sum'] += rating
+            if group['best'] is None or rating > group['best'][1]:
+                group['best'] = (title, rating)
+        return {decade: {'count': group['count'],
+                         'average': group['sum'] / group['count'],
+                         'best': group['best']}
+                for decade, group in sorted(groups.items())}
+
+    def top(self, k):
+        """
+        Returns the k best rated movies, best first.
+
+        Args:
+            k (int): Number of movies.
+
+        Returns:
+            list: (title, rating) tuples.
+        """
+        return self._extremes(k, best=True)
+
+    def bottom(self, k):
+        """
+        Returns the k worst rated movies, worst first.
+
+        Args:
+            k (int): Number of movies.
+
+        Returns:
+            list: (title, rating) tuples.
+        """
+        return self._extremes(k, best=False)
+
+    def summary(self, k=5, qs=(10, 25, 50, 75, 90)):
+        """
+        Computes all statistics at once.
+
+        Args:
+            k (int): Number of movies in the top and bottom lists.
+            qs (tuple): Percentiles to compute.
+
+        Returns:
+            dict: 'count', 'mean', 'median', 'percentiles', 'histogram',
+                  'by_decade', 'top' and 'bottom'.
+        """
+        percentiles = self.percentiles(sorted(set(qs) | {50}))
+        return {
+            'count': len(self),
+            'mean': self.mean(),
+            'median': percentiles[50],
+            'percentiles': {q: percentiles[q] for q in qs},
+            'histogram': self.histogram(),
+            'by_decade': self.by_decade(),
+            'top': self.top(k),
+            'bottom': self.bottom(k)
+        }
+
+    def _extremes(self, k, best):
+        """
+        Returns the k best or worst movies; ties keep collection order.
+        """
+        if k <= 0:
+            return []
+        if numpy is not None:
+            keys = -self.ratings if best else self.ratings
+            if k < len(self.titles):
+                candidates = numpy.argpartition(keys, k)[:k]
+                threshold = keys[candidates].max()
+                candidates = numpy.flatnonzero(keys <= threshold)
+            else:
+                candidates = numpy.arange(len(self.titles))
+            order = candidates[numpy.argsort(keys[candidates], kind='stable')][:k]
+            return [(self.titles[i], float(self.ratings[i])) for i in order.tolist()]
+
+        select = heapq.nlargest if best else heapq.nsmallest
+        indexes = select(k, range(len(self.titles)), key=self.ratings.__getitem__)
+        return [(self.titles[i], self.ratings[i]) for i in indexes]
+
+    def _sorted(self):
+        """
+        Returns the ratings in ascending order, sorting them only once.
+        """
+        if self._sorted_ratings is None:
+            self._sorted_ratings = sorted(self.ratings)
+        return self._sorted_ratings
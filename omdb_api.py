@@ -1,43 +1,394 @@
 import os
-import requests
-from dotenv import load_dotenv
+import re
+import threading
 
-load_dotenv()
+import instrumentation
 
-API_KEY = os.getenv("OMDB_API_KEY")
 BASE_URL = "http://www.omdbapi.com/"
+TIMEOUT = 10
+SEARCH_PAGE_SIZE = 10  # results per page of the search endpoint
+NOT_FOUND_ERRORS = ("Movie not found!", "Incorrect IMDb ID.")
+_NUMBER = re.compile(r"\d+")
+_YEAR = re.compile(r"\d{4}")
 
-def fetch_movie_data(title):
+_api_key_lock = threading.Lock()
+_dotenv_loaded = False
+
+
+def get_api_key():
+    """
+    Returns the OMDb API key from the OMDB_API_KEY environment variable.
+    The .env file is loaded on the first call instead of at import time, so
+    commands that never reach the API do not pay for python-dotenv.
+
+    Returns:
+        str or None: The API key, None if it is not set.
+    """
+    global _dotenv_loaded
+    with _api_key_lock:
+        if not _dotenv_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _dotenv_loaded = True
+    return os.getenv("OMDB_API_KEY")
+
+
+def _parse_text(value):
+    """
+    Returns an OMDb text value, or None for missing values ('N/A' or empty).
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    return None if value in ("", "N/A") else value
+
+
+def _parse_int(value):
+    """
+    Parses the first number of an OMDb value ('1,234,567', '148 min'), or None.
+    """
+    match = _NUMBER.search((_parse_text(value) or "").replace(",", ""))
+    return int(match.group()) if match else None
+
+
+def _parse_year(value):
+    """
+    Parses a release year; for ranges like '2010–2013' the first year, or None.
+    """
+    match = _YEAR.search(_parse_text(value) or "")
+    return int(match.group()) if match else None
+
+
+def _parse_float(value):
+    """
+    Parses a decimal number like '8.8', or None.
+    """
+    try:
+        return float(_parse_text(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_movie(data):
+    """
+    Converts an OMDb movie answer into typed movie data. Missing values ('N/A')
+    become None, except year, rating and poster, which every stored movie needs:
+    they become 0, 0.0 and '' as before. For series the first year of the run
+    ('2010–2013') is used.
+
+    Args:
+        data (dict): The decoded answer of a title or ID lookup.
+
+    Returns:
+        dict: 'title', 'year' (int), 'rating' (float), 'poster' (str), 'imdb_id' (str),
+              'genre' (list of str), 'runtime' (int, minutes), 'director' (str) and
+              'votes' (int).
+    """
+    genre = _parse_text(data.get("Genre"))
+    return {
+        "title": data.get("Title"),
+        "year": _parse_year(data.get("Year")) or 0,
+        "rating": _parse_float(data.get("imdbRating")) or 0.0,
+        "poster": _parse_text(data.get("Poster")) or "",
+        "imdb_id": _parse_text(data.get("imdbID")),
+        "genre": [name.strip() for name in genre.split(",")] if genre else [],
+        "runtime": _parse_int(data.get("Runtime")),
+        "director": _parse_text(data.get("Director")),
+        "votes": _parse_int(data.get("imdbVotes")),
+    }
+
+
+class OmdbError(Exception):
+    """
+    Raised when a movie cannot be fetched from the OMDb API.
+    Transient errors (connection problems, rate limiting, server errors)
+    may succeed when the request is retried.
+    """
+
+    def __init__(self, message, transient=False):
+        super().__init__(message)
+        self.transient = transient
+
+
+class MovieNotFoundError(OmdbError):
+    """
+    Raised when the OMDb API does not know the requested title.
+    """
+
+
+class OmdbClient:
+    """
+    Client for the OMDb API.
+    Owns a requests.Session with a keep-alive connection pool, so repeated
+    lookups (bulk imports, refreshes) reuse warm connections. Only failed
+    connection attempts are retried by the session (with exponential backoff);
+    429/5xx answers are raised as transient OmdbErrors, so callers retry them
+    within their own rate limit (see bulk_import.fetch_many) instead of the
+    session sending more requests behind its back.
+    requests and the session are only loaded on the first lookup that reaches
+    the API, so creating a client is cheap.
+    """
+
+    def __init__(self, api_key=None, base_url=BASE_URL, timeout=TIMEOUT, pool_size=10,
+                 retries=2, backoff_factor=0.3, cache=None):
+        """
+        Initializes the client. The connection pool is created on first use.
+
+        Args:
+            api_key (str): OMDb API key, defaults to OMDB_API_KEY from the environment
+                           (or the .env file), looked up on the first request.
+            base_url (str): OMDb API URL.
+            timeout (float): Request timeout in seconds.
+            pool_size (int): Maximum number of kept-alive connections per host.
+                             Should be at least the number of threads using the client.
+            retries (int): How often a failed connection attempt is retried by the session.
+            backoff_factor (float): Base delay in seconds between connection retries.
+            cache (OmdbCache): Optional response cache. Found movies and "Movie not
+                               found" answers of title and ID lookups are served
+                               from and stored in it.
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache = cache
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        The requests.Session with the connection pool, created on first access.
+        """
+        session = self._session
+        if session is not None:
+            return session
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                retry = Retry(
+                    total=self.retries,
+                    connect=self.retries,
+                    read=0,
+                    status=0,
+                    other=0,
+                    backoff_factor=self.backoff_factor,
+                    allowed_methods=("GET",)
+                )
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size,
+                                      max_retries=retry)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    @instrumentation.traced("omdb.fetch")
+    def fetch(self, title, refresh=False):
+        """
+        Fetches movie data for a title and raises an error if that fails.
+
+        Args:
+            title (str): Title of the movie to search for.
+            refresh (bool): Skip the cache lookup and ask the API; the answer is
+                            still stored in the cache.
+
+        Returns:
+            dict: Movie data, see parse_movie.
+
+        Raises:
+            MovieNotFoundError: If the API does not know the title.
+            OmdbError: If the API key is missing or the request failed.
+        """
+        return self._fetch_details(title, {"t": title}, refresh)
+
+    @instrumentation.traced("omdb.fetch_by_id")
+    def fetch_by_id(self, imdb_id, refresh=False):
+        """
+        Fetches movie data for an IMDb ID and raises an error if that fails.
+        Unlike a title lookup, the ID names exactly one movie.
+
+        Args:
+            imdb_id (str): IMDb ID of the movie, e.g. 'tt1375666'.
+            refresh (bool): Skip the cache lookup and ask the API; the answer is
+                            still stored in the cache.
+
+        Returns:
+            dict: Movie data, see parse_movie.
+
+        Raises:
+            MovieNotFoundError: If the API does not know the ID.
+            OmdbError: If the API key is missing or the request failed.
+        """
+        return self._fetch_details(imdb_id, {"i": imdb_id}, refresh)
+
+    @instrumentation.traced("omdb.search")
+    def search(self, query, max_results=10):
+        """
+        Searches movies with the OMDb search endpoint, page by page. Search answers
+        are not cached, since new movies keep being added.
+
+        Args:
+            query (str): Search words.
+            max_results (int): Maximum number of movies to return.
+
+        Returns:
+            list: Dictionaries with 'imdb_id', 'title' and 'year', in OMDb's order and
+                  without duplicate IDs. Empty if nothing was found.
+
+        Raises:
+            OmdbError: If the API key is missing, the request failed or OMDb answered
+                       with an error other than 'Movie not found!' (e.g. 'Too many
+                       results.' for a too short query).
+        """
+        results = {}
+        page = 1
+        while len(results) < max_results:
+            try:
+                data = self._request({"s": query, "type": "movie", "page": page})
+            except MovieNotFoundError:
+                break
+            hits = data.get("Search") or []
+            for hit in hits:
+                imdb_id = _parse_text(hit.get("imdbID"))
+                if imdb_id is not None and imdb_id not in results:
+                    results[imdb_id] = {"imdb_id": imdb_id, "title": hit.get("Title"),
+                                        "year": _parse_year(hit.get("Year"))}
+            total = _parse_int(data.get("totalResults")) or 0
+            if not hits or page * SEARCH_PAGE_SIZE >= total:
+                break
+            page += 1
+        return list(results.values())[:max_results]
+
+    def _fetch_details(self, key, params, refresh):
+        """
+        Looks up a movie in the cache or else with the API (see fetch).
+
+        Args:
+            key (str): Cache key, the title or IMDb ID.
+            params (dict): Query parameters of the lookup.
+            refresh (bool): Skip the cache lookup.
+        """
+        if self.cache is not None and not refresh:
+            found, data = self.cache.get(key)
+            if found:
+                instrumentation.count("omdb.cache_hit")
+                if data is None:
+                    raise MovieNotFoundError(f"Movie not found: {key} (cached)")
+                return data
+            instrumentation.count("omdb.cache_miss")
+
+        try:
+            data = parse_movie(self._request(params))
+        except MovieNotFoundError:
+            if self.cache is not None:
+                self.cache.put(key, None)
+            raise
+        if self.cache is not None:
+            self.cache.put(key, data)
+        return data
+
+    @instrumentation.traced("omdb.request")
+    def _request(self, params):
+        """
+        Sends a request to the OMDb API.
+
+        Args:
+            params (dict): Query parameters besides the API key.
+
+        Returns:
+            dict: The decoded answer.
+
+        Raises:
+            MovieNotFoundError: If the answer is that nothing was found.
+            OmdbError: If the API key is missing, the request failed or the answer is
+                       another error (e.g. 'Too many results.'). 'Request limit
+                       reached!' is transient.
+        """
+        if not self.api_key:
+            self.api_key = get_api_key()
+        if not self.api_key:
+            raise OmdbError("OMDb API key not found. Please check your .env file.")
+
+        import requests
+        try:
+            response = self.session.get(self.base_url,
+                                        params={"apikey": self.api_key, **params},
+                                        timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise OmdbError(f"Request error: {e}", transient=True) from e
+
+        instrumentation.count(f"omdb.status_{response.status_code}")
+        if response.status_code != 200:
+            transient = response.status_code == 429 or response.status_code >= 500
+            raise OmdbError(f"Error: Status code {response.status_code}", transient=transient)
+
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise OmdbError(f"Invalid response from OMDb: {e}", transient=True) from e
+        if not isinstance(data, dict):
+            raise OmdbError("Invalid response from OMDb: not a JSON object", transient=True)
+        if data.get("Response") != "True":
+            error = data.get("Error")
+            if error in NOT_FOUND_ERRORS:
+                raise MovieNotFoundError(f"Movie not found: {error}")
+            raise OmdbError(f"OMDb error: {error}", transient=error == "Request limit reached!")
+        return data
+
+    def close(self):
+        """
+        Closes all pooled connections.
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """
+    Returns the shared client used when no client is passed explicitly.
+
+    Returns:
+        OmdbClient: The shared client.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = OmdbClient()
+        return _default_client
+
+
+@instrumentation.traced("omdb.fetch_movie_data")
+def fetch_movie_data(title, client=None):
     """
     Fetches movie data from the OMDb API using the given title.
 
     Args:
         title (str): Title of the movie to search for.
+        client (OmdbClient): Client to use, defaults to the shared client.
 
     Returns:
         dict or None: Dictionary with movie data if found, otherwise None.
     """
-    if not API_KEY:
-        print("OMDb API key not found. Please check your .env file.")
-        return None
-
     try:
-        response = requests.get(BASE_URL, params={"apikey": API_KEY, "t": title})
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("Response") == "True":
-                return {
-                    "title": data.get("Title"),
-                    "year": int(data.get("Year", 0)),
-                    "rating": float(data.get("imdbRating", 0)),
-                    "poster": data.get("Poster")
-                }
-            else:
-                print(f"Movie not found: {data.get('Error')}")
-        else:
-            print(f"Error: Status code {response.status_code}")
-    except requests.exceptions.RequestException as e:
-        print(f"Request error: {e}")
-
+        return (client or get_default_client()).fetch(title)
+    except OmdbError as e:
+        print(e)
     return None
-
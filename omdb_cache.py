@@ -0,0 +1,141 @@
+import json
+import sqlite3
+import threading
+import time
+
+DAY = 24 * 60 * 60
+
+
+def normalize_title(title):
+    """
+    Normalizes a movie title for use as cache key (case and whitespace insensitive).
+
+    Args:
+        title (str): The movie title.
+
+    Returns:
+        str: The normalized title.
+    """
+    return " ".join(title.casefold().split())
+
+
+class OmdbCache:
+    """
+    Persistent cache for OMDb API responses, stored in a SQLite file.
+    Entries are keyed by normalized title and expire after a TTL. "Movie not found"
+    answers are cached as well (with their own TTL). When the cache holds more than
+    max_entries, the least recently used entries are evicted.
+    """
+
+    def __init__(self, filename, ttl=30 * DAY, negative_ttl=DAY, max_entries=10000):
+        """
+        Opens (and if needed creates) the cache file.
+
+        Args:
+            filename (str): Path to the SQLite cache file.
+            ttl (float): Seconds a found movie stays valid.
+            negative_ttl (float): Seconds a "Movie not found" answer stays valid.
+            max_entries (int): Maximum number of cached titles.
+        """
+        self.filename = filename
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA synchronous = NORMAL')
+        with self._connection:
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    data TEXT,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            ''')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)')
+        (self._size,) = self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()
+
+    def get(self, title):
+        """
+        Looks up a title in the cache.
+
+        Args:
+            title (str): The movie title.
+
+        Returns:
+            tuple: (True, movie data) for a cached movie, (True, None) for a cached
+                   "Movie not found" answer, and (False, None) on a cache miss.
+        """
+        key = normalize_title(title)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT data, stored_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                data, stored_at = row
+                ttl = self.ttl if data is not None else self.negative_ttl
+                if now - stored_at <= ttl:
+                    with self._connection:
+                        self._connection.execute(
+                            'UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+                    self.hits += 1
+                    return True, json.loads(data) if data is not None else None
+            self.misses += 1
+        return False, None
+
+    def put(self, title, data):
+        """
+        Stores an API answer in the cache and evicts the least recently used
+        entries if the cache is full.
+
+        Args:
+            title (str): The movie title that was requested.
+            data (dict): The movie data, or None if the movie was not found.
+        """
+        key = normalize_title(title)
+        now = time.time()
+        payload = json.dumps(data) if data is not None else None
+        with self._lock, self._connection:
+            exists = self._connection.execute(
+                'SELECT 1 FROM responses WHERE key = ?', (key,)).fetchone()
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses (key, data, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?)', (key, payload, now, now))
+            if not exists:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._connection.execute(
+                    'DELETE FROM responses WHERE key IN '
+                    '(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)',
+                    (self._size - self.max_entries,))
+                self._size = self.max_entries
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: 'hits', 'misses' and 'size' (number of cached titles).
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': self._size}
+
+    def clear(self):
+        """
+        Removes all cached entries and resets the counters.
+        """
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM responses')
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        """
+        Closes the cache file.
+        """
+        self._connection.close()
@@ -0,0 +1,155 @@
+import heapq
+import threading
+import time
+
+from bulk_import import RateLimiter
+from omdb_api import MovieNotFoundError, OmdbError, get_default_client
+
+DAY = 24 * 60 * 60
+
+
+class RefreshScheduler:
+    """
+    Keeps the OMDb data of a collection current in the background.
+    Every round picks the movies whose data is oldest (by their fetched_at time;
+    movies that were never fetched come first), fetches them again from the API
+    within a requests-per-second budget, and writes the new year, rating and
+    poster of all of them with a single IStorage.refresh_many() call. Movies with
+    a known IMDb ID are looked up by ID; the others by title, which also records
+    their ID for the next round.
+
+    Movies OMDb does not know (any more) keep their data but get a new fetch
+    time, so they move to the end of the queue. Transient errors leave the movie
+    untouched; it is tried again in a later round.
+    """
+
+    def __init__(self, storage, client=None, interval=60.0, batch_size=10, max_age=7 * DAY,
+                 requests_per_second=1.0, on_refresh=None):
+        """
+        Args:
+            storage (IStorage): Storage with the movies to refresh.
+            client (OmdbClient): Client for the OMDb API, defaults to the shared client.
+            interval (float): Seconds between the start of two rounds.
+            batch_size (int): Maximum number of movies fetched per round.
+            max_age (float): Seconds after which fetched data counts as stale.
+            requests_per_second (float): Maximum request rate, or None for no limit.
+            on_refresh (callable): Called with the list of refreshed movie dictionaries
+                                   after each round that wrote changes.
+        """
+        self.storage = storage
+        self.client = client
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.on_refresh = on_refresh
+        self.last_failures = {}
+        self.last_error = None
+        self._limiter = RateLimiter(requests_per_second)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def stale_movies(self, now=None):
+        """
+        Returns the movies that should be fetched next.
+
+        Args:
+            now (float): Current Unix time, defaults to time.time().
+
+        Returns:
+            list: Up to batch_size (title, Movie) tuples, oldest data first.
+        """
+        cutoff = (time.time() if now is None else now) - self.max_age
+        stale = ((movie.fetched_at or 0.0, title, movie)
+                 for title, movie in self.storage.iter_movies()
+                 if (movie.fetched_at or 0.0) <= cutoff)
+        return [(title, movie) for _, title, movie
+                in heapq.nsmallest(self.batch_size, stale, key=lambda entry: entry[:2])]
+
+    def refresh_once(self):
+        """
+        Runs one round: fetches the stale movies and writes the changes in one batch.
+        Returns early (with what was fetched so far) once stop() is called.
+
+        Returns:
+            tuple: (list of refreshed movie dictionaries with 'title', 'year', 'rating',
+                    'poster', 'fetched_at' and 'imdb_id', dict mapping failed titles
+                    to their error)
+        """
+        client = self.client or get_default_client()
+        refreshed = []
+        failures = {}
+        for title, movie in self.stale_movies():
+            if self._stop.is_set():
+                break
+            self._limiter.wait()
+            try:
+                if movie.imdb_id:
+                    data = client.fetch_by_id(movie.imdb_id, refresh=True)
+                else:
+                    data = client.fetch(title, refresh=True)
+            except MovieNotFoundError as e:
+                failures[title] = str(e)
+                data = movie.to_dict()
+            except OmdbError as e:
+                failures[title] = str(e)
+                continue
+            refreshed.append({"title": title, "year": data["year"], "rating": data["rating"],
+                              "poster": data["poster"] or "", "fetched_at": time.time(),
+                              "imdb_id": data.get("imdb_id")})
+
+        if refreshed:
+            self.storage.refresh_many(refreshed)
+            if self.on_refresh:
+                self.on_refresh(refreshed)
+        self.last_failures = failures
+        return refreshed, failures
+
+    def start(self):
+        """
+        Starts refreshing in a daemon thread, one round every interval seconds.
+        """
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="omdb-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stops the background thread after the current fetch and waits for it.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait, or None.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self):
+        """
+        Returns:
+            bool: True while the background thread runs.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        """
+        Body of the background thread. Errors of a round are kept in last_error,
+        so a broken round does not end the refreshing.
+        """
+        while not self._stop.is_set():
+            start = time.monotonic()
+            try:
+                self.refresh_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - start)))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,164 @@
+import re
+from collections import Counter
+
+from rapidfuzz import fuzz, process
+
+NON_WORD = re.compile(r"[^\w\s]")
+MIN_TRIGRAMS = 6
+
+
+def normalize_title(title):
+    """
+    Normalizes a title for searching: case folded, punctuation removed,
+    whitespace collapsed.
+
+    Args:
+        title (str): The movie title.
+
+    Returns:
+        str: The normalized title.
+    """
+    return " ".join(NON_WORD.sub(" ", title.casefold()).split())
+
+
+def trigrams(text):
+    """
+    Returns the trigrams of a normalized text, padded so that word starts count.
+
+    Args:
+        text (str): A normalized title or query.
+
+    Returns:
+        set: The distinct trigrams.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    Fuzzy title search backed by a trigram index.
+    A query first collects candidate titles that share trigrams with it, and only
+    those candidates are scored with rapidfuzz, instead of scoring every title.
+    The index is updated incrementally with add() and remove().
+    """
+
+    def __init__(self, titles=(), candidate_limit=200):
+        """
+        Builds the index.
+
+        Args:
+            titles (iterable): Titles to index.
+            candidate_limit (int): Maximum number of candidates scored per query.
+        """
+        self.candidate_limit = candidate_limit
+        self._ids = {}
+        self._titles = {}
+        self._normalized = {}
+        self._postings = {}
+        self._next_id = 0
+        for title in titles:
+            self.add(title)
+
+    @classmethod
+    def from_storage(cls, storage, **kwargs):
+        """
+        Builds an index over all titles of a storage backend.
+
+        Args:
+            storage (IStorage): The storage to index.
+            **kwargs: Passed on to the constructor.
+
+        Returns:
+            SearchIndex: The new index.
+        """
+        return cls((title for title, _ in storage.iter_movies()), **kwargs)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, title):
+        return title in self._ids
+
+    def add(self, title):
+        """
+        Adds a title to the index. Adding a title twice has no effect.
+
+        Args:
+            title (str): The movie title.
+        """
+        if title in self._ids:
+            return
+        title_id = self._next_id
+        self._next_id += 1
+        normalized = normalize_title(title)
+        self._ids[title] = title_id
+        self._titles[title_id] = title
+        self._normalized[title_id] = normalized
+        for gram in trigrams(normalized):
+            self._postings.setdefault(gram, set()).add(title_id)
+
+    def remove(self, title):
+        """
+        Removes a title from the index, if present.
+
+        Args:
+            title (str): The movie title.
+        """
+        title_id = self._ids.pop(title, None)
+        if title_id is None:
+            return
+        del self._titles[title_id]
+        for gram in trigrams(self._normalized.pop(title_id)):
+            postings = self._postings[gram]
+            postings.discard(title_id)
+            if not postings:
+                del self._postings[gram]
+
+    def search(self, query, limit=5, score_cutoff=75):
+        """
+        Finds the titles that best match a query.
+
+        Args:
+            query (str): The search term.
+            limit (int): Maximum number of results.
+            score_cutoff (float): Minimum rapidfuzz score (0-100) of a result.
+
+        Returns:
+            list: (title, score) tuples, best match first.
+        """
+        normalized = normalize_title(query)
+        if not normalized:
+            return []
+
+        choices = {title_id: self._normalized[title_id]
+                   for title_id in self._candidates(normalized)}
+        matches = process.extract(normalized, choices, scorer=fuzz.WRatio,
+                                  limit=limit, score_cutoff=score_cutoff)
+        return [(self._titles[title_id], score) for _, score, title_id in matches]
+
+    def _candidates(self, normalized):
+        """
+        Returns the ids of the titles sharing the most trigrams with a query.
+        Very common trigrams match a large part of the collection, so they are
+        skipped as long as at least MIN_TRIGRAMS rarer ones are available.
+
+        Args:
+            normalized (str): The normalized query.
+
+        Returns:
+            list: Candidate title ids.
+        """
+        postings = sorted((self._postings[gram] for gram in trigrams(normalized)
+                           if gram in self._postings), key=len)
+        if not postings:
+            return []
+
+        common = max(1000, len(self._ids) // 20)
+        selected = [ids for ids in postings if len(ids) <= common]
+        if len(selected) < MIN_TRIGRAMS:
+            selected = postings[:MIN_TRIGRAMS]
+        counts = Counter()
+        for ids in selected:
+            counts.update(ids)
+        return [title_id for title_id, _ in counts.most_common(self.candidate_limit)]
@@ -0,0 +1,131 @@
+import bisect
+import heapq
+import itertools
+
+
+class RatingAggregates:
+    """
+    Running rating statistics of a movie collection.
+    Keeps the count, the sum, a sorted list of all ratings (for median and
+    quantiles) and min/max heaps (for best and worst movie). Storage backends
+    call add(), update() and remove() on every mutation, so aggregate_ratings()
+    can be answered without looking at the whole collection.
+    """
+
+    def __init__(self, movies=()):
+        """
+        Args:
+            movies (iterable): (title, data) tuples to start with.
+        """
+        self.total = 0.0
+        self._ratings = {}
+        self._sorted = []
+        self._best = []
+        self._worst = []
+        self._entries = {}
+        self._sequence = itertools.count()
+        for title, data in movies:
+            self.add(title, data['rating'])
+
+    def __len__(self):
+        return len(self._ratings)
+
+    def add(self, title, rating):
+        """
+        Adds a movie, or replaces the rating of a movie that is already counted.
+
+        Args:
+            title (str): Movie title.
+            rating (float): Its rating.
+        """
+        if title in self._ratings:
+            self.remove(title)
+        self._ratings[title] = rating
+        self.total += rating
+        bisect.insort(self._sorted, rating)
+
+        entry = next(self._sequence)
+        self._entries[title] = entry
+        heapq.heappush(self._best, (-rating, entry, title))
+        heapq.heappush(self._worst, (rating, entry, title))
+
+    def update(self, title, rating):
+        """
+        Changes the rating of a counted movie; unknown titles are ignored.
+
+        Args:
+            title (str): Movie title.
+            rating (float): The new rating.
+        """
+        if title in self._ratings:
+            self.add(title, rating)
+
+    def remove(self, title):
+        """
+        Removes a movie; unknown titles are ignored.
+
+        Args:
+            title (str): Movie title.
+        """
+        rating = self._ratings.pop(title, None)
+        if rating is None:
+            return
+        del self._entries[title]
+        self.total -= rating
+        del self._sorted[bisect.bisect_left(self._sorted, rating)]
+        if len(self._best) > 2 * len(self._ratings) + 64:
+            self._rebuild_heaps()
+
+    def quantile(self, q):
+        """
+        Returns a rating quantile, interpolating linearly between ratings.
+
+        Args:
+            q (float): Quantile between 0 and 1.
+
+        Returns:
+            float or None: The quantile, or None if no movies are counted.
+        """
+        if not self._sorted:
+            return None
+        position = (len(self._sorted) - 1) * q
+        lower = int(position)
+        upper = min(lower + 1, len(self._sorted) - 1)
+        return self._sorted[lower] + (self._sorted[upper] - self._sorted[lower]) * (position - lower)
+
+    def summary(self):
+        """
+        Returns the same statistics as IStorage.aggregate_ratings().
+
+        Returns:
+            dict or None: 'count', 'average', 'median', 'best' and 'worst', where best
+                          and worst are (title, rating) tuples. None if no movies are counted.
+        """
+        if not self._ratings:
+            return None
+        best = self._top(self._best)
+        worst = self._top(self._worst)
+        return {
+            'count': len(self._ratings),
+            'average': self.total / len(self._ratings),
+            'median': self.quantile(0.5),
+            'best': (best, self._ratings[best]),
+            'worst': (worst, self._ratings[worst])
+        }
+
+    def _top(self, heap):
+        """
+        Drops outdated heap entries and returns the title at the top of the heap.
+        """
+        while self._entries.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+        return heap[0][2]
+
+    def _rebuild_heaps(self):
+        """
+        Rebuilds the heaps without outdated entries.
+        """
+        self._best = [(-self._ratings[title], entry, title) for title, entry in self._entries.items()]
+        self._worst = [(self._ratings[title], entry, title) for title, entry in self._entries.items()]
+        heapq.heapify(self._best)
+        heapq.heapify(self._worst)
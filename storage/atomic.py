@@ -0,0 +1,32 @@
+import contextlib
+import os
+import threading
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='w', **kwargs):
+    """
+    Opens a temporary file next to path and moves it over path once the block
+    finishes. The data is flushed to disk before the rename, so after a crash the
+    file holds either the old or the new contents, never a partial write. If the
+    block raises, the temporary file is removed and path is left untouched.
+
+    Args:
+        path (str): The file to replace.
+        mode (str): 'w' for text or 'wb' for binary files.
+        **kwargs: Passed on to open(), e.g. encoding or newline.
+
+    Yields:
+        file: The open temporary file.
+    """
+    temp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, mode, **kwargs) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
@@ -0,0 +1,51 @@
+import importlib
+import os
+
+# backend name -> (module, class); a backend module is only imported when it is
+# opened, so e.g. the columnar backend's optional NumPy import does not slow
+# down the start of commands that use another backend
+BACKENDS = {
+    'csv': ('storage.storage_csv', 'StorageCsv'),
+    'json': ('storage.storage_json', 'StorageJson'),
+    'sqlite': ('storage.storage_sqlite', 'StorageSqlite'),
+    'columnar': ('storage.storage_columnar', 'StorageColumnar'),
+}
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.db': 'sqlite',
+    '.sqlite': 'sqlite',
+    '.col': 'columnar',
+}
+
+
+def open_storage(filename, backend=None, journal=False):
+    """
+    Opens a storage backend for a file.
+
+    Args:
+        filename (str): Path of the storage file.
+        backend (str): 'csv', 'json', 'sqlite' or 'columnar', or None to choose
+                       the backend by the file extension.
+        journal (bool): Append mutations to a journal file instead of rewriting
+                        the file (CSV only, see StorageCsv).
+
+    Returns:
+        IStorage: The storage backend.
+
+    Raises:
+        ValueError: If the backend is unknown or cannot be told from the extension,
+                    or if journal mode is asked for another backend than CSV.
+    """
+    if backend is None:
+        backend = EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+        if backend is None:
+            raise ValueError(f"Cannot tell the storage type of '{filename}', "
+                             f"expected one of {', '.join(EXTENSIONS)}")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{backend}'")
+    if journal and backend != 'csv':
+        raise ValueError(f"Journal mode is only supported by the CSV backend, not '{backend}'")
+    module, name = BACKENDS[backend]
+    storage_class = getattr(importlib.import_module(module), name)
+    return storage_class(filename, journal=True) if journal else storage_class(filename)
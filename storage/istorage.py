@@ -1,10 +1,19 @@
+import heapq
+import itertools
+import random
 from abc import ABC, abstractmethod
 
+from instrumentation import traced
+
 class IStorage(ABC):
     """
     Interface for movie storage backends.
     Defines the standard methods required to manage a movie collection,
     such as listing, adding, deleting, and updating movies.
+
+    The query methods (query, count, random_sample, aggregate_ratings) have default
+    implementations based on list_movies() and iter_movies(). Backends that can answer them without
+    loading every movie (e.g. StorageSqlite) override them.
     """
 
     @abstractmethod
@@ -12,8 +21,9 @@ class IStorage(ABC):
         """
         Retrieves all stored movies.
         Returns:
-            dict: A dictionary where keys are movie titles (str), and values
-                  are dictionaries with 'year' (int) and 'rating' (float).
+            MovieCollection: A mapping where keys are movie titles (str), and values
+                             are Movie records with 'year' (int), 'rating' (float) and
+                             'poster' (str), readable as movie.year or movie['year'].
         """
         pass
 
@@ -48,3 +58,258 @@ class IStorage(ABC):
             rating (float): The new rating value.
         """
         pass
+
+    def get_movie(self, title):
+        """
+        Looks up a single movie by title.
+        Args:
+            title (str): The movie title.
+        Returns:
+            Movie or None: The movie, or None if it does not exist.
+        """
+        return self.list_movies().get(title)
+
+    def get_by_imdb_id(self, imdb_id):
+        """
+        Looks up a single movie by its IMDb ID. Backends with an index on the
+        ID override this scan.
+        Args:
+            imdb_id (str): The IMDb ID, e.g. 'tt1375666'.
+        Returns:
+            Movie or None: The movie, or None if no movie has this ID.
+        """
+        for _, movie in self.iter_movies():
+            if movie.imdb_id == imdb_id:
+                return movie
+        return None
+
+    def iter_movies(self):
+        """
+        Iterates over all stored movies in storage order. Backends override this to
+        read the movies one at a time instead of loading them all.
+        Yields:
+            tuple: (title, Movie).
+        """
+        yield from self.list_movies().items()
+
+    def add_many(self, movies):
+        """
+        Adds several movies at once. Backends override this to write them in one go.
+        Args:
+            movies (list): Dictionaries with 'title', 'year', 'rating' and 'poster',
+                           and optionally 'fetched_at' and 'imdb_id' (see Movie).
+        """
+        for movie in movies:
+            self.add_movie(movie['title'], movie['year'], movie['rating'], movie['poster'])
+
+    def update_many(self, movies):
+        """
+        Updates the year and rating of several movies in one batch.
+        Args:
+            movies (list): Dictionaries with 'title', 'year' and 'rating'.
+        """
+        self.write_batch([('update', movie['title'], movie['year'], movie['rating'])
+                          for movie in movies])
+
+    def refresh_many(self, movies):
+        """
+        Replaces the data of several movies with freshly fetched OMDb data in one
+        batch. Movies that no longer exist are skipped instead of being added again.
+        Args:
+            movies (list): Dictionaries with 'title', 'year', 'rating', 'poster' and
+                           'fetched_at', and optionally 'imdb_id'.
+        """
+        self.write_batch([('refresh', movie['title'], movie['year'], movie['rating'],
+                           movie['poster'], movie['fetched_at'], movie.get('imdb_id'))
+                          for movie in movies])
+
+    def delete_many(self, titles):
+        """
+        Deletes several movies in one batch.
+        Args:
+            titles (iterable): Titles of the movies to delete.
+        """
+        self.write_batch([('delete', title) for title in titles])
+
+    def write_batch(self, changes):
+        """
+        Applies a list of changes in order. Backends override this to load and
+        save the collection only once for the whole batch. This fallback can only
+        store what add_movie() and update_movie() take, so fetch times and IMDb IDs
+        are dropped.
+        Args:
+            changes (list): Tuples ('add', title, year, rating, poster[, fetched_at[, imdb_id]]),
+                            ('update', title, year, rating),
+                            ('refresh', title, year, rating, poster, fetched_at[, imdb_id])
+                            or ('delete', title).
+        """
+        for op, title, *fields in changes:
+            if op == 'add':
+                self.add_movie(title, *fields[:3])
+            elif op == 'update':
+                self.update_movie(title, *fields)
+            elif op == 'refresh':
+                if self.get_movie(title) is not None:
+                    self.add_movie(title, *fields[:3])
+            elif op == 'delete':
+                self.delete_movie(title)
+            else:
+                raise ValueError(f"Unknown change '{op}'")
+
+    def transaction(self):
+        """
+        Starts a transaction that buffers add/update/delete calls and writes them
+        with a single write_batch() when the with block ends. If the block raises,
+        nothing is written.
+
+            with storage.transaction() as batch:
+                batch.add_movie("Inception", 2010, 8.8, "")
+                batch.delete_movie("The Room")
+
+        Returns:
+            StorageTransaction: The transaction, to be used as context manager.
+        """
+        return StorageTransaction(self)
+
+    @traced("storage.query")
+    def query(self, min_rating=None, year_range=None, order_by=None, limit=None):
+        """
+        Returns the movies matching the given criteria.
+        Args:
+            min_rating (float): Minimum rating, or None for no limit.
+            year_range (tuple): (start year, end year), either of which may be None.
+            order_by (str): 'title', 'year' or 'rating', prefixed with '-' for
+                            descending order. None keeps storage order.
+            limit (int): Maximum number of movies to return, or None for all.
+        Returns:
+            list: (title, Movie) tuples.
+        """
+        start_year, end_year = year_range or (None, None)
+        movies = (
+            (title, data)
+            for title, data in self.iter_movies()
+            if (min_rating is None or data['rating'] >= min_rating)
+            and (start_year is None or data['year'] >= start_year)
+            and (end_year is None or data['year'] <= end_year)
+        )
+
+        if not order_by:
+            return list(itertools.islice(movies, limit))
+
+        column = order_by.lstrip('-')
+        if column == 'title':
+            key = lambda x: x[0]
+        elif column in ('year', 'rating'):
+            key = lambda x: x[1][column]
+        else:
+            raise ValueError(f"Cannot order movies by '{order_by}'")
+        descending = order_by.startswith('-')
+
+        if limit is None:
+            return sorted(movies, key=key, reverse=descending)
+        if descending:
+            return heapq.nlargest(limit, movies, key=key)
+        return heapq.nsmallest(limit, movies, key=key)
+
+    @traced("storage.count")
+    def count(self):
+        """
+        Returns the number of stored movies.
+        Returns:
+            int: Number of movies.
+        """
+        return sum(1 for _ in self.iter_movies())
+
+    @traced("storage.random_sample")
+    def random_sample(self, k):
+        """
+        Picks up to k distinct movies at random.
+        Args:
+            k (int): Number of movies to pick.
+        Returns:
+            list: (title, Movie) tuples, fewer than k if there are not enough movies.
+        """
+        movies = list(self.list_movies().items())
+        return random.sample(movies, min(k, len(movies)))
+
+    @traced("storage.aggregate_ratings")
+    def aggregate_ratings(self):
+        """
+        Computes statistics about the movie ratings.
+        Returns:
+            dict or None: 'count', 'average', 'median', 'best' and 'worst', where best
+                          and worst are (title, rating) tuples. None if no movies exist.
+        """
+        movies = self.list_movies()
+        if not movies:
+            return None
+
+        ratings = sorted(data['rating'] for data in movies.values())
+        mid = len(ratings) // 2
+        median = ratings[mid] if len(ratings) % 2 else (ratings[mid - 1] + ratings[mid]) / 2
+
+        best = max(movies.items(), key=lambda x: x[1]['rating'])
+        worst = min(movies.items(), key=lambda x: x[1]['rating'])
+        return {
+            'count': len(ratings),
+            'average': sum(ratings) / len(ratings),
+            'median': median,
+            'best': (best[0], best[1]['rating']),
+            'worst': (worst[0], worst[1]['rating'])
+        }
+
+
+class StorageTransaction:
+    """
+    Buffers mutations for a storage backend and writes them in one batch.
+    Reads during the transaction do not see the buffered changes.
+    """
+
+    def __init__(self, storage):
+        """
+        Args:
+            storage (IStorage): The storage the changes are written to.
+        """
+        self.storage = storage
+        self.changes = []
+
+    def add_movie(self, title, year, rating, poster):
+        """
+        Buffers adding a movie (see IStorage.add_movie).
+        """
+        self.changes.append(('add', title, year, rating, poster))
+
+    def update_movie(self, title, year, rating):
+        """
+        Buffers updating a movie (see IStorage.update_movie).
+        """
+        self.changes.append(('update', title, year, rating))
+
+    def delete_movie(self, title):
+        """
+        Buffers deleting a movie (see IStorage.delete_movie).
+        """
+        self.changes.append(('delete', title))
+
+    def commit(self):
+        """
+        Writes the buffered changes and clears the buffer.
+        """
+        changes, self.changes = self.changes, []
+        if changes:
+            self.storage.write_batch(changes)
+
+    def rollback(self):
+        """
+        Discards the buffered changes.
+        """
+        self.changes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
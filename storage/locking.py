@@ -0,0 +1,139 @@
+import contextlib
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # fcntl is POSIX only; elsewhere the lock only covers threads of this process
+    fcntl = None
+
+OPTIMISTIC_ATTEMPTS = 3
+
+
+class FileLock:
+    """
+    Reader/writer lock for a storage file, shared between processes.
+    The lock is taken with fcntl.flock on a '<file>.lock' file next to the data
+    file, because the data file itself is replaced on every write. Threads of the
+    same process are serialized by an additional thread lock.
+
+    Locks are reentrant: a shared or exclusive lock requested while the thread
+    already holds the exclusive lock is granted immediately. Upgrading a shared
+    lock to an exclusive one is not supported, since two readers upgrading at the
+    same time would wait for each other forever.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Path of the data file to lock.
+        """
+        self.path = path + '.lock'
+        self._thread_lock = threading.RLock()
+        self._file = None
+        self._mode = None
+        self._depth = 0
+
+    @contextlib.contextmanager
+    def shared(self):
+        """
+        Holds the lock for reading; other readers may hold it at the same time.
+        """
+        with self._hold(exclusive=False):
+            yield
+
+    @contextlib.contextmanager
+    def exclusive(self):
+        """
+        Holds the lock for writing; no other reader or writer holds it meanwhile.
+        """
+        with self._hold(exclusive=True):
+            yield
+
+    @contextlib.contextmanager
+    def _hold(self, exclusive):
+        with self._thread_lock:
+            if self._depth == 0:
+                self._acquire(exclusive)
+            elif exclusive and not self._mode:
+                raise RuntimeError("A shared lock cannot be upgraded to an exclusive lock")
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._release()
+
+    def _acquire(self, exclusive):
+        """
+        Opens the lock file and blocks until the lock is granted.
+        """
+        self._mode = exclusive
+        if fcntl is None:
+            return
+        self._file = open(self.path, 'a')
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        except BaseException:
+            self._file.close()
+            self._file = None
+            raise
+
+    def _release(self):
+        """
+        Releases the lock and closes the lock file.
+        """
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._mode = None
+
+
+def file_version(path):
+    """
+    Returns a token that changes whenever a file is replaced or modified.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        tuple or None: (inode, mtime in ns, size), or None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def modify_file(lock, path, read, write, attempts=OPTIMISTIC_ATTEMPTS):
+    """
+    Runs a read-modify-write cycle on a file that other processes may change too.
+
+    The file is read under the shared lock and the result is written under the
+    exclusive lock, but only if the file version (and that of every other file the
+    data is read from) did not change in between; otherwise the cycle is retried. After the optimistic attempts are used up,
+    the exclusive lock is held for the whole cycle, so the write always succeeds
+    and no concurrent update is lost.
+
+    Args:
+        lock (FileLock): The lock of the file.
+        path (str or tuple): Path of the file, or paths of all files read(), used
+                             for the version check.
+        read (callable): Returns the current data.
+        write (callable): Receives the data from read(), modifies and saves it.
+        attempts (int): Number of optimistic attempts.
+    """
+    paths = (path,) if isinstance(path, str) else tuple(path)
+    for _ in range(attempts):
+        with lock.shared():
+            versions = [file_version(path) for path in paths]
+            data = read()
+        with lock.exclusive():
+            if [file_version(path) for path in paths] == versions:
+                write(data)
+                return
+    with lock.exclusive():
+        write(read())
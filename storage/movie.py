@@ -0,0 +1,357 @@
+from array import array
+from collections.abc import ItemsView, Mapping, MutableMapping, ValuesView
+
+FIELDS = ('year', 'rating', 'poster', 'fetched_at', 'imdb_id')
+
+
+class Movie:
+    """
+    A single movie record.
+    Uses __slots__, so a record costs far less memory than a dictionary. For
+    compatibility with code written against the old dictionaries, the fields can
+    also be read as movie['year'], movie['rating'] and movie['poster'].
+    fetched_at is the time the data was last fetched from OMDb, or None for
+    movies that were entered by hand or stored before it was recorded.
+    imdb_id is the IMDb ID OMDb returned for the movie (e.g. 'tt1375666'), or None.
+    """
+
+    __slots__ = ('title', 'year', 'rating', 'poster', 'fetched_at', 'imdb_id')
+
+    def __init__(self, title, year, rating, poster='', fetched_at=None, imdb_id=None):
+        """
+        Args:
+            title (str): Movie title.
+            year (int): Release year.
+            rating (float): IMDb rating.
+            poster (str): Poster URL.
+            fetched_at (float): Unix time of the last OMDb fetch, or None.
+            imdb_id (str): IMDb ID, or None.
+        """
+        self.title = title
+        self.year = year
+        self.rating = rating
+        self.poster = poster or ''
+        self.fetched_at = fetched_at or None
+        self.imdb_id = imdb_id or None
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        """
+        Returns a field like dict.get does.
+
+        Args:
+            key (str): 'year', 'rating', 'poster', 'fetched_at' or 'imdb_id'.
+            default: Value returned for unknown fields.
+        """
+        return getattr(self, key) if key in FIELDS else default
+
+    def to_dict(self):
+        """
+        Returns the fields (without title) as a dictionary.
+
+        Returns:
+            dict: 'year', 'rating' and 'poster', plus 'fetched_at' and 'imdb_id'
+                  if they are known.
+        """
+        data = {'year': self.year, 'rating': self.rating, 'poster': self.poster}
+        if self.fetched_at is not None:
+            data['fetched_at'] = self.fetched_at
+        if self.imdb_id is not None:
+            data['imdb_id'] = self.imdb_id
+        return data
+
+    def __eq__(self, other):
+        if isinstance(other, Movie):
+            return (self.title, self.year, self.rating, self.poster, self.fetched_at,
+                    self.imdb_id) == \
+                   (other.title, other.year, other.rating, other.poster, other.fetched_at,
+                    other.imdb_id)
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __repr__(self):
+        if self.fetched_at is None and self.imdb_id is None:
+            return f"Movie({self.title!r}, {self.year!r}, {self.rating!r}, {self.poster!r})"
+        return (f"Movie({self.title!r}, {self.year!r}, {self.rating!r}, {self.poster!r}, "
+                f"{self.fetched_at!r}, {self.imdb_id!r})")
+
+
+class MovieCollection(MutableMapping):
+    """
+    An ordered collection of movies, stored column-wise.
+    Years, ratings and fetch times live in typed arrays and titles, posters and IMDb
+    IDs in flat lists, instead of one dictionary per movie (a fetch time of 0.0
+    stands for None). A second index maps IMDb IDs to titles, so get_by_imdb_id()
+    is an exact key lookup as well. It behaves like the old
+    {title: {'year': ..., 'rating': ..., 'poster': ...}} dictionaries: looking up a
+    title returns a Movie, which supports the same ['year'] style access.
+    Deleted movies leave a gap that is compacted once enough gaps have built up.
+    """
+
+    def __init__(self, movies=()):
+        """
+        Args:
+            movies (iterable): Movie records to add.
+        """
+        self._titles = []
+        self._years = array('i')
+        self._ratings = array('d')
+        self._posters = []
+        self._fetched = array('d')
+        self._imdb_ids = []
+        self._index = {}
+        self._by_imdb_id = {}
+        self._deleted = 0
+        for movie in movies:
+            self.add(movie.title, movie.year, movie.rating, movie.poster, movie.fetched_at,
+                     movie.imdb_id)
+
+    @classmethod
+    def from_mapping(cls, movies):
+        """
+        Builds a collection from a {title: {'year', 'rating', 'poster'}} mapping.
+
+        Args:
+            movies (Mapping): The movies to copy. Collections are returned unchanged.
+
+        Returns:
+            MovieCollection: The collection.
+        """
+        if isinstance(movies, MovieCollection):
+            return movies
+        collection = cls()
+        for title, data in movies.items():
+            collection.add(title, data['year'], data['rating'], data.get('poster', ''),
+                           data.get('fetched_at'), data.get('imdb_id'))
+        return collection
+
+    def add(self, title, year, rating, poster='', fetched_at=None, imdb_id=None):
+        """
+        Adds a movie, or replaces the fields of a movie with the same title
+        (keeping its position).
+
+        Args:
+            title (str): Movie title.
+            year (int): Release year.
+            rating (float): IMDb rating.
+            poster (str): Poster URL.
+            fetched_at (float): Unix time of the last OMDb fetch, or None.
+            imdb_id (str): IMDb ID, or None.
+        """
+        slot = self._index.get(title)
+        if slot is None:
+            self._index[title] = len(self._titles)
+            self._titles.append(title)
+            self._years.append(year)
+            self._ratings.append(rating)
+            self._posters.append(poster or '')
+            self._fetched.append(fetched_at or 0.0)
+            self._imdb_ids.append(None)
+            slot = len(self._titles) - 1
+        else:
+            self._years[slot] = year
+            self._ratings[slot] = rating
+            self._posters[slot] = poster or ''
+            self._fetched[slot] = fetched_at or 0.0
+        self._set_imdb_id(slot, imdb_id or None)
+
+    def _set_imdb_id(self, slot, imdb_id):
+        """
+        Sets the IMDb ID of a slot and keeps the ID index in sync.
+        """
+        old = self._imdb_ids[slot]
+        if old is not None and self._by_imdb_id.get(old) == self._titles[slot]:
+            del self._by_imdb_id[old]
+        self._imdb_ids[slot] = imdb_id
+        if imdb_id is not None:
+            self._by_imdb_id[imdb_id] = self._titles[slot]
+
+    def get_by_imdb_id(self, imdb_id):
+        """
+        Looks up a movie by its IMDb ID.
+
+        Args:
+            imdb_id (str): The IMDb ID.
+
+        Returns:
+            Movie or None: The movie, or None if no movie has this ID.
+        """
+        title = self._by_imdb_id.get(imdb_id)
+        return None if title is None else self[title]
+
+    def update_movie(self, title, year, rating):
+        """
+        Updates the year and rating of a movie, if it exists. Poster remains unchanged.
+
+        Args:
+            title (str): Movie title.
+            year (int): New release year.
+            rating (float): New IMDb rating.
+        """
+        slot = self._index.get(title)
+        if slot is not None:
+            self._years[slot] = year
+            self._ratings[slot] = rating
+
+    def refresh_movie(self, title, year, rating, poster, fetched_at, imdb_id=None):
+        """
+        Replaces the fields of a movie with freshly fetched data, if it exists.
+
+        Args:
+            title (str): Movie title.
+            year (int): New release year.
+            rating (float): New IMDb rating.
+            poster (str): New poster URL.
+            fetched_at (float): Unix time of the fetch.
+            imdb_id (str): IMDb ID, or None to keep the known one.
+        """
+        slot = self._index.get(title)
+        if slot is not None:
+            self.add(title, year, rating, poster, fetched_at, imdb_id or self._imdb_ids[slot])
+
+    def apply(self, changes):
+        """
+        Applies a batch of changes as passed to IStorage.write_batch().
+
+        Args:
+            changes (list): Tuples ('add', title, year, rating, poster[, fetched_at[, imdb_id]]),
+                            ('update', title, year, rating),
+                            ('refresh', title, year, rating, poster, fetched_at[, imdb_id])
+                            or ('delete', title).
+        """
+        for op, title, *fields in changes:
+            if op == 'add':
+                self.add(title, *fields)
+            elif op == 'update':
+                self.update_movie(title, *fields)
+            elif op == 'refresh':
+                self.refresh_movie(title, *fields)
+            elif op == 'delete':
+                self.pop(title, None)
+            else:
+                raise ValueError(f"Unknown change '{op}'")
+
+    def __getitem__(self, title):
+        slot = self._index[title]
+        return Movie(title, self._years[slot], self._ratings[slot], self._posters[slot],
+                     self._fetched[slot], self._imdb_ids[slot])
+
+    def __setitem__(self, title, movie):
+        self.add(title, movie['year'], movie['rating'], movie.get('poster', ''),
+                 movie.get('fetched_at'), movie.get('imdb_id'))
+
+    def __delitem__(self, title):
+        slot = self._index.pop(title)
+        self._set_imdb_id(slot, None)
+        self._titles[slot] = None
+        self._posters[slot] = None
+        self._deleted += 1
+        if self._deleted > 32 and self._deleted * 2 > len(self._titles):
+            self._compact()
+
+    def __contains__(self, title):
+        return title in self._index
+
+    def __iter__(self):
+        return (title for title in self._titles if title is not None)
+
+    def __len__(self):
+        return len(self._index)
+
+    def items(self):
+        return _CollectionItems(self)
+
+    def values(self):
+        return _CollectionValues(self)
+
+    def to_dict(self):
+        """
+        Converts the collection to the dictionary layout of the JSON file.
+
+        Returns:
+            dict: Movie titles as keys and dictionaries with year, rating,
+                  poster and (if known) fetched_at and imdb_id as values.
+        """
+        return {movie.title: movie.to_dict() for _, movie in self._iter_items()}
+
+    def ratings(self):
+        """
+        Returns the ratings of all movies in collection order.
+
+        Returns:
+            array: The ratings as array of doubles.
+        """
+        if self._deleted:
+            self._compact()
+        return self._ratings
+
+    def years(self):
+        """
+        Returns the release years of all movies in collection order.
+
+        Returns:
+            array: The years as array of ints.
+        """
+        if self._deleted:
+            self._compact()
+        return self._years
+
+    def fetch_times(self):
+        """
+        Returns the fetch times of all movies in collection order.
+
+        Returns:
+            array: Unix times as array of doubles, 0.0 where the time is unknown.
+        """
+        if self._deleted:
+            self._compact()
+        return self._fetched
+
+    def _iter_items(self):
+        """
+        Yields (title, Movie) pairs straight from the columns.
+        """
+        for slot, title in enumerate(self._titles):
+            if title is not None:
+                yield title, Movie(title, self._years[slot], self._ratings[slot],
+                                   self._posters[slot], self._fetched[slot], self._imdb_ids[slot])
+
+    def _compact(self):
+        """
+        Removes the gaps left by deleted movies.
+        """
+        keep = [slot for slot, title in enumerate(self._titles) if title is not None]
+        self._titles = [self._titles[slot] for slot in keep]
+        self._years = array('i', (self._years[slot] for slot in keep))
+        self._ratings = array('d', (self._ratings[slot] for slot in keep))
+        self._posters = [self._posters[slot] for slot in keep]
+        self._fetched = array('d', (self._fetched[slot] for slot in keep))
+        self._imdb_ids = [self._imdb_ids[slot] for slot in keep]
+        self._index = {title: slot for slot, title in enumerate(self._titles)}
+        self._deleted = 0
+
+    def __repr__(self):
+        return f"MovieCollection({len(self)} movies)"
+
+
+class _CollectionItems(ItemsView):
+    """
+    Items view that reads (title, Movie) pairs directly from the columns.
+    """
+
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+
+class _CollectionValues(ValuesView):
+    """
+    Values view that reads Movie records directly from the columns.
+    """
+
+    def __iter__(self):
+        return (movie for _, movie in self._mapping._iter_items())
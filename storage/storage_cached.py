@@ -0,0 +1,248 @@
+import contextlib
+import threading
+
+from instrumentation import traced
+from storage.aggregates import RatingAggregates
+from storage.istorage import IStorage
+from storage.locking import file_version
+from storage.movie import MovieCollection
+
+
+class CachedStorage(IStorage):
+    """
+    CachedStorage wraps any IStorage backend with an in-memory write-through cache.
+    The backend is read once, reads are served from memory, and every mutation is
+    written to the backend and applied to the cached copy. If the backend's file
+    changes on disk (different inode, mtime or size), the cache is reloaded on the next read.
+
+    Rating statistics are kept as running aggregates that every mutation updates,
+    so aggregate_ratings() does not depend on the size of the collection. Queries and
+    random samples run in the backend if it implements them itself (SQLite, columnar).
+
+    Reads and writes of the cache are serialized by a lock, so a background writer
+    (e.g. the RefreshScheduler) can share it with the interactive menu.
+    """
+
+    def __init__(self, backend):
+        """
+        Initializes the cache around the given storage backend.
+
+        Args:
+            backend (IStorage): The storage backend to cache. If it has a
+                                'filename' attribute, that file is watched for changes.
+        """
+        self._backend = backend
+        self._movies = None
+        self._signature = None
+        self._aggregates = None
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        """
+        Forwards backend specific attributes (e.g. 'filename', 'compact').
+
+        Args:
+            name (str): Name of the attribute that was not found on the cache.
+        """
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._backend, name)
+
+    @traced("storage.cached.list_movies")
+    def list_movies(self):
+        """
+        Returns all movies from the in-memory cache, loading them first if needed.
+        The returned collection is shared with the cache and must not be modified.
+
+        Returns:
+            MovieCollection: Movie titles mapped to Movie records.
+        """
+        with self._lock:
+            signature = self._file_signature()
+            if self._movies is None or signature != self._signature:
+                self._movies = MovieCollection.from_mapping(self._backend.list_movies())
+                self._signature = signature
+                self._aggregates = None
+            return self._movies
+
+    def get_by_imdb_id(self, imdb_id):
+        """
+        Looks up a movie by its IMDb ID in the cache's ID index.
+
+        Args:
+            imdb_id (str): The IMDb ID.
+
+        Returns:
+            Movie or None: The movie, or None if no movie has this ID.
+        """
+        return self.list_movies().get_by_imdb_id(imdb_id)
+
+    def add_movie(self, title, year, rating, poster):
+        """
+        Adds a movie to the backend and to the cache.
+
+        Args:
+            title (str): Movie title.
+            year (int): Release year.
+            rating (float): IMDb rating.
+            poster (str): Poster URL.
+        """
+        self.write_batch([('add', title, year, rating, poster)])
+
+    def add_many(self, movies):
+        """
+        Adds several movies to the backend in one batch and to the cache.
+
+        Args:
+            movies (list): Dictionaries with 'title', 'year', 'rating' and 'poster',
+                           and optionally 'fetched_at' and 'imdb_id'.
+        """
+        self.write_batch([('add', movie['title'], movie['year'], movie['rating'], movie['poster'],
+                           movie.get('fetched_at'), movie.get('imdb_id'))
+                          for movie in movies])
+
+    def delete_movie(self, title):
+        """
+        Deletes a movie from the backend and from the cache.
+
+        Args:
+            title (str): Movie title to delete.
+        """
+        self.write_batch([('delete', title)])
+
+    def update_movie(self, title, year, rating):
+        """
+        Updates the year and rating of a movie in the backend and in the cache.
+
+        Args:
+            title (str): Movie title to update.
+            year (int): New release year.
+            rating (float): New IMDb rating.
+        """
+        self.write_batch([('update', title, year, rating)])
+
+    @traced("storage.cached.write_batch")
+    def write_batch(self, changes):
+        """
+        Applies a batch of changes to the backend in one go and to the cache.
+        If the backend has a 'file_lock' (see FileLock), it is held exclusively
+        from the cache check to the write, so changes made by other processes in
+        between are loaded first instead of being hidden by the cache.
+
+        Args:
+            changes (list): Tuples ('add', title, year, rating, poster[, fetched_at[, imdb_id]]),
+                            ('update', title, year, rating),
+                            ('refresh', title, year, rating, poster, fetched_at[, imdb_id])
+                            or ('delete', title).
+        """
+        file_lock = getattr(self._backend, 'file_lock', None)
+        file_guard = file_lock.exclusive() if file_lock is not None else contextlib.nullcontext()
+        with self._lock, file_guard:
+            movies = self.list_movies()
+            self._backend.write_batch(changes)
+            movies.apply(changes)
+            if self._aggregates is not None:
+                for op, title, *fields in changes:
+                    if op == 'add':
+                        self._aggregates.add(title, fields[1])
+                    elif op in ('update', 'refresh'):
+                        self._aggregates.update(title, fields[1])
+                    else:
+                        self._aggregates.remove(title)
+            self._signature = self._file_signature()
+
+    def count(self):
+        """
+        Returns the number of cached movies.
+
+        Returns:
+            int: Number of movies.
+        """
+        return len(self.list_movies())
+
+    def query(self, min_rating=None, year_range=None, order_by=None, limit=None):
+        """
+        Returns the movies matching the given criteria (see IStorage.query). If the
+        backend has its own query (e.g. SQL or columnar), it runs there, otherwise
+        the cached movies are scanned.
+
+        Returns:
+            list: (title, Movie) tuples.
+        """
+        with self._lock:
+            if self._backend_overrides('query'):
+                return self._backend.query(min_rating, year_range, order_by, limit)
+            return super().query(min_rating, year_range, order_by, limit)
+
+    def random_sample(self, k):
+        """
+        Picks up to k distinct movies at random, with the backend's own sampling
+        if it has one.
+
+        Args:
+            k (int): Number of movies to pick.
+
+        Returns:
+            list: (title, Movie) tuples, fewer than k if there are not enough movies.
+        """
+        with self._lock:
+            if self._backend_overrides('random_sample'):
+                return self._backend.random_sample(k)
+            return super().random_sample(k)
+
+    @traced("storage.cached.aggregate_ratings")
+    def aggregate_ratings(self):
+        """
+        Returns the rating statistics from the running aggregates. They are built
+        from the cached movies on first use and after the cache was reloaded.
+
+        Returns:
+            dict or None: 'count', 'average', 'median', 'best' and 'worst', where best
+                          and worst are (title, rating) tuples. None if no movies exist.
+        """
+        with self._lock:
+            movies = self.list_movies()
+            if self._aggregates is None:
+                self._aggregates = RatingAggregates(movies.items())
+            return self._aggregates.summary()
+
+    def invalidate(self):
+        """
+        Drops the cached movies so the next read goes to the backend again.
+        """
+        with self._lock:
+            self._movies = None
+            self._signature = None
+            self._aggregates = None
+
+    def _backend_overrides(self, name):
+        """
+        Tells whether the backend replaces the default IStorage implementation of a
+        method, e.g. with a query that runs in the database.
+
+        Args:
+            name (str): Name of the method.
+
+        Returns:
+            bool: True if the backend's class defines its own version.
+        """
+        return getattr(type(self._backend), name, None) is not getattr(IStorage, name)
+
+    def _file_signature(self):
+        """
+        Returns the versions of the backend files (see file_version), which change
+        whenever a file is modified or atomically replaced.
+        Besides 'filename', a 'journal_filename' (see StorageCsv) is watched as well.
+
+        Returns:
+            tuple or None: (inode, mtime in ns, size in bytes) per watched file (None
+                           for missing files), or None if the backend has no file.
+        """
+        filename = getattr(self._backend, 'filename', None)
+        if filename is None:
+            return None
+        paths = [filename]
+        journal_filename = getattr(self._backend, 'journal_filename', None)
+        if journal_filename is not None:
+            paths.append(journal_filename)
+        return tuple(file_version(path) for path in paths)
@@ -0,0 +1,572 @@
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+from array import array
+
+from instrumentation import traced
+from storage.atomic import atomic_write
+from storage.istorage import IStorage
+from storage.movie import Movie, MovieCollection
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+
+try:
+    import numpy
+except ImportError:  # numpy is optional, filters fall back to a loop over the columns
+    numpy = None
+
+MAGIC = b'MOVIECOL'
+VERSION = 3
+BYTE_ORDER_MARK = 0xFEFF
+HEADER = struct.Struct('=8sHHQ')
+ORDER_COLUMNS = {'title', 'year', 'rating'}
+
+
+class StorageColumnar(IStorage):
+    """
+    StorageColumnar implements the IStorage interface with a binary, column-wise file
+    that is read through mmap. It is meant for read-heavy workloads: opening only maps
+    the file, filters and statistics scan the year and rating columns as contiguous
+    numbers, and a movie is read by a single offset lookup.
+
+    File layout (native byte order, recorded in the header):
+        header          magic, version, byte order mark, number of movies (n)
+        years           n x int32
+        ratings         n x float64 (aligned to 8 bytes)
+        fetch times     n x float64 Unix times, 0.0 if unknown (since version 2)
+        title offsets   (n + 1) x uint64 into the text blob
+        poster offsets  (n + 1) x uint64 into the text blob
+        IMDb ID offsets (n + 1) x uint64 into the text blob, empty if unknown (since version 3)
+        text blob       UTF-8 titles followed by UTF-8 posters and IMDb IDs
+
+    Updating a movie writes its year and rating in place; adding and deleting
+    movies rewrites the file. Files of older versions (without fetch times or
+    IMDb IDs) are still read and are written as version 3 on the next rewrite.
+    """
+
+    def __init__(self, filename):
+        """
+        Maps the file; a missing file is an empty collection.
+
+        Args:
+            filename (str): Path to the columnar movie file.
+        """
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._columns = _ColumnFile.open(filename)
+        self._index = None
+        self._imdb_index = None
+
+    @traced("storage.columnar.list_movies")
+    def list_movies(self):
+        """
+        Returns all stored movies in file order.
+
+        Returns:
+            MovieCollection: Movie titles mapped to Movie records.
+        """
+        return MovieCollection(movie for _, movie in self.iter_movies())
+
+    def iter_movies(self):
+        """
+        Iterates over the movies straight from the mapped file.
+
+        Yields:
+            tuple: (title, Movie).
+        """
+        columns = self._columns
+        for row in range(columns.count):
+            movie = columns.movie(row)
+            yield movie.title, movie
+
+    @traced("storage.columnar.get_movie")
+    def get_movie(self, title):
+        """
+        Looks up a single movie by title.
+
+        Args:
+            title (str): The movie title.
+
+        Returns:
+            Movie or None: The movie, or None if it does not exist.
+        """
+        row = self._title_index().get(title)
+        return None if row is None else self._columns.movie(row)
+
+    @traced("storage.columnar.get_by_imdb_id")
+    def get_by_imdb_id(self, imdb_id):
+        """
+        Looks up a single movie by its IMDb ID.
+
+        Args:
+            imdb_id (str): The IMDb ID.
+
+        Returns:
+            Movie or None: The movie, or None if no movie has this ID.
+        """
+        if self._imdb_index is None:
+            columns = self._columns
+            index = {}
+            for row in range(columns.count):
+                index.setdefault(columns.imdb_id(row), row)
+            index.pop(None, None)
+            self._imdb_index = index
+        row = self._imdb_index.get(imdb_id)
+        return None if row is None else self._columns.movie(row)
+
+    def add_movie(self, title, year, rating, poster):
+        """
+        Adds a movie (or replaces a movie with the same title) and rewrites the file.
+
+        Args:
+            title (str): Movie title.
+            year (int): Release year.
+            rating (float): IMDb rating.
+            poster (str): URL to the movie poster.
+        """
+        self.add_many([{'title': title, 'year': year, 'rating': rating, 'poster': poster}])
+
+    def add_many(self, movies):
+        """
+        Adds several movies with a single rewrite of the file.
+
+        Args:
+            movies (list): Dictionaries with 'title', 'year', 'rating' and 'poster',
+                           and optionally 'fetched_at' and 'imdb_id'.
+        """
+        self.write_batch([('add', movie['title'], movie['year'], movie['rating'], movie['poster'],
+                           movie.get('fetched_at'), movie.get('imdb_id'))
+                          for movie in movies])
+
+    def delete_movie(self, title):
+        """
+        Deletes a movie by title and rewrites the file.
+
+        Args:
+            title (str): Movie title to delete.
+        """
+        with self._lock:
+            if title not in self._title_index():
+                return
+            movies = self.list_movies()
+            del movies[title]
+            self._save_movies(movies)
+
+    def update_movie(self, title, year, rating):
+        """
+        Updates the year and rating of a movie in place in the mapped file.
+        Poster remains unchanged.
+
+        Args:
+            title (str): Movie title to update.
+            year (int): New release year.
+            rating (float): New IMDb rating.
+        """
+        with self._lock:
+            row = self._title_index().get(title)
+            if row is not None:
+                self._columns.update(row, year, rating)
+
+    @traced("storage.columnar.write_batch")
+    def write_batch(self, changes):
+        """
+        Applies a batch of changes. A batch of updates only is written in place,
+        anything else with a single rewrite of the file.
+
+        Args:
+            changes (list): Tuples ('add', title, year, rating, poster[, fetched_at[, imdb_id]]),
+                            ('update', title, year, rating),
+                            ('refresh', title, year, rating, poster, fetched_at[, imdb_id])
+                            or ('delete', title).
+        """
+        with self._lock:
+            if all(change[0] == 'update' for change in changes):
+                index = self._title_index()
+                for _, title, year, rating in changes:
+                    if title in index:
+                        self._columns.update(index[title], year, rating)
+                return
+            movies = self.list_movies()
+            movies.apply(changes)
+            self._save_movies(movies)
+
+    @traced("storage.columnar.query")
+    def query(self, min_rating=None, year_range=None, order_by=None, limit=None):
+        """
+        Returns the movies matching the given criteria. The filters scan the year and
+        rating columns only; titles and posters are read for the matching rows.
+
+        Args:
+            min_rating (float): Minimum rating, or None for no limit.
+            year_range (tuple): (start year, end year), either of which may be None.
+            order_by (str): 'title', 'year' or 'rating', prefixed with '-' for
+                            descending order. None keeps file order.
+            limit (int): Maximum number of movies to return, or None for all.
+
+        Returns:
+            list: (title, Movie) tuples.
+        """
+        column = order_by.lstrip('-') if order_by else None
+        if column is not None and column not in ORDER_COLUMNS:
+            raise ValueError(f"Cannot order movies by '{order_by}'")
+        descending = bool(order_by) and order_by.startswith('-')
+        start_year, end_year = year_range or (None, None)
+        columns = self._columns
+
+        if numpy is not None:
+            years, ratings = columns.numpy_columns()
+            mask = numpy.ones(columns.count, dtype=bool)
+            if min_rating is not None:
+                mask &= ratings >= min_rating
+            if start_year is not None:
+                mask &= years >= start_year
+            if end_year is not None:
+                mask &= years <= end_year
+            rows = numpy.flatnonzero(mask)
+            if column in ('year', 'rating'):
+                keys = (years if column == 'year' else ratings)[rows].astype(numpy.float64)
+                rows = rows[numpy.argsort(-keys if descending else keys, kind='stable')]
+            rows = rows.tolist()
+        else:
+            years, ratings = columns.years, columns.ratings
+            rows = [row for row in range(columns.count)
+                    if (min_rating is None or ratings[row] >= min_rating)
+                    and (start_year is None or years[row] >= start_year)
+                    and (end_year is None or years[row] <= end_year)]
+            if column in ('year', 'rating'):
+                values = years if column == 'year' else ratings
+                rows.sort(key=values.__getitem__, reverse=descending)
+
+        if column == 'title':
+            rows.sort(key=columns.title, reverse=descending)
+        if limit is not None:
+            rows = rows[:limit]
+        return [(movie.title, movie) for movie in map(columns.movie, rows)]
+
+    @traced("storage.columnar.count")
+    def count(self):
+        """
+        Returns the number of stored movies from the file header.
+
+        Returns:
+            int: Number of movies.
+        """
+        return self._columns.count
+
+    @traced("storage.columnar.random_sample")
+    def random_sample(self, k):
+        """
+        Picks up to k distinct movies at random, each by a single offset lookup.
+
+        Args:
+            k (int): Number of movies to pick.
+
+        Returns:
+            list: (title, Movie) tuples, fewer than k if there are not enough movies.
+        """
+        columns = self._columns
+        rows = random.sample(range(columns.count), min(k, columns.count))
+        return [(movie.title, movie) for movie in map(columns.movie, rows)]
+
+    @traced("storage.columnar.aggregate_ratings")
+    def aggregate_ratings(self):
+        """
+        Computes rating statistics over the rating column.
+
+        Returns:
+            dict or None: 'count', 'average', 'median', 'best' and 'worst', where best
+                          and worst are (title, rating) tuples. None if no movies exist.
+        """
+        columns = self._columns
+        if not columns.count:
+            return None
+
+        if numpy is not None:
+            ratings = columns.numpy_columns()[1]
+            average = float(ratings.mean())
+            median = float(numpy.median(ratings))
+            best, worst = int(ratings.argmax()), int(ratings.argmin())
+        else:
+            ratings = columns.ratings
+            average = sum(ratings) / columns.count
+            ordered = sorted(ratings)
+            mid = columns.count // 2
+            median = ordered[mid] if columns.count % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+            best = max(range(columns.count), key=ratings.__getitem__)
+            worst = min(range(columns.count), key=ratings.__getitem__)
+        return {
+            'count': columns.count,
+            'average': average,
+            'median': median,
+            'best': (columns.title(best), float(columns.ratings[best])),
+            'worst': (columns.title(worst), float(columns.ratings[worst]))
+        }
+
+    @traced("storage.columnar.import_file")
+    def import_file(self, source):
+        """
+        Imports all movies from a CSV or JSON storage file with a single rewrite.
+
+        Args:
+            source (str): Path to a '.csv' or '.json' file.
+
+        Returns:
+            int: Number of imported movies.
+        """
+        if source.endswith('.csv'):
+            backend = StorageCsv(source)
+        elif source.endswith('.json'):
+            backend = StorageJson(source)
+        else:
+            raise ValueError(f"Unsupported file type: {source}")
+
+        with self._lock:
+            movies = self.list_movies()
+            imported = 0
+            for title, data in backend.iter_movies():
+                movies.add(title, data['year'], data['rating'], data.get('poster') or '',
+                           data.get('fetched_at'), data.get('imdb_id'))
+                imported += 1
+            self._save_movies(movies)
+        return imported
+
+    def close(self):
+        """
+        Unmaps the file.
+        """
+        self._columns.close()
+
+    def _title_index(self):
+        """
+        Returns the title to row mapping, building it on first use.
+        """
+        if self._index is None:
+            columns = self._columns
+            self._index = {columns.title(row): row for row in range(columns.count)}
+        return self._index
+
+    @traced("storage.columnar.save_movies")
+    def _save_movies(self, movies):
+        """
+        Writes the movies to a temporary file, moves it into place and maps it.
+
+        Args:
+            movies (MovieCollection): Movies to write.
+        """
+        # The old mapping is not closed here: iterators still reading it keep their
+        # snapshot, and it is unmapped once the last of them is done.
+        with atomic_write(self.filename, 'wb') as file:
+            _ColumnFile.write(file, movies)
+        self._columns = _ColumnFile.open(self.filename)
+        self._index = None
+        self._imdb_index = None
+
+
+class _ColumnFile:
+    """
+    A mapped columnar movie file. Column views are memoryviews into the mapping,
+    so reading a value does not copy the file.
+    """
+
+    def __init__(self, mapping, count, version=VERSION):
+        """
+        Args:
+            mapping (mmap.mmap): The mapped file, or None for an empty collection.
+            count (int): Number of movies in the file.
+            version (int): Format version of the file.
+        """
+        self._mapping = mapping
+        self.count = count
+        self.fetch_times = self._imdb_offsets = None
+        if mapping is None:
+            self.years = self.ratings = self._title_offsets = self._poster_offsets = ()
+            self._blob = b''
+            return
+
+        layout = _layout(count, version)
+        view = memoryview(mapping)
+        self.years = view[layout['years']:layout['years_end']].cast('i')
+        self.ratings = view[layout['ratings']:layout['ratings_end']].cast('d')
+        if version >= 2:
+            self.fetch_times = view[layout['ratings_end']:layout['title_offsets']].cast('d')
+        self._title_offsets = view[layout['title_offsets']:layout['poster_offsets']].cast('Q')
+        self._poster_offsets = view[layout['poster_offsets']:layout['imdb_offsets']].cast('Q')
+        if version >= 3:
+            self._imdb_offsets = view[layout['imdb_offsets']:layout['blob']].cast('Q')
+        self._blob = view[layout['blob']:]
+
+    @classmethod
+    def open(cls, filename):
+        """
+        Maps a columnar file for reading and in-place updates.
+
+        Args:
+            filename (str): Path to the file.
+
+        Returns:
+            _ColumnFile: The mapped file; empty if the file does not exist.
+
+        Raises:
+            ValueError: If the file is not a columnar movie file of this machine's byte order.
+        """
+        try:
+            with open(filename, 'r+b') as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return cls(None, 0)
+                mapping = mmap.mmap(file.fileno(), 0)
+        except FileNotFoundError:
+            return cls(None, 0)
+
+        if len(mapping) < HEADER.size:
+            mapping.close()
+            raise ValueError(f"{filename} is not a columnar movie file")
+        magic, version, byte_order, count = HEADER.unpack_from(mapping)
+        if magic != MAGIC or version not in (1, 2, VERSION):
+            mapping.close()
+            raise ValueError(f"{filename} is not a columnar movie file")
+        if byte_order != BYTE_ORDER_MARK:
+            mapping.close()
+            raise ValueError(f"{filename} was written with a different byte order")
+        return cls(mapping, count, version)
+
+    @staticmethod
+    def write(file, movies):
+        """
+        Writes movies in the columnar format.
+
+        Args:
+            file (file): Binary file to write to.
+            movies (MovieCollection): Movies to write.
+        """
+        titles = [title.encode('utf-8') for title in movies]
+        posters = [(data['poster'] or '').encode('utf-8') for data in movies.values()]
+        imdb_ids = [(data.imdb_id or '').encode('utf-8') for data in movies.values()]
+        offsets = array('Q', [0])
+        for text in titles + posters + imdb_ids:
+            offsets.append(offsets[-1] + len(text))
+
+        count = len(titles)
+        layout = _layout(count)
+        file.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, count))
+        file.write(array('i', movies.years()).tobytes())
+        file.write(b'\0' * (layout['ratings'] - layout['years_end']))
+        file.write(array('d', movies.ratings()).tobytes())
+        file.write(array('d', movies.fetch_times()).tobytes())
+        file.write(offsets[:count + 1].tobytes())
+        file.write(array('Q', (offset - offsets[count]
+                               for offset in offsets[count:2 * count + 1])).tobytes())
+        file.write(array('Q', (offset - offsets[2 * count]
+                               for offset in offsets[2 * count:])).tobytes())
+        for text in titles + posters + imdb_ids:
+            file.write(text)
+
+    def title(self, row):
+        """
+        Returns the title of a row.
+        """
+        return str(self._blob[self._title_offsets[row]:self._title_offsets[row + 1]], 'utf-8')
+
+    def movie(self, row):
+        """
+        Returns the movie of a row.
+        """
+        start = self._title_offsets[self.count]
+        poster = self._blob[start + self._poster_offsets[row]:start + self._poster_offsets[row + 1]]
+        fetched_at = self.fetch_times[row] if self.fetch_times is not None else None
+        return Movie(self.title(row), self.years[row], self.ratings[row], str(poster, 'utf-8'),
+                     fetched_at, self.imdb_id(row))
+
+    def imdb_id(self, row):
+        """
+        Returns the IMDb ID of a row, or None.
+        """
+        if self._imdb_offsets is None:
+            return None
+        start = self._title_offsets[self.count] + self._poster_offsets[self.count]
+        imdb_id = self._blob[start + self._imdb_offsets[row]:start + self._imdb_offsets[row + 1]]
+        return str(imdb_id, 'utf-8') or None
+
+    def update(self, row, year, rating):
+        """
+        Overwrites the year and rating of a row in the mapped file.
+        """
+        self.years[row] = int(year)
+        self.ratings[row] = float(rating)
+        self._mapping.flush()
+
+    def numpy_columns(self):
+        """
+        Returns the year and rating columns as NumPy arrays sharing the mapping.
+        """
+        if self._mapping is None:
+            return numpy.empty(0, dtype=numpy.int32), numpy.empty(0, dtype=numpy.float64)
+        return (numpy.frombuffer(self.years, dtype=numpy.int32),
+                numpy.frombuffer(self.ratings, dtype=numpy.float64))
+
+    def close(self):
+        """
+        Releases the column views and unmaps the file.
+        """
+        if self._mapping is None:
+            return
+        try:
+            for view in (self.years, self.ratings, self.fetch_times, self._title_offsets,
+                         self._poster_offsets, self._imdb_offsets, self._blob):
+                if view is not None:
+                    view.release()
+            self._mapping.close()
+        except BufferError:
+            pass  # still used, e.g. by NumPy arrays; unmapped once they are collected
+        self._mapping = None
+        self.count = 0
+
+
+def _layout(count, version=VERSION):
+    """
+    Returns the byte offsets of the sections of a file with count movies.
+    """
+    years = HEADER.size
+    years_end = years + 4 * count
+    ratings = (years_end + 7) // 8 * 8
+    ratings_end = ratings + 8 * count
+    title_offsets = ratings_end + 8 * count if version >= 2 else ratings_end
+    poster_offsets = title_offsets + 8 * (count + 1)
+    imdb_offsets = poster_offsets + 8 * (count + 1)
+    return {
+        'years': years,
+        'years_end': years_end,
+        'ratings': ratings,
+        'ratings_end': ratings_end,
+        'title_offsets': title_offsets,
+        'poster_offsets': poster_offsets,
+        'imdb_offsets': imdb_offsets,
+        'blob': imdb_offsets + 8 * (count + 1) if version >= 3 else imdb_offsets
+    }
+
+
+def convert(source, destination):
+    """
+    Converts a CSV or JSON movie file into a columnar file.
+
+    Args:
+        source (str): Path to a '.csv' or '.json' file.
+        destination (str): Path of the columnar file to create or extend.
+
+    Returns:
+        int: Number of converted movies.
+    """
+    storage = StorageColumnar(destination)
+    try:
+        return storage.import_file(source)
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m storage.storage_columnar <data.csv|data.json> <movies.col>")
+        sys.exit(1)
+    print(f"Converted {convert(sys.argv[1], sys.argv[2])} movies into {sys.argv[2]}.")
@@ -1,39 +1,105 @@
 import csv
+import io
 import os
+import threading
 
-from colorama import Fore, Style
-
+from instrumentation import traced
+from storage.atomic import atomic_write
 from storage.istorage import IStorage
+from storage.locking import FileLock, modify_file
+from storage.movie import Movie, MovieCollection
 
 class StorageCsv(IStorage):
     """
     StorageCsv implements the IStorage interface using a CSV file.
     It supports basic CRUD operations for movies with title, year, rating, and poster URL.
+
+    In journal mode, mutations are appended to a log next to the CSV file instead of
+    rewriting it. Reads replay the log over the CSV snapshot, and once the log grows
+    past a size threshold it is merged back into the CSV file in a background thread.
+
+    Several processes can share the file: reads take a shared and writes an exclusive
+    FileLock, a read-modify-write is retried if another process changed the file in
+    between, and the file is always replaced atomically.
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename, journal=False, compact_threshold=1024 * 1024):
+        """
+        Initializes the CSV storage with the specified filename.
+
+        Args:
+            filename (str): Path to the CSV file for storing movie data.
+            journal (bool): If True, mutations are appended to a journal file
+                            instead of rewriting the CSV file.
+            compact_threshold (int): Journal size in bytes after which it is
+                                     merged into the CSV file.
+        """
         self.filename = filename
+        self.journal = journal
+        self.journal_filename = filename + ".journal"
+        self.compact_threshold = compact_threshold
+        self.file_lock = FileLock(filename)
+        self._compact_lock = threading.Lock()
+        self._compaction = None
 
+    @traced("storage.csv.list_movies")
     def list_movies(self):
         """
         Returns all stored movies from the CSV file as a dictionary.
+        Pending journal entries are applied on top of the CSV contents.
+
+        Returns:
+            MovieCollection: Movie titles mapped to Movie records, which also support
+                             data['year'], data['rating'] and data['poster'].
+        """
+        with self.file_lock.shared():
+            movies = self._read_snapshot()
+            self._replay_journal(self._compacting_filename(), movies)
+            self._replay_journal(self.journal_filename, movies)
+        return movies
+
+    def iter_movies(self):
+        """
+        Iterates over the movies straight from the CSV reader, one row at a time,
+        without loading the whole file. Writers replace the file atomically, so the
+        iteration sees one consistent version without holding the lock. While journal
+        entries are pending, they have to be replayed first, so the movies are read
+        with list_movies().
+
+        Yields:
+            tuple: (title, Movie).
+        """
+        if self.journal and (os.path.exists(self.journal_filename) or
+                             os.path.exists(self._compacting_filename())):
+            yield from self.list_movies().items()
+            return
+        for movie in self._read_rows():
+            yield movie.title, movie
+
+    def _read_snapshot(self):
+        """
+        Reads the movies stored in the CSV file itself, without journal entries.
 
         Returns:
-            dict: Movie titles as keys and dictionaries with year, rating, and poster as values.
+            MovieCollection: Movie titles mapped to Movie records.
+        """
+        return MovieCollection(self._read_rows())
+
+    def _read_rows(self):
+        """
+        Reads the rows of the CSV file lazily.
+
+        Yields:
+            Movie: One movie per row; nothing if the file does not exist.
         """
-        movies = {}
         try:
             with open(self.filename, newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    movies[row['title']] = {
-                        'rating': float(row['rating']),
-                        'year': int(row['year']),
-                        'poster': row.get('poster', '')
-                    }
+                for row in csv.DictReader(csvfile):
+                    yield Movie(row['title'], int(row['year']), float(row['rating']),
+                                row.get('poster') or '', _to_time(row.get('fetched_at')),
+                                row.get('imdb_id') or None)
         except FileNotFoundError:
-            pass
-        return movies
+            return
 
     def add_movie(self, title, year, rating, poster):
         """
@@ -45,13 +111,53 @@ class StorageCsv(IStorage):
             rating (float): IMDb rating.
             poster (str): Poster URL.
         """
-        movies = self.list_movies()
-        movies[title] = {
-            'year': year,
-            'rating': rating,
-            'poster': poster
-        }
-        self._save_movies(movies)
+        self.write_batch([('add', title, year, rating, poster)])
+
+    def add_many(self, movies):
+        """
+        Adds several movies with a single write to the CSV file (or journal).
+
+        Args:
+            movies (list): Dictionaries with 'title', 'year', 'rating' and 'poster',
+                           and optionally 'fetched_at' and 'imdb_id'.
+        """
+        self.write_batch([('add', movie['title'], movie['year'], movie['rating'], movie['poster'],
+                           movie.get('fetched_at'), movie.get('imdb_id'))
+                          for movie in movies])
+
+    @traced("storage.csv.write_batch")
+    def write_batch(self, changes):
+        """
+        Applies a batch of changes with a single write to the CSV file (or journal).
+
+        Args:
+            changes (list): Tuples ('add', title, year, rating, poster[, fetched_at[, imdb_id]]),
+                            ('update', title, year, rating),
+                            ('refresh', title, year, rating, poster, fetched_at[, imdb_id])
+                            or ('delete', title).
+        """
+        if self.journal:
+            rows = []
+            for op, title, *fields in changes:
+                if op in ('add', 'refresh'):
+                    year, rating, poster, fetched_at, imdb_id = (*fields, None, None)[:5]
+                    rows.append([op, title, rating, year, poster, _from_time(fetched_at),
+                                 imdb_id or ''])
+                elif op == 'update':
+                    year, rating = fields
+                    rows.append([op, title, rating, year, '', '', ''])
+                else:
+                    rows.append([op, title, '', '', '', '', ''])
+            self._append_journal_rows(rows)
+            return
+        def save(movies):
+            movies.apply(changes)
+            self._save_movies(movies)
+
+        # the journal files count as well: _save_movies removes them, so entries
+        # appended by a journaling writer in between must be read first
+        modify_file(self.file_lock, (self.filename, self.journal_filename,
+                                     self._compacting_filename()), self.list_movies, save)
 
     def delete_movie(self, title):
         """
@@ -60,10 +166,7 @@ class StorageCsv(IStorage):
         Args:
             title (str): Movie title to delete.
         """
-        movies = self.list_movies()
-        if title in movies:
-            del movies[title]
-            self._save_movies(movies)
+        self.write_batch([('delete', title)])
 
     def update_movie(self, title, year, rating):
         """
@@ -75,63 +178,160 @@ class StorageCsv(IStorage):
             year (int): New release year.
             rating (float): New IMDb rating.
         """
-        movies = self.list_movies()
-        if title in movies:
-            movies[title]['year'] = year
-            movies[title]['rating'] = rating
-            self._save_movies(movies)
+        self.write_batch([('update', title, year, rating)])
+
+    @traced("storage.csv.compact")
+    def compact(self):
+        """
+        Merges the journal into the CSV file and removes the journal.
+        Mutations made while the merge is running go to a fresh journal. The merged
+        file is written with atomic_write, so a crash leaves the old file and the
+        journal to merge again.
+        """
+        with self._compact_lock:
+            compacting = self._compacting_filename()
+            with self.file_lock.exclusive():
+                if os.path.exists(self.journal_filename) and not os.path.exists(compacting):
+                    os.replace(self.journal_filename, compacting)
+                elif not os.path.exists(compacting):
+                    return
 
+            with self.file_lock.shared():
+                movies = self._read_snapshot()
+                self._replay_journal(compacting, movies)
+
+            with self.file_lock.exclusive():
+                if not os.path.exists(compacting):
+                    return  # another process finished the same compaction first
+                with atomic_write(self.filename, newline='', encoding='utf-8') as csvfile:
+                    self._write_csv(csvfile, movies)
+                os.remove(compacting)
+
+    def wait_for_compaction(self):
+        """
+        Blocks until a running background compaction has finished.
+        """
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+    def _append_journal_rows(self, rows):
+        """
+        Appends mutation rows to the journal file and starts a background
+        compaction once the journal is larger than the threshold. The rows are
+        fsynced before returning. If an earlier append was cut off by a crash,
+        its partial row is ended first, so it cannot swallow the new rows.
+
+        Args:
+            rows (list): Rows of [op, title, rating, year, poster, fetched_at, imdb_id].
+        """
+        with self.file_lock.exclusive():
+            with open(self.journal_filename, 'ab+') as journal_file:
+                if journal_file.tell() > 0:
+                    journal_file.seek(-1, os.SEEK_END)
+                    if journal_file.read(1) != b'\n':
+                        journal_file.write(b'\r\n')
+                text = io.StringIO(newline='')
+                csv.writer(text).writerows(rows)
+                journal_file.write(text.getvalue().encode('utf-8'))
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+                size = journal_file.tell()
+
+            if size >= self.compact_threshold and (
+                    self._compaction is None or not self._compaction.is_alive()):
+                self._compaction = threading.Thread(target=self.compact, daemon=True)
+                self._compaction.start()
+
+    def _replay_journal(self, path, movies):
+        """
+        Applies the mutations recorded in a journal file to a movie dictionary.
+        A last line without line break is the partial row of an append that was
+        cut off by a crash and is ignored, like any other row that cannot be parsed.
+
+        Args:
+            path (str): Path to the journal file.
+            movies (MovieCollection): Movies to update in place.
+        """
+        try:
+            with open(path, 'rb') as journal_file:
+                data = journal_file.read()
+        except FileNotFoundError:
+            return
+        data = data[:data.rfind(b'\n') + 1]
+        for row in csv.reader(io.StringIO(data.decode('utf-8', errors='replace'), newline='')):
+            try:
+                # journals written before fetch times and IMDb IDs were recorded
+                # have five or six columns
+                op, title, rating, year, poster, *extra = row
+                fetched_at, imdb_id = (*extra, '', '')[:2]
+                fetched_at, imdb_id = _to_time(fetched_at), imdb_id or None
+                if op == 'add':
+                    movies.add(title, int(year), float(rating), poster, fetched_at, imdb_id)
+                elif op == 'refresh':
+                    movies.refresh_movie(title, int(year), float(rating), poster, fetched_at,
+                                         imdb_id)
+                elif op == 'update':
+                    movies.update_movie(title, int(year), float(rating))
+                elif op == 'delete':
+                    movies.pop(title, None)
+            except ValueError:
+                continue  # damaged row
+
+    def _compacting_filename(self):
+        """
+        Returns the path the journal is moved to while it is being compacted.
+        """
+        return self.journal_filename + ".compacting"
+
+    @traced("storage.csv.save_movies")
     def _save_movies(self, movies):
         """
-        Saves the entire movie dictionary to the CSV file.
+        Saves the entire movie collection to the CSV file. The file is replaced
+        atomically, so a crash leaves either the old or the new file.
+        Since the collection already contains all journal entries, the journal is removed.
 
         Args:
-            movies (dict): Dictionary of movies to write.
+            movies (MovieCollection): Movies to write.
         """
-        with open(self.filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['title', 'rating', 'year', 'poster']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for title, data in movies.items():
-                writer.writerow({
-                    'title': title,
-                    'rating': data['rating'],
-                    'year': data['year'],
-                    'poster': data.get('poster', '')
-                })
+        with self.file_lock.exclusive():
+            with atomic_write(self.filename, newline='', encoding='utf-8') as csvfile:
+                self._write_csv(csvfile, movies)
+            for path in (self._compacting_filename(), self.journal_filename):
+                if os.path.exists(path):
+                    os.remove(path)
 
-    def generate_website(self, output_dir="website"):
+    def _write_csv(self, csvfile, movies):
         """
-        Generates a static HTML website of the movie list using a template.
+        Writes movies to an open CSV file.
 
         Args:
-            output_dir (str): Directory where the website files are located.
+            csvfile (file): Text file opened with newline=''.
+            movies (MovieCollection): Movies to write.
         """
-        movies = self.list_movies()
-        grid_html = ""
+        fieldnames = ['title', 'rating', 'year', 'poster', 'fetched_at', 'imdb_id']
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
         for title, data in movies.items():
-            grid_html += f'''
-            <div class="movie">
-                <img class="movie-poster" src="{data['poster']}">
-                <div class="movie-title">{title}</div>
-                <div class="movie-year">{data['year']}</div>
-                <div class="movie-rating">{data['rating']}</div>
-            </div>
-            '''
-
-        try:
-            with open(os.path.join(output_dir, "index_template.html"), "r", encoding="utf-8") as template_file:
-                template = template_file.read()
+            writer.writerow({
+                'title': title,
+                'rating': data['rating'],
+                'year': data['year'],
+                'poster': data.get('poster', ''),
+                'fetched_at': _from_time(data.get('fetched_at')),
+                'imdb_id': data.get('imdb_id') or ''
+            })
 
-            page = template.replace("__TEMPLATE_TITLE__", "My Movie App")
-            page = page.replace("__TEMPLATE_MOVIE_GRID__", grid_html)
 
-            with open(os.path.join(output_dir, "index.html"), "w", encoding="utf-8") as output_file:
-                output_file.write(page)
+def _to_time(value=None):
+    """
+    Parses a fetch time column; empty or missing values are None.
+    """
+    return float(value) if value else None
 
-            print(Fore.GREEN + "\nWebsite was generated successfully." + Style.RESET_ALL)
 
-        except FileNotFoundError:
-            print(Fore.RED + "\nTemplate file not found." + Style.RESET_ALL)
-        except Exception as e:
-            print(Fore.RED + f"\nAn error occurred while generating the website: {e}" + Style.RESET_ALL)
\ No newline at end of file
+def _from_time(value=None):
+    """
+    Formats a fetch time for a CSV column; None becomes an empty string.
+    """
+    return '' if value is None else repr(float(value))
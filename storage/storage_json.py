@@ -1,10 +1,20 @@
 import json
+import re
+
+from instrumentation import traced
+from storage.atomic import atomic_write
 from storage.istorage import IStorage
+from storage.locking import FileLock, modify_file
+from storage.movie import Movie, MovieCollection
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r'[ \t\n\r]*')
 
 class StorageJson(IStorage):
     """
     StorageJson implements the IStorage interface using a JSON file.
     It allows storing and retrieving movies with title, year, rating, and poster URL.
+    Like StorageCsv, it can be shared by several processes (see FileLock).
     """
 
     def __init__(self, filename):
@@ -15,20 +25,40 @@ class StorageJson(IStorage):
             filename (str): Path to the JSON file for storing movie data.
         """
         self.filename = filename
+        self.file_lock = FileLock(filename)
 
+    @traced("storage.json.list_movies")
     def list_movies(self):
         """
-        Returns all stored movies as a dictionary.
+        Returns all stored movies.
 
         Returns:
-            dict: Movie titles as keys and dictionaries with year, rating,
-                  and poster as values.
+            MovieCollection: Movie titles mapped to Movie records, which also support
+                             data['year'], data['rating'] and data['poster'].
+        """
+        try:
+            with self.file_lock.shared(), open(self.filename, 'r', encoding='utf-8') as file:
+                return MovieCollection.from_mapping(json.load(file))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return MovieCollection()
+
+    def iter_movies(self):
+        """
+        Iterates over the movies while the JSON file is being read, so only one
+        movie is decoded at a time instead of the whole file. Like list_movies(),
+        a missing file yields nothing; a damaged file ends the iteration at the
+        damaged entry.
+
+        Yields:
+            tuple: (title, Movie).
         """
         try:
             with open(self.filename, 'r', encoding='utf-8') as file:
-                return json.load(file)
+                for title, data in iter_json_object(file):
+                    yield title, Movie(title, data['year'], data['rating'], data.get('poster', ''),
+                                       data.get('fetched_at'), data.get('imdb_id'))
         except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+            return
 
     def add_movie(self, title, year, rating, poster):
         """
@@ -40,13 +70,36 @@ class StorageJson(IStorage):
             rating (float): IMDb rating.
             poster (str): URL to the movie poster.
         """
-        movies = self.list_movies()
-        movies[title] = {
-            "year": year,
-            "rating": rating,
-            "poster": poster
-        }
-        self._save_movies(movies)
+        self.write_batch([("add", title, year, rating, poster)])
+
+    def add_many(self, movies):
+        """
+        Adds several movies with a single write to the JSON file.
+
+        Args:
+            movies (list): Dictionaries with 'title', 'year', 'rating' and 'poster',
+                           and optionally 'fetched_at' and 'imdb_id'.
+        """
+        self.write_batch([("add", movie["title"], movie["year"], movie["rating"], movie["poster"],
+                           movie.get("fetched_at"), movie.get("imdb_id"))
+                          for movie in movies])
+
+    @traced("storage.json.write_batch")
+    def write_batch(self, changes):
+        """
+        Applies a batch of changes with a single write to the JSON file.
+
+        Args:
+            changes (list): Tuples ('add', title, year, rating, poster[, fetched_at[, imdb_id]]),
+                            ('update', title, year, rating),
+                            ('refresh', title, year, rating, poster, fetched_at[, imdb_id])
+                            or ('delete', title).
+        """
+        def save(movies):
+            movies.apply(changes)
+            self._save_movies(movies)
+
+        modify_file(self.file_lock, self.filename, self.list_movies, save)
 
     def delete_movie(self, title):
         """
@@ -55,10 +108,7 @@ class StorageJson(IStorage):
         Args:
             title (str): Title of the movie to delete.
         """
-        movies = self.list_movies()
-        if title in movies:
-            del movies[title]
-            self._save_movies(movies)
+        self.write_batch([("delete", title)])
 
     def update_movie(self, title, year, rating):
         """
@@ -70,18 +120,99 @@ class StorageJson(IStorage):
             year (int): New release year.
             rating (float): New IMDb rating.
         """
-        movies = self.list_movies()
-        if title in movies:
-            movies[title]["year"] = year
-            movies[title]["rating"] = rating
-            self._save_movies(movies)
+        self.write_batch([("update", title, year, rating)])
 
+    @traced("storage.json.save_movies")
     def _save_movies(self, movies):
         """
-        Saves the current movie dictionary to the JSON file.
+        Saves the current movies to the JSON file. The file is replaced atomically,
+        so a crash leaves either the old or the new file.
 
         Args:
-            movies (dict): Dictionary of movie data to be saved.
+            movies (MovieCollection): Movies to be saved.
         """
-        with open(self.filename, 'w', encoding='utf-8') as file:
-            json.dump(movies, file, indent=4)
+        with self.file_lock.exclusive(), atomic_write(self.filename, encoding='utf-8') as file:
+            json.dump(movies.to_dict(), file, indent=4)
+
+
+def iter_json_object(file, chunk_size=CHUNK_SIZE):
+    """
+    Incrementally decodes a JSON file whose top level is an object, reading it in
+    chunks. Each member value is decoded with the standard decoder as soon as it
+    is complete, so memory use depends on the largest member, not on the file.
+
+    Args:
+        file (file): Text file positioned at the start of the JSON document.
+        chunk_size (int): Number of characters read at a time.
+
+    Yields:
+        tuple: (key, value) for each member of the top-level object.
+
+    Raises:
+        json.JSONDecodeError: If the document is not a valid JSON object.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = file.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    def next_char():
+        """
+        Skips whitespace and returns the next character, or '' at the end of the file.
+        """
+        nonlocal position
+        while True:
+            position = WHITESPACE.match(buffer, position).end()
+            if position < len(buffer) or eof:
+                return buffer[position:position + 1]
+            fill()
+
+    def decode():
+        """
+        Decodes the next JSON value, reading more of the file until it is complete.
+        A value ending exactly at the end of the buffer (e.g. a number) could
+        continue in the next chunk, so it is only accepted at the end of the file.
+        """
+        nonlocal position
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+                if end < len(buffer) or eof:
+                    position = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+
+    def expect(char):
+        nonlocal position
+        if next_char() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", buffer, position)
+        position += 1
+
+    expect('{')
+    if next_char() == '}':
+        return
+    while True:
+        next_char()
+        key = decode()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Expecting property name", buffer, position)
+        expect(':')
+        next_char()
+        yield key, decode()
+        separator = next_char()
+        position += 1
+        if separator == '}':
+            return
+        if separator != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position - 1)
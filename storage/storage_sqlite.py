@@ -0,0 +1,368 @@
+import random
+import sqlite3
+import sys
+import threading
+
+from instrumentation import traced
+from storage.istorage import IStorage
+from storage.movie import Movie, MovieCollection
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+
+ORDER_COLUMNS = {'title', 'year', 'rating'}
+UPSERT_SQL = '''
+    INSERT INTO movies (title, year, rating, poster, fetched_at, imdb_id) VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (title) DO UPDATE SET
+        year = excluded.year, rating = excluded.rating, poster = excluded.poster,
+        fetched_at = excluded.fetched_at, imdb_id = excluded.imdb_id
+'''
+REFRESH_SQL = '''
+    UPDATE movies SET year = ?, rating = ?, poster = ?, fetched_at = ?,
+        imdb_id = COALESCE(?, imdb_id)
+    WHERE title = ?
+'''
+
+class StorageSqlite(IStorage):
+    """
+    StorageSqlite implements the IStorage interface using a SQLite database.
+    Titles are unique and the year, rating and IMDb ID columns are indexed, so
+    filtering, sorting, statistics and ID lookups can be answered by SQLite without
+    loading every movie.
+    """
+
+    def __init__(self, filename):
+        """
+        Opens (and if needed creates) the SQLite database.
+
+        Args:
+            filename (str): Path to the SQLite database file.
+        """
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        with self._connection:
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS movies (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL UNIQUE,
+                    year INTEGER NOT NULL,
+                    rating REAL NOT NULL,
+                    poster TEXT NOT NULL DEFAULT '',
+                    fetched_at REAL,
+                    imdb_id TEXT
+                )
+            ''')
+            columns = {row[1] for row in self._connection.execute('PRAGMA table_info(movies)')}
+            if 'fetched_at' not in columns:  # database created before fetch times were stored
+                self._connection.execute('ALTER TABLE movies ADD COLUMN fetched_at REAL')
+            if 'imdb_id' not in columns:  # database created before IMDb IDs were stored
+                self._connection.execute('ALTER TABLE movies ADD COLUMN imdb_id TEXT')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS idx_movies_year ON movies (year)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS idx_movies_rating ON movies (rating)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS idx_movies_imdb_id ON movies (imdb_id)')
+
+    @traced("storage.sqlite.list_movies")
+    def list_movies(self):
+        """
+        Returns all stored movies in insertion order.
+
+        Returns:
+            MovieCollection: Movie titles mapped to Movie records.
+        """
+        movies = MovieCollection()
+        with self._lock:
+            for row in self._connection.execute(
+                    'SELECT title, year, rating, poster, fetched_at, imdb_id FROM movies ORDER BY id'):
+                movies.add(*row)
+        return movies
+
+    def iter_movies(self, batch_size=500):
+        """
+        Iterates over the movies in insertion order, fetching them in batches by id,
+        so the lock is only held while a batch is read.
+
+        Args:
+            batch_size (int): Number of rows fetched per query.
+
+        Yields:
+            tuple: (title, Movie).
+        """
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    'SELECT id, title, year, rating, poster, fetched_at, imdb_id FROM movies '
+                    'WHERE id > ? ORDER BY id LIMIT ?', (last_id, batch_size)).fetchall()
+            for row in rows:
+                yield row[1], Movie(*row[1:])
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    @traced("storage.sqlite.get_movie")
+    def get_movie(self, title):
+        """
+        Looks up a single movie by its unique title.
+
+        Args:
+            title (str): The movie title.
+
+        Returns:
+            Movie or None: The movie, or None if it does not exist.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT year, rating, poster, fetched_at, imdb_id FROM movies WHERE title = ?',
+                (title,)).fetchone()
+        if row is None:
+            return None
+        return Movie(title, *row)
+
+    @traced("storage.sqlite.get_by_imdb_id")
+    def get_by_imdb_id(self, imdb_id):
+        """
+        Looks up a single movie by its IMDb ID using the ID index.
+
+        Args:
+            imdb_id (str): The IMDb ID.
+
+        Returns:
+            Movie or None: The movie, or None if no movie has this ID.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT title, year, rating, poster, fetched_at, imdb_id FROM movies '
+                'WHERE imdb_id = ? ORDER BY id LIMIT 1', (imdb_id,)).fetchone()
+        return None if row is None else Movie(*row)
+
+    def add_movie(self, title, year, rating, poster):
+        """
+        Adds a new movie, or replaces the data of a movie with the same title.
+
+        Args:
+            title (str): Movie title.
+            year (int): Release year.
+            rating (float): IMDb rating.
+            poster (str): Poster URL.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(UPSERT_SQL, (title, year, rating, poster or '', None, None))
+
+    def add_many(self, movies):
+        """
+        Adds several movies in one transaction.
+
+        Args:
+            movies (list): Dictionaries with 'title', 'year', 'rating' and 'poster',
+                           and optionally 'fetched_at' and 'imdb_id'.
+        """
+        rows = [(movie['title'], movie['year'], movie['rating'], movie['poster'] or '',
+                 movie.get('fetched_at'), movie.get('imdb_id')) for movie in movies]
+        with self._lock, self._connection:
+            self._connection.executemany(UPSERT_SQL, rows)
+
+    @traced("storage.sqlite.write_batch")
+    def write_batch(self, changes):
+        """
+        Applies a batch of changes in a single SQLite transaction.
+
+        Args:
+            changes (list): Tuples ('add', title, year, rating, poster[, fetched_at[, imdb_id]]),
+                            ('update', title, year, rating),
+                            ('refresh', title, year, rating, poster, fetched_at[, imdb_id])
+                            or ('delete', title).
+        """
+        with self._lock, self._connection:
+            for op, title, *fields in changes:
+                if op == 'add':
+                    year, rating, poster, fetched_at, imdb_id = (*fields, None, None)[:5]
+                    self._connection.execute(UPSERT_SQL, (title, year, rating, poster or '',
+                                                          fetched_at, imdb_id))
+                elif op == 'refresh':
+                    year, rating, poster, fetched_at, imdb_id = (*fields, None)[:5]
+                    self._connection.execute(REFRESH_SQL, (year, rating, poster or '',
+                                                           fetched_at, imdb_id, title))
+                elif op == 'update':
+                    year, rating = fields
+                    self._connection.execute(
+                        'UPDATE movies SET year = ?, rating = ? WHERE title = ?',
+                        (year, rating, title))
+                elif op == 'delete':
+                    self._connection.execute('DELETE FROM movies WHERE title = ?', (title,))
+                else:
+                    raise ValueError(f"Unknown change '{op}'")
+
+    def delete_movie(self, title):
+        """
+        Deletes a movie by title.
+
+        Args:
+            title (str): Movie title to delete.
+        """
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM movies WHERE title = ?', (title,))
+
+    def update_movie(self, title, year, rating):
+        """
+        Updates the year and rating of a movie.
+        Poster remains unchanged.
+
+        Args:
+            title (str): Movie title to update.
+            year (int): New release year.
+            rating (float): New IMDb rating.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                'UPDATE movies SET year = ?, rating = ? WHERE title = ?', (year, rating, title))
+
+    @traced("storage.sqlite.query")
+    def query(self, min_rating=None, year_range=None, order_by=None, limit=None):
+        """
+        Returns the movies matching the given criteria, filtered and sorted by SQLite.
+
+        Args:
+            min_rating (float): Minimum rating, or None for no limit.
+            year_range (tuple): (start year, end year), either of which may be None.
+            order_by (str): 'title', 'year' or 'rating', prefixed with '-' for
+                            descending order. None keeps insertion order.
+            limit (int): Maximum number of movies to return, or None for all.
+
+        Returns:
+            list: (title, Movie) tuples.
+        """
+        sql = 'SELECT title, year, rating, poster, fetched_at, imdb_id FROM movies'
+        conditions = []
+        params = []
+        if min_rating is not None:
+            conditions.append('rating >= ?')
+            params.append(min_rating)
+        start_year, end_year = year_range or (None, None)
+        if start_year is not None:
+            conditions.append('year >= ?')
+            params.append(start_year)
+        if end_year is not None:
+            conditions.append('year <= ?')
+            params.append(end_year)
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+
+        if order_by:
+            column = order_by.lstrip('-')
+            if column not in ORDER_COLUMNS:
+                raise ValueError(f"Cannot order movies by '{order_by}'")
+            direction = 'DESC' if order_by.startswith('-') else 'ASC'
+            sql += f' ORDER BY {column} {direction}, id'
+        else:
+            sql += ' ORDER BY id'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return [(row[0], Movie(*row)) for row in rows]
+
+    @traced("storage.sqlite.count")
+    def count(self):
+        """
+        Returns the number of stored movies.
+
+        Returns:
+            int: Number of movies.
+        """
+        with self._lock:
+            (count,) = self._connection.execute('SELECT COUNT(*) FROM movies').fetchone()
+        return count
+
+    @traced("storage.sqlite.random_sample")
+    def random_sample(self, k):
+        """
+        Picks up to k distinct movies at random by row offset, without loading the table.
+
+        Args:
+            k (int): Number of movies to pick.
+
+        Returns:
+            list: (title, Movie) tuples, fewer than k if there are not enough movies.
+        """
+        with self._lock:
+            (count,) = self._connection.execute('SELECT COUNT(*) FROM movies').fetchone()
+            rows = [
+                self._connection.execute(
+                    'SELECT title, year, rating, poster, fetched_at, imdb_id FROM movies '
+                    'ORDER BY id LIMIT 1 OFFSET ?', (offset,)).fetchone()
+                for offset in random.sample(range(count), min(k, count))
+            ]
+        return [(row[0], Movie(*row)) for row in rows]
+
+    @traced("storage.sqlite.aggregate_ratings")
+    def aggregate_ratings(self):
+        """
+        Computes rating statistics inside SQLite using the rating index.
+
+        Returns:
+            dict or None: 'count', 'average', 'median', 'best' and 'worst', where best
+                          and worst are (title, rating) tuples. None if no movies exist.
+        """
+        with self._lock:
+            count, average = self._connection.execute(
+                'SELECT COUNT(*), AVG(rating) FROM movies').fetchone()
+            if not count:
+                return None
+            (median,) = self._connection.execute(
+                'SELECT AVG(rating) FROM (SELECT rating FROM movies ORDER BY rating '
+                'LIMIT ? OFFSET ?)', (2 - count % 2, (count - 1) // 2)).fetchone()
+            best = self._connection.execute(
+                'SELECT title, rating FROM movies ORDER BY rating DESC, id LIMIT 1').fetchone()
+            worst = self._connection.execute(
+                'SELECT title, rating FROM movies ORDER BY rating ASC, id LIMIT 1').fetchone()
+        return {
+            'count': count,
+            'average': average,
+            'median': median,
+            'best': best,
+            'worst': worst
+        }
+
+    @traced("storage.sqlite.import_file")
+    def import_file(self, source):
+        """
+        Imports all movies from a CSV or JSON storage file in a single transaction.
+
+        Args:
+            source (str): Path to a '.csv' or '.json' file.
+
+        Returns:
+            int: Number of imported movies.
+        """
+        if source.endswith('.csv'):
+            movies = StorageCsv(source).list_movies()
+        elif source.endswith('.json'):
+            movies = StorageJson(source).list_movies()
+        else:
+            raise ValueError(f"Unsupported file type: {source}")
+
+        rows = [(title, data['year'], data['rating'], data.get('poster') or '',
+                 data.get('fetched_at'), data.get('imdb_id')) for title, data in movies.items()]
+        with self._lock, self._connection:
+            self._connection.executemany(UPSERT_SQL, rows)
+        return len(rows)
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self._connection.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m storage.storage_sqlite <data.csv|data.json> <database.db>")
+        sys.exit(1)
+    storage = StorageSqlite(sys.argv[2])
+    print(f"Imported {storage.import_file(sys.argv[1])} movies into {sys.argv[2]}.")
+    storage.close()
@@ -0,0 +1,108 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+STUB_MOVIES = {
+    "Inception": {"Title": "Inception", "Year": "2010", "imdbRating": "8.8",
+                  "Poster": "http://example.com/inception.jpg", "imdbID": "tt1375666",
+                  "Genre": "Action, Adventure, Sci-Fi", "Runtime": "148 min",
+                  "Director": "Christopher Nolan", "imdbVotes": "2,345,678", "Response": "True"},
+    "Shrek": {"Title": "Shrek", "Year": "2001", "imdbRating": "7.9",
+              "Poster": "http://example.com/shrek.jpg", "imdbID": "tt0126029",
+              "Genre": "Animation, Comedy", "Runtime": "90 min",
+              "Director": "Andrew Adamson, Vicky Jenson", "imdbVotes": "712,000", "Response": "True"},
+    "Flaky": {"Title": "Flaky", "Year": "1999", "imdbRating": "6.1",
+              "Poster": "http://example.com/flaky.jpg", "Response": "True"},
+    "Dune": {"Title": "Dune", "Year": "1984", "imdbRating": "6.3", "Poster": "N/A",
+             "imdbID": "tt0087182", "Genre": "Action, Adventure, Sci-Fi", "Runtime": "137 min",
+             "Director": "David Lynch", "imdbVotes": "180,000", "Response": "True"},
+    "Dune (2021)": {"Title": "Dune", "Year": "2021", "imdbRating": "8.0",
+                    "Poster": "http://example.com/dune.jpg", "imdbID": "tt1160419",
+                    "Genre": "Action, Adventure, Drama", "Runtime": "155 min",
+                    "Director": "Denis Villeneuve", "imdbVotes": "900,000", "Response": "True"},
+    "Dune Drifter": {"Title": "Dune Drifter", "Year": "2020–2021", "imdbRating": "N/A",
+                     "Poster": "N/A", "imdbID": "tt9999999", "Genre": "N/A", "Runtime": "N/A",
+                     "Director": "N/A", "imdbVotes": "N/A", "Response": "True"},
+}
+NOT_FOUND = {"Response": "False", "Error": "Movie not found!"}
+SEARCH_ERRORS = {"a": "Too many results.", "limit": "Request limit reached!"}
+
+class StubOmdbHandler(BaseHTTPRequestHandler):
+    """
+    Answers OMDb title (t=), IMDb ID (i=) and search (s=) requests from STUB_MOVIES
+    over keep-alive connections. The title 'Flaky' fails with a server error on its
+    first request, and 'Maintenance' is answered with an HTML page. Search answers list the first hit twice, as OMDb sometimes does;
+    the queries in SEARCH_ERRORS are answered with an OMDb error.
+    """
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+    client_ports = set()
+
+    def do_GET(self):
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        if "s" in params:
+            self.requests_seen.append(f"search:{params['s']}")
+            if params["s"] in SEARCH_ERRORS:
+                self.send_json({"Response": "False", "Error": SEARCH_ERRORS[params["s"]]})
+                return
+            hits = [{"Title": movie["Title"], "Year": movie["Year"], "imdbID": movie["imdbID"],
+                     "Type": "movie"}
+                    for movie in STUB_MOVIES.values()
+                    if "imdbID" in movie and params["s"].casefold() in movie["Title"].casefold()]
+            data = {"Search": hits + hits[:1], "totalResults": str(len(hits)), "Response": "True"} \
+                if hits else NOT_FOUND
+            self.send_json(data)
+            return
+        if "i" in params:
+            self.requests_seen.append(params["i"])
+            self.send_json(next((movie for movie in STUB_MOVIES.values()
+                                 if movie.get("imdbID") == params["i"]), NOT_FOUND))
+            return
+
+        title = params["t"]
+        self.requests_seen.append(title)
+        self.client_ports.add(self.client_address[1])
+        if title == "Flaky" and self.requests_seen.count("Flaky") == 1:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if title == "Maintenance":
+            body = b"<html><body>Down for maintenance</body></html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_json(STUB_MOVIES.get(title, NOT_FOUND))
+
+    def send_json(self, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def omdb_server():
+    """
+    Runs a stub OMDb server in a background thread.
+
+    Yields:
+        str: The base URL of the stub server.
+    """
+    StubOmdbHandler.requests_seen = []
+    StubOmdbHandler.client_ports = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOmdbHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from storage.aggregates import RatingAggregates
+from storage.storage_cached import CachedStorage
+from storage.storage_json import StorageJson
+
+TEST_FILE_JSON = "test_data.json"
+
+def expected_summary(movies):
+    """
+    Computes the rating statistics of a movie dict from scratch.
+    """
+    ratings = sorted(data["rating"] for data in movies.values())
+    mid = len(ratings) // 2
+    return {
+        "count": len(ratings),
+        "average": pytest.approx(sum(ratings) / len(ratings)),
+        "median": pytest.approx(ratings[mid] if len(ratings) % 2
+                                else (ratings[mid - 1] + ratings[mid]) / 2),
+        "best": max(data["rating"] for data in movies.values()),
+        "worst": min(data["rating"] for data in movies.values()),
+    }
+
+def test_aggregates_follow_random_mutations():
+    """
+    Tests that the running aggregates match a full recomputation after
+    every add, update and delete.
+    """
+    rng = random.Random(7)
+    movies = {}
+    aggregates = RatingAggregates()
+    for step in range(500):
+        title = f"Movie {rng.randrange(60)}"
+        operation = rng.random()
+        if operation < 0.5:
+            rating = round(rng.uniform(1, 10), 1)
+            movies[title] = {"rating": rating}
+            aggregates.add(title, rating)
+        elif operation < 0.75:
+            rating = round(rng.uniform(1, 10), 1)
+            if title in movies:
+                movies[title]["rating"] = rating
+            aggregates.update(title, rating)
+        else:
+            movies.pop(title, None)
+            aggregates.remove(title)
+
+        summary = aggregates.summary()
+        if not movies:
+            assert summary is None
+            continue
+        expected = expected_summary(movies)
+        assert summary["count"] == expected["count"]
+        assert summary["average"] == expected["average"]
+        assert summary["median"] == expected["median"]
+        assert summary["best"][1] == expected["best"]
+        assert summary["worst"][1] == expected["worst"]
+        assert movies[summary["best"][0]]["rating"] == expected["best"]
+
+def test_cached_storage_keeps_aggregates():
+    """
+    Tests that CachedStorage answers statistics from its running aggregates.
+    """
+    with open(TEST_FILE_JSON, "w", encoding="utf-8") as f:
+        f.write("{}")
+    storage = CachedStorage(StorageJson(TEST_FILE_JSON))
+    assert storage.aggregate_ratings() is None
+
+    storage.add_movie("A", 2000, 6.0, "")
+    storage.add_movie("B", 2001, 8.0, "")
+    storage.add_movie("C", 2002, 7.0, "")
+    storage.update_movie("A", 2000, 9.0)
+    storage.delete_movie("B")
+
+    stats = storage.aggregate_ratings()
+    assert stats["count"] == 2
+    assert stats["median"] == 8.0
+    assert stats["best"] == ("A", 9.0)
+    assert stats["worst"] == ("C", 7.0)
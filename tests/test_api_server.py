@@ -0,0 +1,164 @@
+import asyncio
+import http.client
+import json
+import threading
+
+import pytest
+
+import api_server
+from api_server import ApiServer
+from movie_service import MovieService
+from omdb_api import OmdbClient
+from storage.storage_cached import CachedStorage
+from storage.storage_csv import StorageCsv
+
+@pytest.fixture
+def api(tmp_path, omdb_server):
+    """
+    Runs an ApiServer over a CSV storage in a background event loop, fetching
+    from the stub OMDb server.
+
+    Yields:
+        http.client.HTTPConnection: A keep-alive connection to the server.
+    """
+    storage = StorageCsv(str(tmp_path / "movies.csv"))
+    storage.add_many([
+        {"title": "The Godfather", "year": 1972, "rating": 9.2, "poster": ""},
+        {"title": "AC/DC: Live", "year": 1992, "rating": 8.1, "poster": ""},
+        {"title": "Cats", "year": 2019, "rating": 2.8, "poster": ""},
+    ])
+    client = OmdbClient(api_key="test", base_url=omdb_server)
+    server = ApiServer(MovieService(CachedStorage(storage), omdb_client=client), port=0)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    connection = http.client.HTTPConnection(server.host, server.port, timeout=5)
+    yield connection
+    connection.close()
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    client.close()
+
+def request(connection, method, path, body=None):
+    connection.request(method, path, body=None if body is None else json.dumps(body))
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+def test_reads(api):
+    """
+    Tests listing, filtering, sorting, searching and statistics.
+    """
+    status, data = request(api, "GET", "/movies")
+    assert status == 200 and data["count"] == 3
+    status, data = request(api, "GET", "/movies?sort=rating&limit=2")
+    assert [m["title"] for m in data["movies"]] == ["The Godfather", "AC/DC: Live"]
+    status, data = request(api, "GET", "/movies?min_rating=5&start_year=1980")
+    assert [m["title"] for m in data["movies"]] == ["AC/DC: Live"]
+    status, data = request(api, "GET", "/movies/AC%2FDC%3A%20Live")
+    assert status == 200 and data["year"] == 1992
+    status, data = request(api, "GET", "/search?q=godfathr")
+    assert data["movies"][0]["title"] == "The Godfather"
+    status, data = request(api, "GET", "/stats")
+    assert data["count"] == 3 and data["best"] == ["The Godfather", 9.2]
+    status, data = request(api, "GET", "/stats/detailed?k=1")
+    assert status == 200 and data["top"] == [["The Godfather", 9.2]]
+    status, data = request(api, "GET", "/random")
+    assert status == 200 and "title" in data
+
+def test_movies_are_paged(api, monkeypatch):
+    """
+    Tests that /movies returns a page of DEFAULT_PAGE_SIZE movies unless a limit is
+    given, starting at offset, and caps the limit at MAX_PAGE_SIZE.
+    """
+    monkeypatch.setattr(api_server, "DEFAULT_PAGE_SIZE", 2)
+    monkeypatch.setattr(api_server, "MAX_PAGE_SIZE", 2)
+    status, data = request(api, "GET", "/movies")
+    assert status == 200 and data["count"] == 2
+    assert [m["title"] for m in data["movies"]] == ["The Godfather", "AC/DC: Live"]
+    status, data = request(api, "GET", "/movies?offset=2&limit=5")
+    assert data["offset"] == 2 and [m["title"] for m in data["movies"]] == ["Cats"]
+    status, data = request(api, "GET", "/movies?sort=rating&offset=1&limit=1")
+    assert [m["title"] for m in data["movies"]] == ["AC/DC: Live"]
+    assert request(api, "GET", "/movies?offset=-1")[0] == 400
+
+def test_writes_and_errors(api, tmp_path):
+    """
+    Tests adding, updating and deleting movies, that the changes reach the
+    file, and the error status codes.
+    """
+    status, data = request(api, "POST", "/movies", {"title": "Shrek", "year": 2001, "rating": 7.9})
+    assert status == 201 and data["title"] == "Shrek"
+    status, data = request(api, "PUT", "/movies/Shrek", {"year": 2001, "rating": 8.0})
+    assert status == 200 and data["rating"] == 8.0
+    assert StorageCsv(str(tmp_path / "movies.csv")).get_movie("Shrek")["rating"] == 8.0
+    status, data = request(api, "DELETE", "/movies/Shrek")
+    assert status == 200
+
+    assert request(api, "DELETE", "/movies/Shrek")[0] == 404
+    assert request(api, "GET", "/unknown")[0] == 404
+    assert request(api, "PATCH", "/movies/Cats", {})[0] == 405
+    assert request(api, "POST", "/movies", ["Shrek"])[0] == 400
+    assert request(api, "PUT", "/movies/Cats", {"year": "new", "rating": 1})[0] == 400
+    assert request(api, "GET", "/movies?sort=length")[0] == 400
+    assert request(api, "GET", "/search")[0] == 400
+
+def test_add_fetched_movie(api, tmp_path):
+    """
+    Tests that a movie fetched from OMDb is stored with its IMDb ID and fetch time.
+    """
+    status, data = request(api, "POST", "/movies", {"title": "Inception"})
+    assert status == 201 and data["imdb_id"] == "tt1375666"
+    movie = StorageCsv(str(tmp_path / "movies.csv")).get_by_imdb_id("tt1375666")
+    assert movie.title == "Inception" and movie.fetched_at is not None
+
+def test_slow_write_does_not_block_the_server(api, monkeypatch):
+    """
+    Tests that the server keeps answering while a mutation is written.
+    """
+    started, release = threading.Event(), threading.Event()
+    write_batch = StorageCsv.write_batch
+
+    def slow_write_batch(storage, changes):
+        started.set()
+        assert release.wait(5)
+        write_batch(storage, changes)
+
+    monkeypatch.setattr(StorageCsv, "write_batch", slow_write_batch)
+    writer = http.client.HTTPConnection(api.host, api.port, timeout=5)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(request(writer, "DELETE", "/movies/Cats")))
+    thread.start()
+    assert started.wait(5)
+    assert request(api, "GET", "/unknown")[0] == 404
+    release.set()
+    thread.join()
+    writer.close()
+    assert result[0][0] == 200
+    assert request(api, "GET", "/movies")[1]["count"] == 2
+
+def test_slow_read_does_not_block_the_server(api, monkeypatch):
+    """
+    Tests that building the detailed statistics runs off the event loop.
+    """
+    started, release = threading.Event(), threading.Event()
+    detailed_stats = MovieService.detailed_stats
+
+    def slow_detailed_stats(service, k=5):
+        started.set()
+        assert release.wait(5)
+        return detailed_stats(service, k=k)
+
+    monkeypatch.setattr(MovieService, "detailed_stats", slow_detailed_stats)
+    reader = http.client.HTTPConnection(api.host, api.port, timeout=5)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(request(reader, "GET", "/stats/detailed")))
+    thread.start()
+    assert started.wait(5)
+    assert request(api, "GET", "/unknown")[0] == 404
+    release.set()
+    thread.join()
+    reader.close()
+    assert result[0][0] == 200
@@ -0,0 +1,76 @@
+from bulk_import import fetch_many, import_search, import_titles, read_titles
+from conftest import StubOmdbHandler
+from omdb_api import OmdbClient
+from storage.storage_json import StorageJson
+
+def test_fetch_many_retries_and_reports_progress(omdb_server):
+    """
+    Tests concurrent fetching against the stub server, including a retried
+    server error, a missing title and the progress callback.
+    """
+    progress = []
+    with OmdbClient(api_key="test", base_url=omdb_server, retries=0) as client:
+        movies, failures = fetch_many(
+            ["Inception", "Flaky", "Unknown", "Shrek"],
+            fetch=client.fetch, max_workers=4, requests_per_second=None, backoff=0.01,
+            progress=lambda done, total, title, error: progress.append((done, total)))
+
+    assert [movie["title"] for movie in movies] == ["Inception", "Flaky", "Shrek"]
+    assert movies[0] == {"title": "Inception", "year": 2010, "rating": 8.8,
+                         "poster": "http://example.com/inception.jpg", "imdb_id": "tt1375666",
+                         "genre": ["Action", "Adventure", "Sci-Fi"], "runtime": 148,
+                         "director": "Christopher Nolan", "votes": 2345678}
+    assert list(failures) == ["Unknown"]
+    assert StubOmdbHandler.requests_seen.count("Flaky") == 2
+    assert sorted(progress) == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+def test_import_titles_writes_to_storage(omdb_server, tmp_path):
+    """
+    Tests that titles read from a file end up in the storage.
+    """
+    titles_file = tmp_path / "titles.txt"
+    titles_file.write_text("Inception\n\n# comment\nShrek\nInception\n", encoding="utf-8")
+    titles = read_titles(str(titles_file))
+    assert titles == ["Inception", "Shrek"]
+
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    with OmdbClient(api_key="test", base_url=omdb_server) as client:
+        movies, failures = import_titles(storage, titles, fetch=client.fetch)
+
+    assert not failures
+    assert set(storage.list_movies()) == {"Inception", "Shrek"}
+
+def test_import_search_dedupes_by_imdb_id(omdb_server, tmp_path):
+    """
+    Tests that a search import skips stored IMDb IDs, fetches the others by ID
+    and stores a second movie with a taken title under 'Title (Year)'.
+    """
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    storage.add_many([{"title": "Dune Drifter", "year": 2020, "rating": 5.0, "poster": "",
+                       "imdb_id": "tt9999999"}])
+    with OmdbClient(api_key="test", base_url=omdb_server) as client:
+        movies, failures = import_search(storage, "dune", client=client, requests_per_second=None)
+        assert import_search(storage, "dune", client=client, requests_per_second=None) == ([], {})
+
+    assert not failures
+    assert [movie["title"] for movie in movies] == ["Dune", "Dune (2021)"]
+    assert sorted(request for request in StubOmdbHandler.requests_seen
+                  if not request.startswith("search:")) == ["tt0087182", "tt1160419"]
+    assert storage.get_by_imdb_id("tt1160419").title == "Dune (2021)"
+    assert storage.get_movie("Dune").to_dict()["imdb_id"] == "tt0087182"
+    assert storage.get_movie("Dune Drifter")["rating"] == 5.0
+
+def test_fetch_many_keeps_results_on_unexpected_errors():
+    """
+    Tests that an unexpected exception of one title is reported as failure
+    instead of discarding the other results.
+    """
+    def fetch(title):
+        if title == "Broken":
+            raise ValueError("Expecting value")
+        return {"title": title}
+
+    movies, failures = fetch_many(["Inception", "Broken", "Shrek"], fetch=fetch,
+                                  requests_per_second=None)
+    assert movies == [{"title": "Inception"}, {"title": "Shrek"}]
+    assert failures == {"Broken": "ValueError('Expecting value')"}
@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+
+import cli
+from omdb_api import OmdbClient
+from storage.storage_json import StorageJson
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run(storage_path, *argv, omdb_client=None):
+    """
+    Runs a CLI command and returns the exit code, stdout and stderr.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    args = cli.build_parser().parse_args(["--storage", storage_path, *argv])
+    code = cli.run(args, stdout=stdout, stderr=stderr, omdb_client=omdb_client)
+    return code, stdout.getvalue(), stderr.getvalue()
+
+def test_commands_write_ndjson_and_csv(tmp_path):
+    """
+    Tests adding, listing, filtering, searching and statistics in both output formats.
+    """
+    path = str(tmp_path / "movies.json")
+    assert run(path, "add", "The Godfather", "--year", "1972", "--rating", "9.2")[0] == 0
+    assert run(path, "add", "Cats", "--year", "2019", "--rating", "2.8")[0] == 0
+
+    code, out, _ = run(path, "list", "--sort", "rating")
+    assert code == 0
+    assert [json.loads(line)["title"] for line in out.splitlines()] == ["The Godfather", "Cats"]
+
+    code, out, _ = run(path, "--format", "csv", "filter", "--min-rating", "5")
+    assert list(csv.DictReader(io.StringIO(out))) == [
+        {"title": "The Godfather", "year": "1972", "rating": "9.2", "poster": ""}]
+
+    code, out, _ = run(path, "search", "godfathr")
+    assert json.loads(out)["title"] == "The Godfather"
+
+    code, out, _ = run(path, "stats")
+    assert json.loads(out)["best_title"] == "The Godfather"
+    code, out, _ = run(path, "--format", "csv", "stats", "--detailed")
+    assert [row["decade"] for row in csv.DictReader(io.StringIO(out))] == ["1970", "2010"]
+
+def test_import_and_errors(tmp_path, omdb_server):
+    """
+    Tests importing titles from a file and the error reporting on stderr.
+    """
+    path = str(tmp_path / "movies.json")
+    titles = tmp_path / "titles.txt"
+    titles.write_text("Inception\nUnknown\n", encoding="utf-8")
+    with OmdbClient(api_key="test", base_url=omdb_server) as client:
+        code, out, err = run(path, "import", str(titles), omdb_client=client)
+    assert code == 1
+    assert json.loads(out)["title"] == "Inception"
+    assert "Unknown" in err
+    assert list(StorageJson(path).list_movies()) == ["Inception"]
+
+    code, out, err = run(path, "add", "Shrek", "--year", "2001")
+    assert code == 2 and "--rating" in err
+    code, out, err = run(str(tmp_path / "movies.txt"), "list")
+    assert code == 1 and "storage type" in err
+
+def test_refresh(tmp_path, omdb_server):
+    """
+    Tests that refresh fetches movies without a fetch time and prints them.
+    """
+    path = str(tmp_path / "movies.json")
+    run(path, "add", "Shrek", "--year", "2001", "--rating", "1.0")
+    with OmdbClient(api_key="test", base_url=omdb_server) as client:
+        code, out, _ = run(path, "refresh", "--rate", "0", omdb_client=client)
+        assert code == 0
+        assert json.loads(out)["rating"] == 7.9
+        assert run(path, "refresh", "--rate", "0", omdb_client=client)[1] == ""
+    assert StorageJson(path).get_movie("Shrek").fetched_at is not None
+
+def test_refresh_reports_failures(tmp_path, omdb_server):
+    """
+    Tests that refresh exits with 1 when a movie could not be fetched.
+    """
+    path = str(tmp_path / "movies.json")
+    run(path, "add", "Flaky", "--year", "1999", "--rating", "6.1")
+    with OmdbClient(api_key="test", base_url=omdb_server, backoff_factor=0) as client:
+        code, out, err = run(path, "refresh", "--rate", "0", omdb_client=client)
+    assert code == 1
+    assert out == "" and "Error: Flaky" in err
+
+def test_ingest(tmp_path, omdb_server):
+    """
+    Tests that ingest adds the search results and writes genres as one CSV column.
+    """
+    path = str(tmp_path / "movies.json")
+    with OmdbClient(api_key="test", base_url=omdb_server) as client:
+        code, out, _ = run(path, "--format", "csv", "ingest", "dune", "--limit", "2",
+                           omdb_client=client)
+    rows = list(csv.DictReader(io.StringIO(out)))
+    assert code == 0
+    assert [row["title"] for row in rows] == ["Dune", "Dune (2021)"]
+    assert rows[1]["genre"] == "Action, Adventure, Drama"
+    assert StorageJson(path).get_by_imdb_id("tt0087182").title == "Dune"
+
+def test_list_into_closed_pipe_exits_quietly(tmp_path):
+    """
+    Tests that the reader of the output (e.g. 'head') may exit early without an
+    error message on stderr.
+    """
+    path = str(tmp_path / "movies.json")
+    StorageJson(path).add_many([{"title": f"Movie {i}", "year": 2000, "rating": 5.0, "poster": ""}
+                                for i in range(5000)])
+    process = subprocess.Popen([sys.executable, "main.py", "--storage", path, "list"], cwd=ROOT,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert json.loads(process.stdout.readline())["title"] == "Movie 0"
+    process.stdout.close()
+    stderr = process.stderr.read()
+    process.wait(10)
+    process.stderr.close()
+    assert stderr == b""
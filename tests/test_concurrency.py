@@ -0,0 +1,100 @@
+import multiprocessing
+
+import pytest
+
+from storage import locking
+from storage.locking import FileLock, modify_file
+from storage.storage_cached import CachedStorage
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+
+PROCESSES = 4
+MOVIES_PER_PROCESS = 25
+
+pytestmark = pytest.mark.skipif(locking.fcntl is None, reason="fcntl is not available")
+
+BACKENDS = {
+    "csv": lambda path: StorageCsv(path + ".csv"),
+    "csv-journal": lambda path: StorageCsv(path + ".csv", journal=True, compact_threshold=2000),
+    "json": lambda path: StorageJson(path + ".json"),
+    "cached-csv": lambda path: CachedStorage(StorageCsv(path + ".csv")),
+}
+
+def add_movies(backend, path, worker, start):
+    """
+    Adds this worker's movies one at a time, each as its own read-modify-write.
+    """
+    storage = BACKENDS[backend](path)
+    start.wait()
+    for i in range(MOVIES_PER_PROCESS):
+        storage.add_movie(f"Worker {worker} Movie {i}", 2000 + i, 5.0 + worker, "")
+        if i % 5 == 0:
+            storage.list_movies()
+    if hasattr(storage, "wait_for_compaction"):
+        storage.wait_for_compaction()
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_no_lost_updates_across_processes(backend, tmp_path):
+    """
+    Tests that concurrent writers in several processes do not lose each
+    other's movies and never leave a damaged file behind.
+    """
+    context = multiprocessing.get_context("fork")
+    path = str(tmp_path / "movies")
+    start = context.Barrier(PROCESSES)
+    workers = [context.Process(target=add_movies, args=(backend, path, worker, start))
+               for worker in range(PROCESSES)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    movies = BACKENDS[backend](path).list_movies()
+    assert len(movies) == PROCESSES * MOVIES_PER_PROCESS
+    for worker in range(PROCESSES):
+        assert movies[f"Worker {worker} Movie {MOVIES_PER_PROCESS - 1}"]["rating"] == 5.0 + worker
+
+def increment(path, start):
+    """
+    Increments the counter file 50 times through modify_file().
+    """
+    lock = FileLock(path)
+    start.wait()
+    for _ in range(50):
+        def write(value):
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(str(value + 1))
+        modify_file(lock, path, lambda: int(open(path, encoding="utf-8").read()), write)
+
+def test_modify_file_retries_on_conflict(tmp_path):
+    """
+    Tests that the optimistic version check detects concurrent writes, so a
+    shared counter ends up with every increment.
+    """
+    path = str(tmp_path / "counter.txt")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("0")
+    context = multiprocessing.get_context("fork")
+    start = context.Barrier(PROCESSES)
+    workers = [context.Process(target=increment, args=(path, start)) for _ in range(PROCESSES)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    with open(path, encoding="utf-8") as file:
+        assert int(file.read()) == PROCESSES * 50
+
+def test_file_lock_rejects_upgrade(tmp_path):
+    """
+    Tests that locks are reentrant, but a shared lock cannot be upgraded.
+    """
+    lock = FileLock(str(tmp_path / "movies.csv"))
+    with lock.exclusive(), lock.shared(), lock.exclusive():
+        pass
+    with lock.shared():
+        with pytest.raises(RuntimeError):
+            with lock.exclusive():
+                pass
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+import instrumentation
+from storage.storage_json import StorageJson
+from website_renderer import WebsiteRenderer
+
+@pytest.fixture
+def session():
+    """
+    Enables instrumentation for one test and turns it off again afterwards.
+    """
+    yield instrumentation.enable()
+    instrumentation.disable()
+
+def test_disabled_records_nothing():
+    """
+    Tests that spans, traced functions and counters are no-ops by default.
+    """
+    instrumentation.disable()
+    traced = instrumentation.traced("test.add")(lambda a, b: a + b)
+    with instrumentation.span("test.block") as span:
+        assert span is None
+    assert traced(1, 2) == 3
+    instrumentation.count("test.counter")
+    assert not instrumentation.is_enabled()
+
+def test_spans_counters_and_report(session):
+    """
+    Tests that spans are summarized as histograms, failing spans are marked,
+    and counters are summed up.
+    """
+    traced = instrumentation.traced("test.add")(lambda a, b: a + b)
+    for _ in range(3):
+        assert traced(1, 2) == 3
+    with pytest.raises(KeyError):
+        with instrumentation.span("test.fail", key="x"):
+            raise KeyError("x")
+    instrumentation.count("test.counter")
+    instrumentation.count("test.counter", 4)
+
+    report = instrumentation.report()
+    assert report["counters"] == {"test.counter": 5}
+    assert report["spans"]["test.add"]["count"] == 3
+    assert sum(report["spans"]["test.add"]["buckets"].values()) == 3
+    assert report["spans"]["test.add"]["p99_ms"] <= report["spans"]["test.add"]["max_ms"]
+    assert session.events[-1][4] == {"key": "x", "error": "KeyError"}
+
+def test_storage_and_website_spans(session, tmp_path):
+    """
+    Tests that storage writes, reads and website rendering are recorded.
+    """
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    storage.add_movie("Inception", 2010, 8.8, "")
+    storage.update_movie("Inception", 2010, 8.7)
+    (tmp_path / "index_template.html").write_text("<div>__TEMPLATE_MOVIE_GRID__</div>",
+                                                  encoding="utf-8")
+    renderer = WebsiteRenderer(output_dir=str(tmp_path), cache_fragments=True)
+    renderer.render(storage)
+    renderer.render(storage)
+
+    report = instrumentation.report()
+    assert report["spans"]["storage.json.write_batch"]["count"] == 2
+    assert report["spans"]["storage.json.save_movies"]["count"] == 2
+    assert report["spans"]["website.render"]["count"] == 2
+    assert report["counters"]["website.movies_rendered"] == 1
+    assert report["counters"]["website.movies_reused"] == 1
+    assert report["counters"]["website.pages_unchanged"] == 1
+
+def test_write_report_and_trace(session, tmp_path):
+    """
+    Tests the JSON report and the Chrome trace event file.
+    """
+    with instrumentation.span("test.outer"):
+        with instrumentation.span("test.inner"):
+            pass
+    instrumentation.count("test.counter")
+    instrumentation.write_report(str(tmp_path / "report.json"))
+    instrumentation.write_trace(str(tmp_path / "trace.json"))
+
+    report = json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+    assert set(report["spans"]) == {"test.outer", "test.inner"}
+
+    events = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))["traceEvents"]
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    outer, inner = spans["test.outer"], spans["test.inner"]
+    assert outer["cat"] == "test"
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert {"name": "test.counter", "ph": "C"}.items() <= next(
+        event for event in events if event["ph"] == "C").items()
+
+def test_events_are_capped():
+    """
+    Tests that spans beyond max_events are only counted in the histograms.
+    """
+    instrumentation.enable(max_events=2)
+    try:
+        for _ in range(5):
+            with instrumentation.span("test.block"):
+                pass
+        report = instrumentation.report()
+    finally:
+        instrumentation.disable()
+    assert report["spans"]["test.block"]["count"] == 5
+    assert report["dropped_events"] == 3
@@ -0,0 +1,73 @@
+import json
+
+from storage.movie import Movie, MovieCollection
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+
+TEST_FILE_CSV = "test_data.csv"
+TEST_FILE_JSON = "test_data.json"
+
+def test_movie_supports_dictionary_access():
+    """
+    Tests that a Movie can be read like the old per-movie dictionaries.
+    """
+    movie = Movie("Inception", 2010, 8.8, "poster.jpg")
+    assert movie.year == movie["year"] == 2010
+    assert movie.get("poster") == "poster.jpg"
+    assert movie.get("director", "unknown") == "unknown"
+    assert movie == {"year": 2010, "rating": 8.8, "poster": "poster.jpg"}
+    assert not hasattr(movie, "__dict__")
+
+def test_collection_behaves_like_a_dictionary():
+    """
+    Tests add, update, replace, delete and insertion order of a MovieCollection.
+    """
+    movies = MovieCollection()
+    movies.add("A", 2001, 7.0)
+    movies.add("B", 2002, 8.0, "b.jpg")
+    movies["C"] = {"year": 2003, "rating": 9.0, "poster": ""}
+    movies.update_movie("A", 2011, 7.5)
+    movies.update_movie("Missing", 2000, 1.0)
+    movies.add("B", 2012, 8.5, "new.jpg")
+    del movies["C"]
+
+    assert list(movies) == ["A", "B"]
+    assert len(movies) == 2 and "C" not in movies
+    assert movies["A"] == Movie("A", 2011, 7.5, "")
+    assert movies.to_dict() == {
+        "A": {"year": 2011, "rating": 7.5, "poster": ""},
+        "B": {"year": 2012, "rating": 8.5, "poster": "new.jpg"},
+    }
+    assert [title for title, _ in movies.items()] == ["A", "B"]
+    assert movies.pop("A")["rating"] == 7.5
+
+def test_collection_compacts_deleted_movies():
+    """
+    Tests that the columns stay consistent after many deletions.
+    """
+    movies = MovieCollection()
+    for i in range(100):
+        movies.add(f"Movie {i}", 2000 + i % 20, i / 10)
+    for i in range(0, 100, 3):
+        del movies[f"Movie {i}"]
+
+    expected = [i / 10 for i in range(100) if i % 3]
+    assert list(movies.ratings()) == expected
+    assert [data["rating"] for data in movies.values()] == expected
+    assert movies["Movie 98"].year == 2018
+
+def test_storage_backends_return_collections():
+    """
+    Tests that the file backends return a MovieCollection and still write the
+    same file formats.
+    """
+    for storage in (StorageCsv(TEST_FILE_CSV), StorageJson(TEST_FILE_JSON)):
+        storage.add_movie("Compact", 2020, 7.7, "compact.jpg")
+        storage.update_movie("Compact", 2021, 7.9)
+        movies = storage.list_movies()
+        assert isinstance(movies, MovieCollection)
+        assert movies["Compact"] == {"year": 2021, "rating": 7.9, "poster": "compact.jpg"}
+        storage.delete_movie("Compact")
+
+    with open(TEST_FILE_JSON, encoding="utf-8") as file:
+        assert "Compact" not in json.load(file)
@@ -0,0 +1,72 @@
+import pytest
+
+from movie_service import InvalidInputError, MovieService, UnknownMovieError
+from omdb_api import OmdbClient
+from storage.storage_json import StorageJson
+
+MOVIES = [
+    {"title": "The Godfather", "year": 1972, "rating": 9.2, "poster": ""},
+    {"title": "Inception", "year": 2010, "rating": 8.8, "poster": ""},
+    {"title": "Cats", "year": 2019, "rating": 2.8, "poster": ""},
+]
+
+@pytest.fixture
+def service(tmp_path):
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    storage.add_many(MOVIES)
+    return MovieService(storage)
+
+def test_crud_and_errors(service):
+    """
+    Tests adding, updating and deleting movies and the errors for invalid input
+    and unknown titles.
+    """
+    assert service.add_movie("Shrek", "2001", "7.9") == {"title": "Shrek", "year": 2001,
+                                                         "rating": 7.9, "poster": ""}
+    assert service.update_movie("Shrek", 2001, 8.0)["rating"] == 8.0
+    assert service.get_movie("Shrek")["rating"] == 8.0
+    service.delete_movie("Shrek")
+
+    with pytest.raises(UnknownMovieError):
+        service.get_movie("Shrek")
+    with pytest.raises(UnknownMovieError):
+        service.update_movie("Shrek", 2001, 8.0)
+    with pytest.raises(UnknownMovieError):
+        service.delete_movie("Shrek")
+    with pytest.raises(InvalidInputError):
+        service.add_movie("Shrek", "two thousand", 7.9)
+    with pytest.raises(InvalidInputError):
+        service.add_movie("  ", 2001, 7.9)
+    assert service.count() == 3
+
+def test_add_movie_fetches_from_omdb(tmp_path, omdb_server):
+    """
+    Tests that a movie without year and rating is fetched from the OMDb API.
+    """
+    with OmdbClient(api_key="test", base_url=omdb_server) as client:
+        service = MovieService(StorageJson(str(tmp_path / "movies.json")), omdb_client=client)
+        assert service.add_movie("Inception")["year"] == 2010
+    assert service.get_movie("Inception")["poster"] == "http://example.com/inception.jpg"
+    service.add_movie("Shrek", 2001, 7.9, fetched_at=1000.0, imdb_id="tt0126029")
+    assert service.storage.get_by_imdb_id("tt0126029").fetched_at == 1000.0
+
+def test_queries(service):
+    """
+    Tests sorting, filtering, searching and statistics.
+    """
+    assert [m["title"] for m in service.sort("rating")] == ["The Godfather", "Inception", "Cats"]
+    assert [m["title"] for m in service.sort("year", limit=2)] == ["The Godfather", "Inception"]
+    with pytest.raises(InvalidInputError):
+        service.sort("length")
+
+    assert [m["title"] for m in service.filter(min_rating="5")] == ["The Godfather", "Inception"]
+    assert [m["title"] for m in service.filter(start_year=2000, end_year="")] == ["Inception", "Cats"]
+    with pytest.raises(InvalidInputError):
+        service.filter(min_rating="good")
+
+    assert service.search("godfathr")[0]["title"] == "The Godfather"
+    service.add_movie("The Godfather Part II", 1974, 9.0)
+    assert {m["title"] for m in service.search("godfather")} >= {"The Godfather", "The Godfather Part II"}
+
+    assert service.stats()["best"] == ("The Godfather", 9.2)
+    assert service.random_movie()["title"] in {m["title"] for m in service.list_movies()}
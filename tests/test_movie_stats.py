@@ -0,0 +1,67 @@
+import pytest
+
+import movie_stats
+from movie_stats import MovieStats
+
+MOVIES = [
+    ("Old", {"year": 1972, "rating": 9.2}),
+    ("Older", {"year": 1957, "rating": 8.9}),
+    ("Bad", {"year": 2003, "rating": 3.6}),
+    ("Good", {"year": 2008, "rating": 9.0}),
+    ("Fine", {"year": 2001, "rating": 7.9}),
+]
+
+@pytest.fixture(params=["numpy", "array"])
+def stats(request, monkeypatch):
+    """
+    Builds the statistics engine once with NumPy (if installed) and once
+    with the array based fallback.
+    """
+    if request.param == "numpy" and movie_stats.numpy is None:
+        pytest.skip("numpy is not installed")
+    if request.param == "array":
+        monkeypatch.setattr(movie_stats, "numpy", None)
+    return MovieStats.from_movies(MOVIES)
+
+def test_stats_mean_median_percentiles(stats):
+    """
+    Tests average, median and interpolated percentiles.
+    """
+    assert stats.mean() == pytest.approx(7.72)
+    assert stats.median() == pytest.approx(8.9)
+    percentiles = stats.percentiles([0, 25, 90, 100])
+    assert percentiles[0] == pytest.approx(3.6)
+    assert percentiles[25] == pytest.approx(7.9)
+    assert percentiles[90] == pytest.approx(9.12)
+    assert percentiles[100] == pytest.approx(9.2)
+
+def test_stats_histogram_and_decades(stats):
+    """
+    Tests the rating histogram and the per decade breakdown.
+    """
+    counts = [count for _, _, count in stats.histogram(bins=5)]
+    assert counts == [0, 1, 0, 1, 3]
+
+    decades = stats.by_decade()
+    assert list(decades) == [1950, 1970, 2000]
+    assert decades[2000]["count"] == 3
+    assert decades[2000]["average"] == pytest.approx(6.8333, abs=1e-3)
+    assert decades[2000]["best"] == ("Good", 9.0)
+
+def test_stats_top_and_bottom(stats):
+    """
+    Tests the best and worst rated movies.
+    """
+    assert stats.top(2) == [("Old", 9.2), ("Good", 9.0)]
+    assert stats.bottom(2) == [("Bad", 3.6), ("Fine", 7.9)]
+    assert len(stats.top(10)) == 5
+
+def test_stats_empty_collection(stats):
+    """
+    Tests that an empty collection has no statistics instead of failing.
+    """
+    empty = MovieStats.from_movies([])
+    assert empty.summary()["count"] == 0
+    assert empty.mean() is None
+    assert empty.median() is None
+    assert empty.top(3) == []
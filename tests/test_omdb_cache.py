@@ -0,0 +1,84 @@
+import pytest
+
+from omdb_api import MovieNotFoundError, OmdbClient
+from omdb_cache import OmdbCache
+
+TEST_FILE_CACHE = "test_omdb_cache.db"
+
+MOVIE = {"title": "Inception", "year": 2010, "rating": 8.8,
+         "poster": "http://example.com/inception.jpg"}
+
+def create_cache(**kwargs):
+    """
+    Creates an empty cache in the test cache file.
+
+    Returns:
+        OmdbCache: The empty cache.
+    """
+    cache = OmdbCache(TEST_FILE_CACHE, **kwargs)
+    cache.clear()
+    return cache
+
+def test_cache_hit_and_miss():
+    """
+    Tests that stored movies are found by normalized title and counted.
+    """
+    cache = create_cache()
+    assert cache.get("Inception") == (False, None)
+    cache.put("Inception", MOVIE)
+
+    assert cache.get("  inception ") == (True, MOVIE)
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+def test_cache_ttl():
+    """
+    Tests that expired entries are treated as misses.
+    """
+    cache = create_cache(ttl=-1, negative_ttl=60)
+    cache.put("Inception", MOVIE)
+    cache.put("Unknown", None)
+
+    assert cache.get("Inception") == (False, None)
+    assert cache.get("Unknown") == (True, None)
+
+def test_cache_lru_eviction():
+    """
+    Tests that the least recently used entry is evicted when the cache is full.
+    """
+    cache = create_cache(max_entries=2)
+    cache.put("A", MOVIE)
+    cache.put("B", MOVIE)
+    cache.get("A")
+    cache.put("C", MOVIE)
+
+    assert cache.get("A")[0]
+    assert not cache.get("B")[0]
+    assert cache.get("C")[0]
+    assert cache.stats()["size"] == 2
+
+def test_client_uses_cache(monkeypatch):
+    """
+    Tests that the OMDb client serves repeated lookups, including
+    "Movie not found" answers, from the cache.
+    """
+    calls = []
+
+    def fake_request(params):
+        calls.append(params["t"])
+        if params["t"] == "Unknown":
+            raise MovieNotFoundError("Movie not found: Movie not found!")
+        return {"Title": "Inception", "Year": "2010", "imdbRating": "8.8",
+                "Poster": "http://example.com/inception.jpg", "Response": "True"}
+
+    client = OmdbClient(api_key="test", cache=create_cache())
+    monkeypatch.setattr(client, "_request", fake_request)
+
+    movie = {**MOVIE, "imdb_id": None, "genre": [], "runtime": None, "director": None,
+             "votes": None}
+    assert client.fetch("Inception") == movie
+    assert client.fetch("inception") == movie
+    for _ in range(2):
+        with pytest.raises(MovieNotFoundError):
+            client.fetch("Unknown")
+
+    assert calls == ["Inception", "Unknown"]
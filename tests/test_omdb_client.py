@@ -0,0 +1,87 @@
+import pytest
+
+from conftest import StubOmdbHandler
+from omdb_api import MovieNotFoundError, OmdbClient, OmdbError, fetch_movie_data, parse_movie
+
+def test_client_reuses_connection(omdb_server):
+    """
+    Tests that sequential lookups share one kept-alive connection.
+    """
+    with OmdbClient(api_key="test", base_url=omdb_server) as client:
+        assert client.fetch("Inception")["year"] == 2010
+        assert client.fetch("Shrek")["rating"] == 7.9
+        with pytest.raises(MovieNotFoundError):
+            client.fetch("Unknown")
+
+    assert StubOmdbHandler.requests_seen == ["Inception", "Shrek", "Unknown"]
+    assert len(StubOmdbHandler.client_ports) == 1
+
+def test_client_does_not_retry_server_errors(omdb_server):
+    """
+    Tests that a 503 answer is raised as transient error instead of being
+    retried by the session, so the caller's retries stay within its rate limit.
+    """
+    with OmdbClient(api_key="test", base_url=omdb_server, backoff_factor=0) as client:
+        with pytest.raises(OmdbError) as error:
+            client.fetch("Flaky")
+        assert error.value.transient
+        assert client.fetch("Flaky")["title"] == "Flaky"
+
+    assert StubOmdbHandler.requests_seen == ["Flaky", "Flaky"]
+
+def test_invalid_response_is_transient_error(omdb_server):
+    """
+    Tests that an answer that is not JSON (e.g. a maintenance page) is raised as
+    transient OmdbError.
+    """
+    with OmdbClient(api_key="test", base_url=omdb_server) as client:
+        with pytest.raises(OmdbError) as error:
+            client.fetch("Maintenance")
+        assert error.value.transient and "Invalid response" in str(error.value)
+
+def test_fetch_movie_data_returns_none_on_error(omdb_server):
+    """
+    Tests that the thin wrapper prints the error instead of raising it.
+    """
+    with OmdbClient(api_key="test", base_url=omdb_server) as client:
+        assert fetch_movie_data("Unknown", client=client) is None
+        assert fetch_movie_data("Maintenance", client=client) is None
+        assert fetch_movie_data("Shrek", client=client)["title"] == "Shrek"
+
+def test_parse_movie_handles_missing_values():
+    """
+    Tests that 'N/A' values, year ranges and formatted numbers are parsed into typed fields.
+    """
+    movie = parse_movie({"Title": "Sherlock", "Year": "2010–2017", "imdbRating": "N/A",
+                         "Poster": "N/A", "imdbID": "tt1475582", "Genre": "Crime, Drama",
+                         "Runtime": "88 min", "Director": "N/A", "imdbVotes": "1,012,345"})
+    assert movie == {"title": "Sherlock", "year": 2010, "rating": 0.0, "poster": "",
+                     "imdb_id": "tt1475582", "genre": ["Crime", "Drama"], "runtime": 88,
+                     "director": None, "votes": 1012345}
+
+def test_search_and_fetch_by_id(omdb_server):
+    """
+    Tests that search results are deduplicated by IMDb ID and that IDs can be fetched.
+    """
+    with OmdbClient(api_key="test", base_url=omdb_server) as client:
+        results = client.search("dune")
+        assert [result["imdb_id"] for result in results] == ["tt0087182", "tt1160419", "tt9999999"]
+        assert results[2] == {"imdb_id": "tt9999999", "title": "Dune Drifter", "year": 2020}
+        assert client.search("dune", max_results=1)[0]["year"] == 1984
+        assert client.search("nothing") == []
+        assert client.fetch_by_id("tt1160419")["director"] == "Denis Villeneuve"
+        with pytest.raises(MovieNotFoundError):
+            client.fetch_by_id("tt0000000")
+
+def test_search_raises_other_errors(omdb_server):
+    """
+    Tests that only 'Movie not found!' is an empty search result and that other
+    OMDb errors are raised, rate limiting as transient error.
+    """
+    with OmdbClient(api_key="test", base_url=omdb_server) as client:
+        with pytest.raises(OmdbError) as error:
+            client.search("a")
+        assert not isinstance(error.value, MovieNotFoundError) and not error.value.transient
+        with pytest.raises(OmdbError) as error:
+            client.search("limit")
+        assert error.value.transient
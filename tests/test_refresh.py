@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from conftest import STUB_MOVIES, StubOmdbHandler
+from omdb_api import OmdbClient
+from refresh import DAY, RefreshScheduler
+from storage.factory import open_storage
+from storage.storage_cached import CachedStorage
+from storage.storage_csv import StorageCsv
+
+@pytest.fixture(params=["movies.csv", "movies.json", "movies.db", "movies.col"])
+def storage(request, tmp_path):
+    """
+    Opens an empty storage of every backend type.
+    """
+    storage = open_storage(str(tmp_path / request.param))
+    yield storage
+    if hasattr(storage, "close"):
+        storage.close()
+
+def test_fetch_times_are_stored(storage):
+    """
+    Tests that fetch times and IMDb IDs survive a round trip and that refreshing
+    a movie that no longer exists does not add it again.
+    """
+    storage.add_many([{"title": "Inception", "year": 2010, "rating": 8.8, "poster": "a.jpg",
+                       "fetched_at": 1000.0, "imdb_id": "tt1375666"},
+                      {"title": "Gone", "year": 2000, "rating": 1.0, "poster": "",
+                       "imdb_id": "tt0000002"}])
+    storage.delete_movie("Gone")
+    storage.add_movie("Manual", 1999, 5.0, "")
+    storage.refresh_many([
+        {"title": "Inception", "year": 2010, "rating": 8.7, "poster": "b.jpg", "fetched_at": 2000.0},
+        {"title": "Deleted", "year": 2001, "rating": 1.0, "poster": "", "fetched_at": 2000.0},
+    ])
+    storage.update_movie("Inception", 2011, 8.6)
+
+    reopened = open_storage(storage.filename)
+    movies = reopened.list_movies()
+    assert list(movies) == ["Inception", "Manual"]
+    assert movies["Inception"].to_dict() == {"year": 2011, "rating": 8.6, "poster": "b.jpg",
+                                             "fetched_at": 2000.0, "imdb_id": "tt1375666"}
+    assert movies["Manual"].fetched_at is None and movies["Manual"].imdb_id is None
+    assert reopened.get_movie("Inception").fetched_at == 2000.0
+    assert reopened.get_by_imdb_id("tt1375666").title == "Inception"
+    assert reopened.get_by_imdb_id("tt0000002") is None
+    assert movies.get_by_imdb_id("tt1375666").year == 2011
+
+def test_journal_records_fetch_times(tmp_path):
+    """
+    Tests that journal mode replays and compacts fetch times.
+    """
+    storage = StorageCsv(str(tmp_path / "movies.csv"), journal=True)
+    storage.add_many([{"title": "Shrek", "year": 2001, "rating": 7.9, "poster": "",
+                       "fetched_at": 1000.0}])
+    storage.refresh_many([{"title": "Shrek", "year": 2001, "rating": 8.0, "poster": "s.jpg",
+                           "fetched_at": 3000.0, "imdb_id": "tt0126029"}])
+    assert storage.get_movie("Shrek").fetched_at == 3000.0
+    storage.compact()
+    assert StorageCsv(storage.filename).get_movie("Shrek").to_dict() == {
+        "year": 2001, "rating": 8.0, "poster": "s.jpg", "fetched_at": 3000.0, "imdb_id": "tt0126029"}
+
+def test_refresh_once_fetches_oldest_first(omdb_server, monkeypatch, tmp_path):
+    """
+    Tests that a round fetches never fetched and stale movies (oldest first, by
+    IMDb ID where it is known), skips fresh ones, keeps the data of unknown titles,
+    leaves movies with transient errors for the next round and writes one batch.
+    """
+    monkeypatch.setitem(STUB_MOVIES, "Inception", {**STUB_MOVIES["Inception"], "imdbRating": "9.0"})
+    storage = CachedStorage(open_storage(str(tmp_path / "movies.json")))
+    now = time.time()
+    storage.add_many([
+        {"title": "Inception", "year": 2010, "rating": 8.8, "poster": "", "fetched_at": now - 30 * DAY,
+         "imdb_id": "tt1375666"},
+        {"title": "Shrek", "year": 2001, "rating": 7.9, "poster": "", "fetched_at": now},
+        {"title": "Unknown", "year": 1980, "rating": 5.0, "poster": "", "fetched_at": now - 10 * DAY},
+        {"title": "Flaky", "year": 1999, "rating": 6.1, "poster": ""},
+    ])
+    batches = []
+    monkeypatch.setattr(storage, "refresh_many",
+                        lambda movies: batches.append(movies) or type(storage).refresh_many(storage, movies))
+
+    with OmdbClient(api_key="test", base_url=omdb_server, backoff_factor=0) as client:
+        scheduler = RefreshScheduler(storage, client=client, batch_size=3, requests_per_second=None)
+        refreshed, failures = scheduler.refresh_once()
+
+    assert StubOmdbHandler.requests_seen == ["Flaky", "tt1375666", "Unknown"]
+    assert [movie["title"] for movie in refreshed] == ["Inception", "Unknown"]
+    assert list(failures) == ["Flaky", "Unknown"]
+    assert len(batches) == 1
+    movies = storage.list_movies()
+    assert movies["Inception"]["rating"] == 9.0
+    assert movies["Inception"]["poster"] == "http://example.com/inception.jpg"
+    assert movies["Unknown"]["rating"] == 5.0 and movies["Unknown"].fetched_at >= now
+    assert movies["Shrek"].fetched_at == now
+    assert movies["Flaky"].fetched_at is None
+    assert storage.aggregate_ratings()["best"] == ("Inception", 9.0)
+
+def test_scheduler_runs_in_background(omdb_server, tmp_path):
+    """
+    Tests that the background thread refreshes the collection and stops cleanly.
+    """
+    storage = open_storage(str(tmp_path / "movies.csv"))
+    storage.add_movie("Shrek", 2001, 1.0, "")
+    done = threading.Event()
+
+    with OmdbClient(api_key="test", base_url=omdb_server) as client:
+        with RefreshScheduler(storage, client=client, interval=0.01, requests_per_second=None,
+                              on_refresh=lambda movies: done.set()) as scheduler:
+            assert done.wait(5)
+            assert scheduler.is_running()
+    assert not scheduler.is_running()
+    assert scheduler.last_error is None
+    assert storage.get_movie("Shrek")["rating"] == 7.9
+    assert storage.get_movie("Shrek").imdb_id == "tt0126029"
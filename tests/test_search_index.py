@@ -0,0 +1,27 @@
+from search_index import SearchIndex
+
+TITLES = ["The Godfather", "The Godfather: Part II", "Inception", "Shrek", "Shrek 2",
+          "The Shawshank Redemption"]
+
+def test_search_finds_fuzzy_matches():
+    """
+    Tests that case, punctuation and typos do not prevent a match.
+    """
+    index = SearchIndex(TITLES)
+
+    assert index.search("inceptoin")[0][0] == "Inception"
+    assert index.search("godfather part 2")[0][0] == "The Godfather: Part II"
+    assert index.search("zzzz") == []
+
+def test_search_index_add_and_remove():
+    """
+    Tests that the index follows added and removed titles.
+    """
+    index = SearchIndex(TITLES)
+    index.remove("Shrek")
+    index.add("Shrek the Third")
+
+    titles = [title for title, _ in index.search("shrek", limit=5)]
+    assert "Shrek" not in titles
+    assert "Shrek the Third" in titles
+    assert len(index) == len(TITLES)
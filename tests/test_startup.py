@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_startup import HEAVY_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def loaded_heavy_modules(*argv):
+    """
+    Runs main.py with the given arguments in a fresh interpreter and returns
+    the heavy modules it imported.
+    """
+    script = ("import json, sys, main\n"
+              f"main.main({list(argv)!r})\n"
+              f"print(json.dumps([name for name in {list(HEAVY_MODULES)!r} if name in sys.modules]))")
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+def test_list_does_not_import_heavy_dependencies(tmp_path):
+    """
+    Tests that listing movies imports neither the interactive menu nor the
+    OMDb, fuzzy search or statistics dependencies.
+    """
+    assert loaded_heavy_modules("--storage", str(tmp_path / "movies.json"), "list") == []
+
+def test_commands_import_what_they_need(tmp_path):
+    """
+    Tests that search and detailed statistics load their dependencies on demand.
+    """
+    path = str(tmp_path / "movies.json")
+    assert "search_index" in loaded_heavy_modules("--storage", path, "search", "x")
+    assert "movie_stats" in loaded_heavy_modules("--storage", path, "stats", "--detailed")
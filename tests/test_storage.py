@@ -1,4 +1,11 @@
-from storage.storage_json import StorageJson
+import io
+import json
+import os
+
+import pytest
+
+from storage.atomic import atomic_write
+from storage.storage_json import StorageJson, iter_json_object
 from storage.storage_csv import StorageCsv
 
 TEST_FILE_JSON = "test_data.json"
@@ -137,4 +144,255 @@ def test_csv_list_movies():
     movies = storage.list_movies()
     assert len(movies) == 2
     assert "CSV A" in movies
-    assert "CSV B" in movies
\ No newline at end of file
+    assert "CSV B" in movies
+def test_csv_journal_mode():
+    """
+    Tests that journaled mutations are visible without rewriting the CSV file.
+    """
+    reset_test_file(TEST_FILE_CSV)
+    storage = StorageCsv(TEST_FILE_CSV, journal=True)
+    storage.add_movie("Journal A", 2000, 7.5, "http://example.com/a.jpg")
+    storage.add_movie("Journal B", 2005, 8.5, "http://example.com/b.jpg")
+    storage.update_movie("Journal A", 2001, 7.7)
+    storage.delete_movie("Journal B")
+
+    with open(TEST_FILE_CSV, encoding="utf-8") as f:
+        assert f.read() == "title,rating,year,poster\n"
+
+    movies = StorageCsv(TEST_FILE_CSV).list_movies()
+    assert list(movies) == ["Journal A"]
+    assert movies["Journal A"]["year"] == 2001
+    assert movies["Journal A"]["rating"] == 7.7
+    assert movies["Journal A"]["poster"] == "http://example.com/a.jpg"
+    storage.compact()
+
+def test_csv_journal_compaction():
+    """
+    Tests that the journal is merged into the CSV file once it passes the threshold.
+    """
+    reset_test_file(TEST_FILE_CSV)
+    storage = StorageCsv(TEST_FILE_CSV, journal=True, compact_threshold=1)
+    storage.add_movie("Compacted", 1995, 6.0, "http://example.com/poster.jpg")
+    storage.wait_for_compaction()
+
+    assert not os.path.exists(storage.journal_filename)
+    with open(TEST_FILE_CSV, encoding="utf-8") as f:
+        assert "Compacted" in f.read()
+    assert "Compacted" in storage.list_movies()
+
+def test_csv_journal_survives_torn_rows(tmp_path):
+    """
+    Tests that damaged rows and the partial last row of an interrupted append are
+    skipped, and that the next append does not run into the partial row.
+    """
+    storage = StorageCsv(str(tmp_path / "movies.csv"), journal=True)
+    storage.add_movie("Journal A", 2000, 7.5, "")
+    with open(storage.journal_filename, "a", encoding="utf-8") as f:
+        f.write("update,Journal A\nadd,Journal B,8.")
+
+    assert list(storage.list_movies()) == ["Journal A"]
+    storage.add_movie("Journal C", 2010, 6.0, "")
+    movies = storage.list_movies()
+    assert list(movies) == ["Journal A", "Journal C"]
+    assert movies["Journal A"]["rating"] == 7.5
+
+def test_csv_rewrite_keeps_concurrent_journal_entries(tmp_path):
+    """
+    Tests that a writer without journal does not drop entries that a journaling
+    writer appends between its read and its write.
+    """
+    path = str(tmp_path / "movies.csv")
+    journaling, plain = StorageCsv(path, journal=True), StorageCsv(path)
+    list_movies = plain.list_movies
+    reads = []
+
+    def list_movies_then_append():
+        movies = list_movies()
+        if not reads:
+            journaling.add_movie("Journaled", 2000, 7.0, "")
+        reads.append(1)
+        return movies
+
+    plain.list_movies = list_movies_then_append
+    plain.add_movie("Rewritten", 2001, 8.0, "")
+    assert list(StorageCsv(path).list_movies()) == ["Journaled", "Rewritten"]
+    assert len(reads) == 2
+
+# --------------------
+# Tests for the default IStorage query methods
+# --------------------
+
+def test_json_query_methods():
+    """
+    Tests filtering, sorting, counting, sampling and rating statistics
+    through the default IStorage implementations.
+    """
+    reset_test_file(TEST_FILE_JSON)
+    storage = StorageJson(TEST_FILE_JSON)
+    storage.add_movie("Old", 1980, 6.0, "")
+    storage.add_movie("Middle", 1995, 9.0, "")
+    storage.add_movie("New", 2010, 7.0, "")
+
+    assert [title for title, _ in storage.query(min_rating=7.0, order_by="-rating")] == ["Middle", "New"]
+    assert [title for title, _ in storage.query(year_range=(1990, None), order_by="year", limit=1)] == ["Middle"]
+    assert storage.count() == 3
+    assert len(storage.random_sample(5)) == 3
+
+    stats = storage.aggregate_ratings()
+    assert stats["median"] == 7.0
+    assert stats["best"] == ("Middle", 9.0)
+    assert stats["worst"] == ("Old", 6.0)
+
+def test_csv_add_many():
+    """
+    Tests adding several movies in one batch to CSV storage.
+    """
+    reset_test_file(TEST_FILE_CSV)
+    storage = StorageCsv(TEST_FILE_CSV)
+    storage.add_many([
+        {"title": "Batch A", "year": 2000, "rating": 7.5, "poster": "http://example.com/a.jpg"},
+        {"title": "Batch B", "year": 2005, "rating": 8.5, "poster": "http://example.com/b.jpg"},
+    ])
+
+    movies = storage.list_movies()
+    assert list(movies) == ["Batch A", "Batch B"]
+    assert movies["Batch B"]["rating"] == 8.5
+
+# --------------------
+# Tests for streaming iteration
+# --------------------
+
+def test_iter_json_object_across_chunks():
+    """
+    Tests that the incremental JSON decoder handles values split over many
+    small chunks, including escapes, braces inside strings and numbers.
+    """
+    data = {
+        "Braces {\"quoted\"}": {"year": 1999, "rating": 8.25, "poster": "a,b}:c"},
+        "Caf\u00e9 \u2013 \u65e5\u672c": {"year": 2001, "rating": 10, "poster": ""},
+        "Empty": {},
+        "Number": 1234567,
+    }
+    text = json.dumps(data, indent=4)
+    for chunk_size in (1, 2, 3, 7, 1024):
+        assert dict(iter_json_object(io.StringIO(text), chunk_size=chunk_size)) == data
+    assert list(iter_json_object(io.StringIO(" { } "))) == []
+
+def test_iter_json_object_rejects_invalid_documents():
+    """
+    Tests that malformed documents raise a JSONDecodeError.
+    """
+    for text in ('[1, 2]', '{"a": 1 "b": 2}', '{"a": 1', '{1: 2}'):
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_object(io.StringIO(text), chunk_size=2))
+
+def test_json_iter_movies():
+    """
+    Tests that streaming the JSON file yields the same movies as list_movies().
+    """
+    reset_test_file(TEST_FILE_JSON)
+    storage = StorageJson(TEST_FILE_JSON)
+    storage.add_movie("Stream A", 2000, 7.5, "http://example.com/a.jpg")
+    storage.add_movie("Stream B", 2005, 8.5, "")
+
+    assert list(storage.iter_movies()) == list(storage.list_movies().items())
+    assert list(StorageJson("missing.json").iter_movies()) == []
+
+def test_csv_iter_movies():
+    """
+    Tests streaming the CSV file, with and without pending journal entries.
+    """
+    reset_test_file(TEST_FILE_CSV)
+    storage = StorageCsv(TEST_FILE_CSV, journal=True)
+    storage.add_movie("Stream A", 2000, 7.5, "http://example.com/a.jpg")
+    storage.add_movie("Stream B", 2005, 8.5, "")
+    storage.delete_movie("Stream A")
+    assert [title for title, _ in storage.iter_movies()] == ["Stream B"]
+
+    storage.compact()
+    assert list(storage.iter_movies()) == list(storage.list_movies().items())
+    assert storage.count() == 1
+
+# --------------------
+# Tests for batches and transactions
+# --------------------
+
+def count_saves(storage, monkeypatch):
+    """
+    Counts the calls of storage._save_movies.
+
+    Returns:
+        list: Receives one entry per save.
+    """
+    saves = []
+    save = storage._save_movies
+    monkeypatch.setattr(storage, "_save_movies", lambda movies: (saves.append(1), save(movies)))
+    return saves
+
+def test_transaction_writes_once(monkeypatch):
+    """
+    Tests that all mutations of a transaction are written with a single save.
+    """
+    for storage, path in ((StorageCsv(TEST_FILE_CSV), TEST_FILE_CSV),
+                          (StorageJson(TEST_FILE_JSON), TEST_FILE_JSON)):
+        reset_test_file(path)
+        storage.add_movie("Keep", 1999, 6.0, "")
+        storage.add_movie("Drop", 2000, 5.0, "")
+        saves = count_saves(storage, monkeypatch)
+
+        with storage.transaction() as batch:
+            for i in range(50):
+                batch.add_movie(f"Movie {i}", 2000 + i, 7.0, "")
+            batch.update_movie("Keep", 2001, 8.0)
+            batch.delete_movie("Drop")
+            batch.delete_movie("Movie 3")
+
+        movies = storage.list_movies()
+        assert saves == [1]
+        assert len(movies) == 50 and "Drop" not in movies and "Movie 3" not in movies
+        assert movies["Keep"] == {"year": 2001, "rating": 8.0, "poster": ""}
+
+def test_transaction_rolls_back_on_error():
+    """
+    Tests that nothing is written if the transaction block raises.
+    """
+    reset_test_file(TEST_FILE_JSON)
+    storage = StorageJson(TEST_FILE_JSON)
+    with pytest.raises(RuntimeError):
+        with storage.transaction() as batch:
+            batch.add_movie("Lost", 2000, 5.0, "")
+            raise RuntimeError("abort")
+    assert len(storage.list_movies()) == 0
+
+def test_update_and_delete_many():
+    """
+    Tests the batch methods, including in journal mode.
+    """
+    for storage, path in ((StorageCsv(TEST_FILE_CSV, journal=True), TEST_FILE_CSV),
+                          (StorageJson(TEST_FILE_JSON), TEST_FILE_JSON)):
+        reset_test_file(path)
+        storage.add_many([{"title": title, "year": 2000, "rating": 5.0, "poster": ""}
+                          for title in ("A", "B", "C")])
+        storage.update_many([{"title": "A", "year": 2010, "rating": 9.0},
+                             {"title": "Missing", "year": 2010, "rating": 9.0}])
+        storage.delete_many(["B", "C"])
+
+        movies = storage.list_movies()
+        assert list(movies) == ["A"]
+        assert movies["A"]["rating"] == 9.0
+        if isinstance(storage, StorageCsv):
+            storage.compact()
+
+def test_atomic_write_keeps_file_on_error():
+    """
+    Tests that a failed write leaves the original file and no temporary file.
+    """
+    reset_test_file(TEST_FILE_JSON)
+    with pytest.raises(ValueError):
+        with atomic_write(TEST_FILE_JSON, encoding="utf-8") as file:
+            file.write('{"Partial": ')
+            raise ValueError("crash while writing")
+
+    with open(TEST_FILE_JSON, encoding="utf-8") as f:
+        assert f.read() == "{}"
+    assert not [name for name in os.listdir(".") if name.endswith(".tmp")]
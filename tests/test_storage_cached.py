@@ -0,0 +1,113 @@
+import os
+
+from storage.storage_cached import CachedStorage
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+from storage.storage_sqlite import StorageSqlite
+
+TEST_FILE_JSON = "test_data.json"
+TEST_FILE_CSV = "test_data.csv"
+
+def reset_test_file(path):
+    """
+    Clears the contents of the given test file to ensure a clean test environment.
+
+    Args:
+        path (str): The file path to be reset (JSON or CSV).
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            f.write("{}")
+        elif path.endswith(".csv"):
+            f.write("title,rating,year,poster\n")
+
+def test_cached_write_through():
+    """
+    Tests that mutations through the cache reach the backend file.
+    """
+    reset_test_file(TEST_FILE_CSV)
+    storage = CachedStorage(StorageCsv(TEST_FILE_CSV))
+    storage.add_movie("Cached", 2001, 7.0, "http://example.com/poster.jpg")
+    storage.update_movie("Cached", 2002, 8.0)
+
+    movies = StorageCsv(TEST_FILE_CSV).list_movies()
+    assert movies["Cached"]["year"] == 2002
+    assert movies["Cached"]["rating"] == 8.0
+
+    storage.delete_movie("Cached")
+    assert "Cached" not in storage.list_movies()
+    assert "Cached" not in StorageCsv(TEST_FILE_CSV).list_movies()
+
+def test_cached_reads_from_memory():
+    """
+    Tests that repeated reads do not go back to the backend.
+    """
+    reset_test_file(TEST_FILE_JSON)
+    backend = StorageJson(TEST_FILE_JSON)
+    backend.add_movie("Movie A", 1999, 7.1, "http://example.com/a.jpg")
+    storage = CachedStorage(backend)
+    storage.list_movies()
+
+    calls = []
+    backend.list_movies = lambda: calls.append(1) or {}
+    assert "Movie A" in storage.list_movies()
+    assert not calls
+
+def test_cached_invalidates_on_external_change():
+    """
+    Tests that a change to the file by someone else is picked up.
+    """
+    reset_test_file(TEST_FILE_CSV)
+    storage = CachedStorage(StorageCsv(TEST_FILE_CSV))
+    assert storage.list_movies() == {}
+
+    StorageCsv(TEST_FILE_CSV).add_movie("External", 2010, 6.5, "http://example.com/e.jpg")
+    stat = os.stat(TEST_FILE_CSV)
+    os.utime(TEST_FILE_CSV, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert "External" in storage.list_movies()
+
+def test_cached_transaction():
+    """
+    Tests that a transaction reaches the backend and keeps cache and
+    rating statistics up to date.
+    """
+    reset_test_file(TEST_FILE_JSON)
+    storage = CachedStorage(StorageJson(TEST_FILE_JSON))
+    storage.add_many([{"title": "A", "year": 2000, "rating": 5.0, "poster": ""},
+                      {"title": "B", "year": 2001, "rating": 6.0, "poster": ""}])
+    assert storage.aggregate_ratings()["best"] == ("B", 6.0)
+
+    with storage.transaction() as batch:
+        batch.add_movie("C", 2002, 7.0, "")
+        batch.update_movie("A", 2000, 9.0)
+        batch.delete_movie("B")
+
+    assert list(storage.list_movies()) == ["A", "C"]
+    assert list(StorageJson(TEST_FILE_JSON).list_movies()) == ["A", "C"]
+    stats = storage.aggregate_ratings()
+    assert stats["count"] == 2
+    assert stats["best"] == ("A", 9.0)
+
+def test_cached_pushes_queries_to_backend(tmp_path):
+    """
+    Tests that queries and samples run in a backend that implements them itself,
+    and that a backend without them is answered from the cache.
+    """
+    backend = StorageSqlite(str(tmp_path / "movies.db"))
+    storage = CachedStorage(backend)
+    storage.add_many([{"title": "A", "year": 2000, "rating": 5.0, "poster": ""},
+                      {"title": "B", "year": 2001, "rating": 6.0, "poster": ""}])
+    calls = []
+    query, random_sample = backend.query, backend.random_sample
+    backend.query = lambda *args: calls.append("query") or query(*args)
+    backend.random_sample = lambda k: calls.append("random_sample") or random_sample(k)
+
+    assert [title for title, _ in storage.query(order_by="-rating", limit=1)] == ["B"]
+    assert len(storage.random_sample(5)) == 2
+    assert calls == ["query", "random_sample"]
+    backend.close()
+
+    storage = CachedStorage(StorageJson(str(tmp_path / "movies.json")))
+    storage.add_movie("C", 2002, 7.0, "")
+    assert [title for title, _ in storage.query(min_rating=6)] == ["C"]
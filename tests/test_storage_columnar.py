@@ -0,0 +1,98 @@
+import pytest
+
+from storage import storage_columnar
+from storage.storage_columnar import StorageColumnar, convert
+from storage.storage_json import StorageJson
+
+MOVIES = [
+    {"title": "Old", "year": 1972, "rating": 9.2, "poster": "http://example.com/old.jpg"},
+    {"title": "Bad", "year": 2003, "rating": 3.6, "poster": ""},
+    {"title": "Good", "year": 2008, "rating": 9.2, "poster": "http://example.com/good.jpg"},
+    {"title": "Café", "year": 2001, "rating": 7.9, "poster": "http://example.com/café.jpg"},
+]
+
+@pytest.fixture(params=["numpy", "array"])
+def storage(request, monkeypatch, tmp_path):
+    """
+    Creates a columnar storage with the test movies, once with NumPy filters
+    (if installed) and once with the loop over the columns.
+    """
+    if request.param == "numpy" and storage_columnar.numpy is None:
+        pytest.skip("numpy is not installed")
+    if request.param == "array":
+        monkeypatch.setattr(storage_columnar, "numpy", None)
+    storage = StorageColumnar(str(tmp_path / "movies.col"))
+    storage.add_many(MOVIES)
+    return storage
+
+def test_columnar_round_trip(storage):
+    """
+    Tests that movies survive a reopen of the file, including non-ASCII text.
+    """
+    reopened = StorageColumnar(storage.filename)
+    assert list(reopened.list_movies()) == ["Old", "Bad", "Good", "Café"]
+    assert reopened.get_movie("Café") == {"year": 2001, "rating": 7.9,
+                                          "poster": "http://example.com/café.jpg"}
+    assert reopened.get_movie("Missing") is None
+    assert reopened.count() == 4
+
+def test_columnar_crud(storage):
+    """
+    Tests updating in place, deleting and adding movies.
+    """
+    storage.update_movie("Bad", 2004, 4.1)
+    storage.delete_movie("Old")
+    storage.add_movie("New", 2020, 6.5, "http://example.com/new.jpg")
+
+    movies = StorageColumnar(storage.filename).list_movies()
+    assert list(movies) == ["Bad", "Good", "Café", "New"]
+    assert movies["Bad"] == {"year": 2004, "rating": 4.1, "poster": ""}
+    assert movies["New"]["poster"] == "http://example.com/new.jpg"
+
+def test_columnar_query_matches_default(storage, tmp_path):
+    """
+    Tests that the column scans return the same results as the default
+    IStorage implementation.
+    """
+    reference = StorageJson(str(tmp_path / "movies.json"))
+    reference.add_many(MOVIES)
+    for kwargs in ({}, {"min_rating": 8.0}, {"year_range": (2000, None), "order_by": "year"},
+                   {"order_by": "-rating"}, {"order_by": "-title", "limit": 2},
+                   {"min_rating": 5.0, "year_range": (None, 2005), "order_by": "rating"}):
+        assert storage.query(**kwargs) == reference.query(**kwargs)
+    assert storage.aggregate_ratings() == pytest.approx(reference.aggregate_ratings())
+
+    with pytest.raises(ValueError):
+        storage.query(order_by="poster")
+
+def test_columnar_random_sample(storage):
+    """
+    Tests that random picks are distinct movies of the collection.
+    """
+    sample = storage.random_sample(10)
+    assert sorted(title for title, _ in sample) == sorted(movie["title"] for movie in MOVIES)
+    assert StorageColumnar(storage.filename + ".missing").random_sample(1) == []
+
+def test_columnar_convert_csv(tmp_path):
+    """
+    Tests converting a CSV file and rejecting files that are not columnar.
+    """
+    source = tmp_path / "data.csv"
+    source.write_text("title,rating,year,poster\nCSV A,7.5,2000,\nCSV B,8.5,2005,b.jpg\n",
+                      encoding="utf-8")
+    destination = str(tmp_path / "movies.col")
+    assert convert(str(source), destination) == 2
+    assert StorageColumnar(destination).get_movie("CSV B")["poster"] == "b.jpg"
+
+    with pytest.raises(ValueError):
+        StorageColumnar(str(source))
+
+def test_columnar_batches(storage):
+    """
+    Tests that update batches are written in place and mixed batches rewrite the file.
+    """
+    storage.update_many([{"title": "Bad", "year": 2004, "rating": 4.1}])
+    storage.delete_many(["Old", "Missing"])
+    movies = StorageColumnar(storage.filename).list_movies()
+    assert list(movies) == ["Bad", "Good", "Café"]
+    assert movies["Bad"]["rating"] == 4.1
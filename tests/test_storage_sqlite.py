@@ -0,0 +1,111 @@
+from storage.storage_sqlite import StorageSqlite
+
+TEST_FILE_SQLITE = "test_data.db"
+TEST_FILE_CSV = "test_data.csv"
+
+def create_storage():
+    """
+    Creates a SQLite storage with an empty movies table.
+
+    Returns:
+        StorageSqlite: The storage backed by the test database.
+    """
+    storage = StorageSqlite(TEST_FILE_SQLITE)
+    with storage._connection:
+        storage._connection.execute("DELETE FROM movies")
+    return storage
+
+def test_sqlite_crud():
+    """
+    Tests adding, updating and deleting movies in SQLite storage.
+    """
+    storage = create_storage()
+    storage.add_movie("SQL Movie", 2000, 7.0, "http://example.com/poster.jpg")
+    storage.update_movie("SQL Movie", 2001, 8.0)
+
+    movies = storage.list_movies()
+    assert movies["SQL Movie"] == {"year": 2001, "rating": 8.0,
+                                   "poster": "http://example.com/poster.jpg"}
+
+    storage.delete_movie("SQL Movie")
+    assert storage.list_movies() == {}
+
+def test_sqlite_title_is_unique():
+    """
+    Tests that adding an existing title replaces its data instead of duplicating it.
+    """
+    storage = create_storage()
+    storage.add_movie("Twice", 2000, 7.0, "http://example.com/a.jpg")
+    storage.add_movie("Twice", 2002, 6.0, "http://example.com/b.jpg")
+
+    movies = storage.list_movies()
+    assert len(movies) == 1
+    assert movies["Twice"]["year"] == 2002
+
+def test_sqlite_query_and_aggregate():
+    """
+    Tests filtering, sorting and rating statistics computed by SQLite.
+    """
+    storage = create_storage()
+    storage.add_movie("Old", 1980, 6.0, "")
+    storage.add_movie("Middle", 1995, 9.0, "")
+    storage.add_movie("New", 2010, 7.0, "")
+    storage.add_movie("Newer", 2020, 8.0, "")
+
+    titles = [title for title, _ in storage.query(min_rating=7.0, year_range=(1990, None),
+                                                   order_by="-rating")]
+    assert titles == ["Middle", "Newer", "New"]
+    assert [title for title, _ in storage.query(order_by="year", limit=2)] == ["Old", "Middle"]
+
+    stats = storage.aggregate_ratings()
+    assert stats["count"] == 4
+    assert stats["average"] == 7.5
+    assert stats["median"] == 7.5
+    assert stats["best"] == ("Middle", 9.0)
+    assert stats["worst"] == ("Old", 6.0)
+
+def test_sqlite_import_csv():
+    """
+    Tests importing an existing CSV storage file.
+    """
+    with open(TEST_FILE_CSV, "w", encoding="utf-8") as f:
+        f.write("title,rating,year,poster\nCSV A,7.5,2000,a.jpg\nCSV B,8.5,2005,b.jpg\n")
+    storage = create_storage()
+
+    assert storage.import_file(TEST_FILE_CSV) == 2
+    assert list(storage.list_movies()) == ["CSV A", "CSV B"]
+
+def test_sqlite_count_and_random_sample():
+    """
+    Tests counting and random sampling in SQLite storage.
+    """
+    storage = create_storage()
+    assert storage.random_sample(1) == []
+    storage.add_movie("Only", 2000, 7.0, "")
+
+    assert storage.count() == 1
+    assert storage.random_sample(3) == [("Only", {"year": 2000, "rating": 7.0, "poster": ""})]
+
+def test_sqlite_iter_movies_in_batches():
+    """
+    Tests that iterating in small batches yields every movie in insertion order.
+    """
+    storage = create_storage()
+    storage.add_many([{"title": f"Movie {i}", "year": 2000 + i, "rating": 5.0, "poster": ""}
+                      for i in range(7)])
+    storage.delete_movie("Movie 3")
+
+    titles = [title for title, _ in storage.iter_movies(batch_size=2)]
+    assert titles == [f"Movie {i}" for i in range(7) if i != 3]
+
+def test_sqlite_write_batch():
+    """
+    Tests that a transaction is applied in order in one SQLite transaction.
+    """
+    storage = create_storage()
+    with storage.transaction() as batch:
+        batch.add_movie("A", 2000, 5.0, "")
+        batch.add_movie("B", 2001, 6.0, "")
+        batch.update_movie("A", 2010, 9.0)
+        batch.delete_movie("B")
+    assert storage.list_movies() == {"A": {"year": 2010, "rating": 9.0, "poster": ""}}
@@ -0,0 +1,146 @@
+import json
+import os
+import shutil
+
+from storage.storage_csv import StorageCsv
+from storage.storage_json import StorageJson
+from website_renderer import WebsiteRenderer
+
+TEST_FILE_CSV = "test_data.csv"
+TEST_FILE_JSON = "test_data.json"
+TEMPLATE = os.path.join(os.path.dirname(__file__), "..", "website", "index_template.html")
+
+def reset_test_file(path):
+    """
+    Clears the contents of the given test file to ensure a clean test environment.
+
+    Args:
+        path (str): The file path to be reset (JSON or CSV).
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            f.write("{}")
+        elif path.endswith(".csv"):
+            f.write("title,rating,year,poster\n")
+
+def create_output_dir(tmp_path):
+    """
+    Creates a website directory containing the HTML template.
+
+    Returns:
+        str: Path of the website directory.
+    """
+    shutil.copy(TEMPLATE, tmp_path / "index_template.html")
+    return str(tmp_path)
+
+def test_website_renders_any_storage(tmp_path):
+    """
+    Tests that the renderer works with other backends than CSV and fills the template.
+    """
+    output_dir = create_output_dir(tmp_path)
+    reset_test_file(TEST_FILE_JSON)
+    storage = StorageJson(TEST_FILE_JSON)
+    storage.add_movie("Tom & Jerry", 1992, 5.4, "http://example.com/poster.jpg")
+
+    assert WebsiteRenderer(output_dir).render(storage) == 1
+    with open(os.path.join(output_dir, "index.html"), encoding="utf-8") as f:
+        page = f.read()
+    assert "<title>My Movie App</title>" in page
+    assert '<div class="movie-title">Tom &amp; Jerry</div>' in page
+    assert "__TEMPLATE_" not in page
+
+def test_website_renders_only_changed_movies(tmp_path):
+    """
+    Tests that with the fragment cache only new or changed movies are rendered again.
+    """
+    output_dir = create_output_dir(tmp_path)
+    reset_test_file(TEST_FILE_CSV)
+    storage = StorageCsv(TEST_FILE_CSV)
+    storage.add_movie("Web A", 2000, 7.5, "http://example.com/a.jpg")
+    storage.add_movie("Web B", 2005, 8.5, "http://example.com/b.jpg")
+    renderer = WebsiteRenderer(output_dir, cache_fragments=True)
+    renderer.render(storage)
+
+    rendered = []
+    render_movie = renderer._render_movie
+    renderer._render_movie = lambda title, data: rendered.append(title) or render_movie(title, data)
+    storage.update_movie("Web B", 2006, 8.6)
+    renderer.render(storage)
+
+    assert rendered == ["Web B"]
+    with open(os.path.join(output_dir, "index.html"), encoding="utf-8") as f:
+        page = f.read()
+    assert "Web A" in page
+    assert "2006" in page
+
+def test_website_skips_unchanged_output(tmp_path):
+    """
+    Tests that index.html is not rewritten when nothing changed.
+    """
+    output_dir = create_output_dir(tmp_path)
+    reset_test_file(TEST_FILE_CSV)
+    storage = StorageCsv(TEST_FILE_CSV)
+    storage.add_movie("Web A", 2000, 7.5, "http://example.com/a.jpg")
+    WebsiteRenderer(output_dir).render(storage)
+    index = os.path.join(output_dir, "index.html")
+    os.utime(index, (0, 0))
+
+    assert WebsiteRenderer(output_dir).render(storage) == 0
+    assert os.path.getmtime(index) == 0
+    assert sorted(os.listdir(output_dir)) == ["index.html", "index_template.html"]
+
+def test_website_repairs_deleted_or_edited_pages(tmp_path):
+    """
+    Tests that a page deleted or edited on disk is written again by the same renderer.
+    """
+    output_dir = create_output_dir(tmp_path)
+    reset_test_file(TEST_FILE_CSV)
+    storage = StorageCsv(TEST_FILE_CSV)
+    storage.add_movie("Web A", 2000, 7.5, "http://example.com/a.jpg")
+    renderer = WebsiteRenderer(output_dir)
+    renderer.render(storage)
+    index = os.path.join(output_dir, "index.html")
+
+    os.remove(index)
+    assert renderer.render(storage) == 1
+    assert os.path.exists(index)
+
+    with open(index, "a", encoding="utf-8") as f:
+        f.write("<!-- edited -->")
+    assert renderer.render(storage) == 1
+    with open(index, encoding="utf-8") as f:
+        assert "edited" not in f.read()
+    assert renderer.render(storage) == 0
+
+def test_website_paginated(tmp_path):
+    """
+    Tests that a page size splits the movies into linked pages with a JSON index,
+    and that pages left over from a larger collection are removed.
+    """
+    output_dir = create_output_dir(tmp_path)
+    reset_test_file(TEST_FILE_CSV)
+    storage = StorageCsv(TEST_FILE_CSV)
+    storage.add_many([{"title": f"Page Movie {i}", "year": 2000 + i, "rating": 7.0,
+                       "poster": ""} for i in range(5)])
+    renderer = WebsiteRenderer(output_dir, page_size=2)
+    renderer.render(storage)
+
+    assert sorted(os.listdir(output_dir)) == ["index.html", "index_template.html",
+                                              "page-2.html", "page-3.html", "pages.json"]
+    with open(os.path.join(output_dir, "pages.json"), encoding="utf-8") as f:
+        index = json.load(f)
+    assert index["total_movies"] == 5
+    assert [page["count"] for page in index["pages"]] == [2, 2, 1]
+    assert index["pages"][2]["first"] == "Page Movie 4"
+
+    with open(os.path.join(output_dir, "page-2.html"), encoding="utf-8") as f:
+        page = f.read()
+    assert "Page Movie 2" in page and "Page Movie 1" not in page
+    assert 'href="index.html"' in page and 'href="page-3.html"' in page
+
+    storage.delete_movie("Page Movie 4")
+    renderer.render(storage)
+    assert "page-3.html" not in os.listdir(output_dir)
+
+    WebsiteRenderer(output_dir).render(storage)
+    assert sorted(os.listdir(output_dir)) == ["index.html", "index_template.html"]
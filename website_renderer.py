@@ -0,0 +1,332 @@
+import hashlib
+import html
+import itertools
+import json
+import math
+import os
+import re
+
+import instrumentation
+from storage.atomic import atomic_write
+from storage.locking import file_version
+
+PLACEHOLDER = re.compile(r"__TEMPLATE_([A-Z_]+)__")
+PAGE_FILENAME = re.compile(r"page-(\d+)\.html")
+
+
+class _PageUnchanged(Exception):
+    """
+    Raised inside atomic_write to discard a page that has the same content as before.
+    """
+
+
+class Template:
+    """
+    An HTML template with __TEMPLATE_NAME__ placeholders.
+    The template is split into literal text and placeholders once, so pages
+    can be streamed without running str.replace over the whole page.
+    """
+
+    def __init__(self, path):
+        """
+        Reads and parses the template file.
+
+        Args:
+            path (str): Path to the template file.
+        """
+        with open(path, "r", encoding="utf-8") as template_file:
+            text = template_file.read()
+
+        self._parts = []
+        position = 0
+        for match in PLACEHOLDER.finditer(text):
+            self._parts.append((False, text[position:match.start()]))
+            self._parts.append((True, match.group(1)))
+            position = match.end()
+        self._parts.append((False, text[position:]))
+
+    def stream(self, values):
+        """
+        Yields the page in chunks.
+
+        Args:
+            values (dict): Placeholder names (e.g. 'MOVIE_GRID') mapped to a string
+                           or to an iterable of strings. Missing placeholders are left empty.
+
+        Yields:
+            str: Consecutive chunks of the page.
+        """
+        for is_placeholder, part in self._parts:
+            if not is_placeholder:
+                yield part
+                continue
+            value = values.get(part, "")
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+
+
+class WebsiteRenderer:
+    """
+    Renders the movies of any IStorage backend into a static website.
+    Movies are consumed through IStorage.iter_movies() and the HTML is streamed
+    straight to the output file, so unless the per-movie fragment cache is enabled
+    the memory use does not grow with the collection. Every file is replaced
+    atomically, and pages whose content did not change are not rewritten.
+    """
+
+    def __init__(self, output_dir="website", title="My Movie App", page_size=None,
+                 cache_fragments=False):
+        """
+        Args:
+            output_dir (str): Directory with index_template.html and the generated pages.
+            title (str): Title shown on the website.
+            page_size (int): Number of movies per page, or None for a single index.html.
+                             Paginated output also writes a pages.json index.
+            cache_fragments (bool): Keep the rendered HTML of every movie, so only new
+                                    or changed movies are rendered on the next run.
+                                    Uses memory in proportion to the collection.
+        """
+        self.output_dir = output_dir
+        self.title = title
+        self.page_size = page_size
+        self.cache_fragments = cache_fragments
+        self._template = None
+        self._fragments = {}
+        self._page_hashes = {}
+
+    def generate(self, storage):
+        """
+        Renders the website and prints the outcome, as used by the MovieApp menu.
+
+        Args:
+            storage (IStorage): Storage with the movies to render.
+        """
+        from colorama import Fore, Style
+
+        try:
+            written = self.render(storage)
+        except FileNotFoundError:
+            print(Fore.RED + "\nTemplate file not found." + Style.RESET_ALL)
+        except Exception as e:
+            print(Fore.RED + f"\nAn error occurred while generating the website: {e}" + Style.RESET_ALL)
+        else:
+            if written:
+                print(Fore.GREEN + "\nWebsite was generated successfully." + Style.RESET_ALL)
+            else:
+                print(Fore.GREEN + "\nWebsite is already up to date." + Style.RESET_ALL)
+
+    @instrumentation.traced("website.render")
+    def render(self, storage):
+        """
+        Renders the website.
+
+        Args:
+            storage (IStorage): Storage with the movies to render.
+
+        Returns:
+            int: Number of pages that were actually rewritten.
+
+        Raises:
+            FileNotFoundError: If the template does not exist.
+        """
+        if self._template is None:
+            self._template = Template(os.path.join(self.output_dir, "index_template.html"))
+
+        fragments = {} if self.cache_fragments else None
+        if not self.page_size:
+            grid = self._render_grid(storage.iter_movies(), fragments, {})
+            written = self._write_page("index.html", {"MOVIE_GRID": grid})
+            self._remove_stale_pages(1)
+        else:
+            written = self._render_pages(storage, fragments)
+        if fragments is not None:
+            self._fragments = fragments
+        return written
+
+    def _render_pages(self, storage, fragments):
+        """
+        Writes the movies as numbered pages, one page at a time, removes pages left
+        over from a larger collection and writes pages.json.
+
+        Args:
+            storage (IStorage): Storage with the movies to render.
+            fragments (dict): Receives the rendered HTML per movie title, or None.
+
+        Returns:
+            int: Number of pages that were actually rewritten.
+        """
+        total = storage.count()
+        page_count = max(1, math.ceil(total / self.page_size))
+        movies = storage.iter_movies()
+        pages = []
+        written = 0
+        for number in range(1, page_count + 1):
+            summary = {'page': number, 'file': self._page_filename(number),
+                       'count': 0, 'first': None, 'last': None}
+            grid = self._render_grid(itertools.islice(movies, self.page_size), fragments, summary)
+            written += self._write_page(summary['file'], {
+                "MOVIE_GRID": grid,
+                "PAGINATION": self._render_pagination(number, page_count)
+            })
+            pages.append(summary)
+
+        self._remove_stale_pages(page_count)
+        with atomic_write(os.path.join(self.output_dir, "pages.json"), encoding="utf-8") as index_file:
+            json.dump({'page_size': self.page_size, 'total_movies': total, 'pages': pages},
+                      index_file, indent=4)
+        return written
+
+    def _remove_stale_pages(self, page_count):
+        """
+        Removes pages left over from an earlier render with more pages, and
+        pages.json if the output is a single page.
+
+        Args:
+            page_count (int): Number of pages written by the current render.
+        """
+        for filename in os.listdir(self.output_dir):
+            match = PAGE_FILENAME.fullmatch(filename)
+            if (match and int(match.group(1)) > page_count) or (
+                    filename == "pages.json" and not self.page_size):
+                os.remove(os.path.join(self.output_dir, filename))
+                self._page_hashes.pop(filename, None)
+
+    def _render_grid(self, movies, fragments, summary):
+        """
+        Yields the HTML of each movie, rendering only new or changed movies.
+
+        Args:
+            movies (iterable): (title, data) tuples.
+            fragments (dict): Receives the rendered HTML per movie title, or None.
+            summary (dict): Updated with 'count', 'first' and 'last' title.
+
+        Yields:
+            str: The HTML of one movie.
+        """
+        for title, data in movies:
+            key = (data['year'], data['rating'], data.get('poster') or '')
+            cached = self._fragments.get(title)
+            if cached is None or cached[0] != key:
+                cached = (key, self._render_movie(title, data))
+                instrumentation.count("website.movies_rendered")
+            else:
+                instrumentation.count("website.movies_reused")
+            if fragments is not None:
+                fragments[title] = cached
+
+            summary['count'] = summary.get('count', 0) + 1
+            if summary.get('first') is None:
+                summary['first'] = title
+            summary['last'] = title
+            yield cached[1]
+
+    def _render_movie(self, title, data):
+        """
+        Renders the HTML grid entry of a single movie.
+
+        Args:
+            title (str): Movie title.
+            data (dict): Dictionary with year, rating, and poster.
+
+        Returns:
+            str: The HTML of the movie.
+        """
+        return f'''
+            <div class="movie">
+                <img class="movie-poster" src="{html.escape(data.get('poster') or '')}">
+                <div class="movie-title">{html.escape(title)}</div>
+                <div class="movie-year">{data['year']}</div>
+                <div class="movie-rating">{data['rating']}</div>
+            </div>
+            '''
+
+    def _render_pagination(self, number, page_count):
+        """
+        Renders the navigation links between pages.
+
+        Args:
+            number (int): Number of the current page.
+            page_count (int): Total number of pages.
+
+        Returns:
+            str: The HTML of the navigation.
+        """
+        links = []
+        if number > 1:
+            links.append(f'<a href="{self._page_filename(number - 1)}">&laquo; Previous</a>')
+        links.append(f'<span>Page {number} of {page_count}</span>')
+        if number < page_count:
+            links.append(f'<a href="{self._page_filename(number + 1)}">Next &raquo;</a>')
+        return '<nav class="pagination">' + ' '.join(links) + '</nav>'
+
+    @staticmethod
+    def _page_filename(number):
+        """
+        Returns the file name of a page; the first page is index.html.
+
+        Args:
+            number (int): Page number, starting at 1.
+        """
+        return "index.html" if number == 1 else f"page-{number}.html"
+
+    @instrumentation.traced("website.write_page")
+    def _write_page(self, filename, values):
+        """
+        Streams a page into a temporary file and moves it into place (see
+        atomic_write), unless the existing page already has the same content.
+
+        Args:
+            filename (str): File name of the page inside the output directory.
+            values (dict): Placeholder values for the template.
+
+        Returns:
+            bool: True if the page was rewritten.
+        """
+        path = os.path.join(self.output_dir, filename)
+        digest = hashlib.sha256()
+        values = {"TITLE": html.escape(self.title), **values}
+        try:
+            with atomic_write(path, encoding="utf-8") as output_file:
+                for chunk in self._template.stream(values):
+                    output_file.write(chunk)
+                    digest.update(chunk.encode("utf-8"))
+                page_hash = digest.hexdigest()
+                if page_hash == self._page_hash(filename):
+                    raise _PageUnchanged
+        except _PageUnchanged:
+            instrumentation.count("website.pages_unchanged")
+            return False
+        instrumentation.count("website.pages_written")
+        self._page_hashes[filename] = (file_version(path), page_hash)
+        return True
+
+    def _page_hash(self, filename):
+        """
+        Returns the SHA-256 hash of a generated page. Hashes are remembered together
+        with the file's version (inode, mtime and size), so the file is only read
+        again if it was not written by this renderer or changed on disk since.
+
+        Args:
+            filename (str): File name of the page inside the output directory.
+
+        Returns:
+            str or None: Hex digest, or None if the page does not exist.
+        """
+        path = os.path.join(self.output_dir, filename)
+        version = file_version(path)
+        cached = self._page_hashes.get(filename)
+        if cached is not None and version is not None and cached[0] == version:
+            return cached[1]
+
+        self._page_hashes.pop(filename, None)
+        digest = hashlib.sha256()
+        try:
+            with open(path, "rb") as page_file:
+                for block in iter(lambda: page_file.read(64 * 1024), b""):
+                    digest.update(block)
+        except FileNotFoundError:
+            return None
+        self._page_hashes[filename] = (version, digest.hexdigest())
+        return digest.hexdigest()